@@ -1,3 +1,4 @@
+import importlib
 import logging
 
 # Configure the root dsrag logger with a NullHandler to prevent "No handler found" warnings
@@ -6,17 +7,25 @@ import logging
 logger = logging.getLogger("dsrag")
 logger.addHandler(logging.NullHandler())
 
-# Import Azure components to register them in the subclass registry
-# This ensures they can be deserialized from saved KB configurations
-try:
-    from dsrag.azure import (
-        AzureBlobStorage,
-        AzureOpenAIChatAPI,
-        AzureOpenAIEmbedding,
-        AzureOpenAIVLM,
-    )
-    # AzureCohereReranker is conditionally imported in azure/__init__.py
-    # if cohere is available
-except ImportError:
-    # Azure dependencies are optional
-    pass
\ No newline at end of file
+# Names routed to dsrag.azure by __getattr__
+_AZURE_COMPONENTS = {
+    "AzureBlobStorage",
+    "AzureOpenAIChatAPI",
+    "AzureOpenAIEmbedding",
+    "AzureOpenAIVLM",
+    "AzureCohereReranker",
+}
+
+
+def __getattr__(name):
+    """Lazily expose Azure components (e.g. dsrag.AzureBlobStorage).
+
+    Azure components pull in optional dependencies, so they are only imported
+    on first access. KnowledgeBase registers the ones referenced by a saved
+    configuration before deserializing it.
+    """
+    if name in _AZURE_COMPONENTS:
+        azure = importlib.import_module("dsrag.azure")
+        if name in azure.__all__:
+            return getattr(azure, name)
+    raise AttributeError(f"module 'dsrag' has no attribute '{name}'")
@@ -147,11 +147,29 @@ def auto_context(kb_id: str, auto_context_model: LLM, sections, chunks, text, do
 
     return chunks, chunks_to_embed
 
+# Chunks per embedding request, and how many of those requests are in flight at once
+EMBEDDING_BATCH_SIZE = 50
+EMBEDDING_MAX_WORKERS = 4
+
 def get_embeddings(embedding_model: Embedding, chunks_to_embed):
-    # embed the chunks - if the document is long, we need to get the embeddings in chunks
+    # embed the chunks - if the document is long, we need to get the embeddings in chunks.
+    # The requests are network-bound, so several are sent concurrently; results keep chunk order.
+    batches = [
+        chunks_to_embed[i:i+EMBEDDING_BATCH_SIZE]
+        for i in range(0, len(chunks_to_embed), EMBEDDING_BATCH_SIZE)
+    ]
+    def embed_batch(batch):
+        return embedding_model.get_embeddings(batch, input_type="document")
+
+    if len(batches) == 0:
+        return []
+    if len(batches) == 1:
+        return list(embed_batch(batches[0]))
+
     chunk_embeddings = []
-    for i in range(0, len(chunks_to_embed), 50):
-        chunk_embeddings += embedding_model.get_embeddings(chunks_to_embed[i:i+50], input_type="document")
+    with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(batches))) as executor:
+        for batch_embeddings in executor.map(embed_batch, batches):
+            chunk_embeddings += batch_embeddings
 
     return chunk_embeddings
 
@@ -5,12 +5,12 @@ This module provides Azure-specific implementations for dsRAG, including:
 - Azure OpenAI for chat and embedding models
 - Azure OpenAI VLM for vision-language models
 - Azure Cohere for reranking models
+
+Components are imported lazily on first access, so optional dependencies
+(openai, cohere, azure-storage-blob) are only loaded when actually used.
 """
 
-from .blob_storage import AzureBlobStorage
-from .azure_openai_chat import AzureOpenAIChatAPI
-from .azure_openai_embedding import AzureOpenAIEmbedding
-from .azure_openai_vlm import AzureOpenAIVLM
+import importlib.util
 
 __all__ = [
     "AzureBlobStorage",
@@ -19,9 +19,27 @@ __all__ = [
     "AzureOpenAIVLM",
 ]
 
-# Cohere is an optional dependency
-try:
-    from .azure_cohere_reranker import AzureCohereReranker
+# Cohere is an optional dependency; check for it without importing it
+if importlib.util.find_spec("cohere") is not None:
     __all__.append("AzureCohereReranker")
-except ImportError:
-    pass
+
+
+def __getattr__(name):
+    """Lazily import Azure components only when accessed."""
+    if name == "AzureBlobStorage":
+        from .blob_storage import AzureBlobStorage
+        return AzureBlobStorage
+    elif name == "AzureOpenAIChatAPI":
+        from .azure_openai_chat import AzureOpenAIChatAPI
+        return AzureOpenAIChatAPI
+    elif name == "AzureOpenAIEmbedding":
+        from .azure_openai_embedding import AzureOpenAIEmbedding
+        return AzureOpenAIEmbedding
+    elif name == "AzureOpenAIVLM":
+        from .azure_openai_vlm import AzureOpenAIVLM
+        return AzureOpenAIVLM
+    elif name == "AzureCohereReranker" and name in __all__:
+        from .azure_cohere_reranker import AzureCohereReranker
+        return AzureCohereReranker
+    else:
+        raise AttributeError(f"module 'dsrag.azure' has no attribute '{name}'")
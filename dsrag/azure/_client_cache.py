@@ -0,0 +1,187 @@
+"""Shared clients for the Azure OpenAI components.
+
+AzureOpenAIChatAPI, AzureOpenAIEmbedding and AzureOpenAIVLM usually point at the
+same Azure OpenAI resource. Sharing one HTTP client per endpoint (one sync, plus
+one async per event loop) lets them reuse a single connection pool (and its TLS sessions) instead of
+each opening their own, and caching the SDK clients makes creating components
+(e.g. via from_dict on every request) a dictionary lookup. When the h2 package is
+installed (pip install 'httpx[http2]'), the clients speak HTTP/2, so concurrent
+requests are multiplexed over one connection instead of each needing a socket.
+"""
+
+import asyncio
+import functools
+import importlib.util
+import threading
+import weakref
+
+import httpx
+
+try:
+    from openai import AsyncAzureOpenAI, AzureOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient
+except ImportError:
+    raise ImportError(
+        "OpenAI package not found. Install with: pip install 'dsrag[openai]'"
+    )
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection limits of the shared clients; idle connections are kept for a minute
+# so calls spaced out by other work (e.g. parsing between requests) still reuse them
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+
+_http_clients: dict[str, httpx.Client] = {}
+# Async clients per event loop; an entry goes away with its loop
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_shared_http_client(azure_endpoint: str) -> httpx.Client:
+    """
+    Return the HTTP client shared by all Azure OpenAI components for an endpoint.
+
+    DefaultHttpxClient keeps the OpenAI SDK's default timeouts and redirect
+    handling, which a bare httpx.Client would not.
+
+    Args:
+        azure_endpoint: Azure OpenAI endpoint URL
+
+    Returns:
+        The shared httpx.Client for the endpoint
+    """
+    with _lock:
+        client = _http_clients.get(azure_endpoint)
+        if client is None or client.is_closed:
+            client = DefaultHttpxClient(limits=_LIMITS, http2=HTTP2_AVAILABLE)
+            _http_clients[azure_endpoint] = client
+        return client
+
+
+@functools.lru_cache(maxsize=16)
+def get_azure_openai_client(api_key: str, api_version: str, azure_endpoint: str) -> AzureOpenAI:
+    """
+    Return a cached AzureOpenAI client for the given credentials.
+
+    Args:
+        api_key: Azure OpenAI API key
+        api_version: Azure OpenAI API version
+        azure_endpoint: Azure OpenAI endpoint URL
+
+    Returns:
+        An AzureOpenAI client on the endpoint's shared HTTP client
+    """
+    return AzureOpenAI(
+        api_key=api_key,
+        api_version=api_version,
+        azure_endpoint=azure_endpoint,
+        http_client=get_shared_http_client(azure_endpoint),
+        max_retries=0,  # Retries are handled by dsrag.azure._retry
+    )
+
+
+class _LoopClients:
+    """Async clients opened on one event loop."""
+
+    def __init__(self):
+        self.http_clients: dict[str, httpx.AsyncClient] = {}
+        self.openai_clients: dict[tuple[str, str, str], AsyncAzureOpenAI] = {}
+        self.closer = None
+
+
+async def _close_at_loop_shutdown(clients: _LoopClients):
+    """
+    Close a loop's async HTTP clients when the loop shuts down.
+
+    asyncio.run finalizes the async generators started on its loop
+    (loop.shutdown_asyncgens) before closing it, which runs this finally block on
+    that loop, the last place its connections can be closed cleanly.
+    """
+    try:
+        yield
+    finally:
+        with _lock:
+            _loop_clients.pop(asyncio.get_running_loop(), None)
+        for http_client in clients.http_clients.values():
+            await http_client.aclose()
+
+
+def _get_loop_clients() -> _LoopClients:
+    """Return the async clients of the running event loop, creating them on first use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        # Loops closed without asyncio.run never finalize their closer; drop their clients here
+        for closed_loop in [other for other in _loop_clients if other.is_closed()]:
+            del _loop_clients[closed_loop]
+        clients = _loop_clients.get(loop)
+        if clients is None:
+            clients = _loop_clients[loop] = _LoopClients()
+            clients.closer = _close_at_loop_shutdown(clients)
+            asyncio.ensure_future(clients.closer.__anext__())  # Run up to the yield
+        return clients
+
+
+def get_shared_async_http_client(azure_endpoint: str) -> httpx.AsyncClient:
+    """
+    Return the async HTTP client shared by all Azure OpenAI components for an
+    endpoint on the running event loop.
+
+    An httpx.AsyncClient's pooled connections belong to the event loop that opened
+    them, so each loop (e.g. each asyncio.run) gets its own client, which is closed
+    when the loop shuts down. Must be called from async code.
+
+    Args:
+        azure_endpoint: Azure OpenAI endpoint URL
+
+    Returns:
+        The running loop's httpx.AsyncClient for the endpoint
+    """
+    clients = _get_loop_clients()
+    client = clients.http_clients.get(azure_endpoint)
+    if client is None or client.is_closed:
+        client = DefaultAsyncHttpxClient(limits=_LIMITS, http2=HTTP2_AVAILABLE)
+        clients.http_clients[azure_endpoint] = client
+    return client
+
+
+def get_async_azure_openai_client(api_key: str, api_version: str, azure_endpoint: str) -> AsyncAzureOpenAI:
+    """
+    Return the AsyncAzureOpenAI client for the given credentials on the running
+    event loop. Must be called from async code.
+
+    Args:
+        api_key: Azure OpenAI API key
+        api_version: Azure OpenAI API version
+        azure_endpoint: Azure OpenAI endpoint URL
+
+    Returns:
+        An AsyncAzureOpenAI client on the endpoint's async HTTP client for the running loop
+    """
+    clients = _get_loop_clients()
+    key = (api_key, api_version, azure_endpoint)
+    client = clients.openai_clients.get(key)
+    if client is None or client.is_closed():
+        client = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=azure_endpoint,
+            http_client=get_shared_async_http_client(azure_endpoint),
+            max_retries=0,  # Retries are handled by dsrag.azure._retry
+        )
+        clients.openai_clients[key] = client
+    return client
+
+
+def close_shared_http_clients() -> None:
+    """
+    Close all shared sync HTTP clients and drop the cached clients that use them.
+
+    Async clients are dropped too; they can only be closed from their event loop,
+    which does so when it shuts down.
+    """
+    get_azure_openai_client.cache_clear()
+    with _lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        _loop_clients.clear()
@@ -0,0 +1,79 @@
+"""Retry helpers for transient errors from Azure-hosted APIs.
+
+Rate limits (429) and brief service outages are routine under bulk ingestion,
+so every Azure API call goes through these helpers instead of failing the whole
+pipeline on the first transient error.
+"""
+
+from typing import Any, Callable, Tuple, Type
+
+try:
+    from tenacity import (
+        AsyncRetrying,
+        Retrying,
+        retry_if_exception_type,
+        stop_after_attempt,
+        wait_exponential_jitter,
+    )
+except ImportError:
+    raise ImportError(
+        "tenacity package not found. Install with: pip install 'dsrag[azure-openai]' "
+        "or 'dsrag[azure-cohere]'"
+    )
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+def _retry_kwargs(max_attempts: int, retry_on: Tuple[Type[BaseException], ...]) -> dict:
+    return {
+        "stop": stop_after_attempt(max_attempts),
+        "wait": wait_exponential_jitter(initial=1, max=30),
+        "retry": retry_if_exception_type(retry_on),
+        "reraise": True,
+    }
+
+
+def retry_call(
+    fn: Callable[..., Any],
+    *args,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_on: Tuple[Type[BaseException], ...] = (),
+    **kwargs,
+) -> Any:
+    """
+    Call fn, retrying with jittered exponential backoff on the given exceptions.
+
+    Args:
+        fn: Callable to invoke with *args and **kwargs
+        max_attempts: Total number of attempts, including the first (1 disables retries)
+        retry_on: Exception types that trigger a retry; anything else is raised immediately
+
+    Returns:
+        The return value of fn
+    """
+    return Retrying(**_retry_kwargs(max_attempts, retry_on))(fn, *args, **kwargs)
+
+
+async def aretry_call(
+    fn: Callable[..., Any],
+    *args,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    retry_on: Tuple[Type[BaseException], ...] = (),
+    **kwargs,
+) -> Any:
+    """Async version of retry_call for coroutine functions."""
+    async for attempt in AsyncRetrying(**_retry_kwargs(max_attempts, retry_on)):
+        with attempt:
+            return await fn(*args, **kwargs)
+
+
+def openai_retryable_errors() -> Tuple[Type[BaseException], ...]:
+    """Transient OpenAI SDK errors: rate limits, timeouts, dropped connections and 5xx responses."""
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
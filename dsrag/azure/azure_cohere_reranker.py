@@ -4,19 +4,32 @@ This module provides support for Cohere reranking models deployed on Azure.
 """
 
 import os
+import functools
 from typing import Optional, List
-from scipy.stats import beta
 
 try:
     import cohere
+    import cohere.errors
 except ImportError:
     raise ImportError(
-        "Cohere package not found. Install with: pip install 'dsrag[cohere]'"
+        "Cohere package not found. Install with: pip install 'dsrag[azure-cohere]'"
     )
 
-import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from dsrag.reranker import Reranker
+from dsrag.azure._retry import DEFAULT_MAX_ATTEMPTS, retry_call
+
+# Transient Cohere errors worth retrying
+RETRYABLE_COHERE_ERRORS = (
+    cohere.errors.TooManyRequestsError,
+    cohere.errors.ServiceUnavailableError,
+    cohere.errors.InternalServerError,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_cohere_client(api_key: str, base_url: str) -> "cohere.Client":
+    """Return a cached Cohere client, shared by rerankers with the same credentials."""
+    return cohere.Client(api_key=api_key, base_url=base_url)
 
 
 class AzureCohereReranker(Reranker):
@@ -32,6 +45,7 @@ class AzureCohereReranker(Reranker):
         model: str = "Cohere-rerank-v3.5",
         azure_endpoint: Optional[str] = None,
         api_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
     ):
         """
         Initialize Azure Cohere Reranker.
@@ -40,8 +54,10 @@ class AzureCohereReranker(Reranker):
             model: Cohere reranking model name (e.g., "Cohere-rerank-v3.5")
             azure_endpoint: Azure Cohere endpoint URL (falls back to AZURE_COHERE_ENDPOINT env var)
             api_key: Azure Cohere API key (falls back to AZURE_COHERE_API_KEY or CO_API_KEY env var)
+            max_attempts: Attempts per rerank call on rate limits and transient errors (1 disables retries)
         """
         self.model = model
+        self.max_attempts = max_attempts
         
         # Get credentials from parameters or environment
         self.azure_endpoint = azure_endpoint or os.environ.get("AZURE_COHERE_ENDPOINT")
@@ -60,10 +76,7 @@ class AzureCohereReranker(Reranker):
             )
         
         # Initialize Cohere client with Azure endpoint
-        self.client = cohere.Client(
-            api_key=self.api_key,
-            base_url=self.azure_endpoint,
-        )
+        self.client = _cached_cohere_client(self.api_key, self.azure_endpoint)
     
     def transform(self, x):
         """
@@ -73,6 +86,9 @@ class AzureCohereReranker(Reranker):
         This is critical for RSE to work properly, because it utilizes the 
         absolute relevance values to calculate the similarity scores.
         """
+        # Imported here so scipy is only loaded when reranking actually runs
+        from scipy.stats import beta
+        
         a, b = 0.4, 0.4  # These can be adjusted to change the distribution shape
         return beta.cdf(x, a, b)
     
@@ -87,22 +103,29 @@ class AzureCohereReranker(Reranker):
         Returns:
             List of reranked search results with updated similarity scores
         """
-        documents = []
-        for result in search_results:
-            documents.append(f"{result['metadata']['chunk_header']}\n\n{result['metadata']['chunk_text']}")
+        documents = [
+            "\n\n".join((result['metadata']['chunk_header'], result['metadata']['chunk_text']))
+            for result in search_results
+        ]
         
-        reranked_results = self.client.rerank(
+        reranked_results = retry_call(
+            self.client.rerank,
+            max_attempts=self.max_attempts,
+            retry_on=RETRYABLE_COHERE_ERRORS,
             model=self.model, 
             query=query, 
             documents=documents
         )
         results = reranked_results.results
-        reranked_indices = [result.index for result in results]
-        reranked_similarity_scores = [result.relevance_score for result in results]
-        reranked_search_results = [search_results[i] for i in reranked_indices]
+        # Transform all scores in one vectorized call rather than once per result
+        reranked_similarity_scores = self.transform([result.relevance_score for result in results])
         
-        for i, result in enumerate(reranked_search_results):
-            result['similarity'] = self.transform(reranked_similarity_scores[i])
+        # Reorder and attach the transformed scores in a single pass
+        reranked_search_results = []
+        for result, similarity in zip(results, reranked_similarity_scores):
+            search_result = search_results[result.index]
+            search_result['similarity'] = similarity
+            reranked_search_results.append(search_result)
         
         return reranked_search_results
     
@@ -111,6 +134,7 @@ class AzureCohereReranker(Reranker):
         base_dict = super().to_dict()
         base_dict.update({
             'model': self.model,
+            'max_attempts': self.max_attempts,
             'azure_endpoint': self.azure_endpoint,
             'api_key': self.api_key,
         })
@@ -1,18 +1,28 @@
 """Azure OpenAI Chat API implementation for dsRAG."""
 
+import asyncio
+import io
 import os
-from typing import Optional
+import json
+import time
+from typing import AsyncIterator, Iterator, Optional
 
 try:
-    from openai import AzureOpenAI
+    from openai import AsyncAzureOpenAI
 except ImportError:
     raise ImportError(
         "OpenAI package not found. Install with: pip install 'dsrag[openai]'"
     )
 
-import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from dsrag.llm import LLM
+from dsrag.azure._client_cache import get_async_azure_openai_client, get_azure_openai_client
+from dsrag.azure._retry import DEFAULT_MAX_ATTEMPTS, aretry_call, openai_retryable_errors, retry_call
+
+# Batch job states after which polling stops
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Default limit on concurrent requests in make_llm_calls
+MAX_CONCURRENT_REQUESTS = 10
 
 
 class AzureOpenAIChatAPI(LLM):
@@ -31,6 +41,9 @@ class AzureOpenAIChatAPI(LLM):
         max_tokens: int = 1000,
         azure_endpoint: Optional[str] = None,
         api_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        static_system_prompt: Optional[str] = None,
+        user: Optional[str] = None,
     ):
         """
         Initialize Azure OpenAI Chat API.
@@ -42,11 +55,36 @@ class AzureOpenAIChatAPI(LLM):
             max_tokens: Maximum tokens in response
             azure_endpoint: Azure OpenAI endpoint URL (falls back to AZURE_OPENAI_ENDPOINT env var)
             api_key: Azure OpenAI API key (falls back to AZURE_OPENAI_API_KEY env var)
+            max_attempts: Attempts per API call on rate limits and transient errors (1 disables retries)
+            static_system_prompt: System prompt prepended verbatim to every request. Requests
+                that start with the same 1024+ tokens reuse the service's prompt cache, so
+                put long, unchanging instructions here rather than in chat_messages.
+            user: Stable end-user ID sent with every request, which also helps route
+                requests with the same prefix to the same prompt cache
         """
         self.deployment_name = deployment_name
         self.api_version = api_version
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.max_attempts = max_attempts
+        self.static_system_prompt = static_system_prompt
+        self.user = user
+        
+        # Request parameters shared by every call, built once
+        self._base_params = {
+            "model": self.deployment_name,  # In Azure, this is the deployment name
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+        if self.user:
+            self._base_params["user"] = self.user
+        
+        # Byte-identical first message of every request, so the prompt prefix can be cached
+        self._prefix_messages = (
+            [{"role": "system", "content": self.static_system_prompt}]
+            if self.static_system_prompt
+            else []
+        )
         
         # Get credentials from parameters or environment
         self.azure_endpoint = azure_endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT")
@@ -64,12 +102,17 @@ class AzureOpenAIChatAPI(LLM):
                 "or AZURE_OPENAI_API_KEY environment variable"
             )
         
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
-            api_key=self.api_key,
-            api_version=self.api_version,
-            azure_endpoint=self.azure_endpoint,
-        )
+        # Cached client, shared by components with the same credentials
+        self.client = get_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
+    
+    @property
+    def async_client(self) -> AsyncAzureOpenAI:
+        """Async client for the running event loop (async connections can't outlive their loop)."""
+        return get_async_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
+    
+    def _with_prefix(self, chat_messages: list[dict]) -> list[dict]:
+        """Prepend the static system prompt, if any, to chat_messages."""
+        return self._prefix_messages + chat_messages if self._prefix_messages else chat_messages
     
     def make_llm_call(self, chat_messages: list[dict]) -> str:
         """
@@ -81,15 +124,202 @@ class AzureOpenAIChatAPI(LLM):
         Returns:
             Response text from the model
         """
-        response = self.client.chat.completions.create(
-            model=self.deployment_name,  # In Azure, this is the deployment name
-            messages=chat_messages,
-            max_tokens=self.max_tokens,
-            temperature=self.temperature,
+        response = retry_call(
+            self.client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            messages=self._with_prefix(chat_messages),
+            **self._base_params,
         )
         llm_output = response.choices[0].message.content.strip()
         return llm_output
     
+    def make_llm_call_stream(self, chat_messages: list[dict]) -> Iterator[str]:
+        """
+        Stream a chat completion from Azure OpenAI as it's generated.
+        
+        Callers can show the first tokens after one token's latency instead of
+        waiting for the whole completion. Only opening the stream is retried.
+        
+        Args:
+            chat_messages: List of message dictionaries in OpenAI format
+        
+        Yields:
+            Pieces of the response text, in order
+        """
+        stream = retry_call(
+            self.client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            messages=self._with_prefix(chat_messages),
+            stream=True,
+            **self._base_params,
+        )
+        with stream:
+            for chunk in stream:
+                # Azure sends content filter results in chunks without choices
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    async def amake_llm_call_stream(self, chat_messages: list[dict]) -> AsyncIterator[str]:
+        """
+        Async version of make_llm_call_stream.
+        
+        Args:
+            chat_messages: List of message dictionaries in OpenAI format
+        
+        Yields:
+            Pieces of the response text, in order
+        """
+        stream = await aretry_call(
+            self.async_client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            messages=self._with_prefix(chat_messages),
+            stream=True,
+            **self._base_params,
+        )
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    async def amake_llm_call(self, chat_messages: list[dict]) -> str:
+        """
+        Async version of make_llm_call.
+        
+        Lets callers with many independent conversations issue them concurrently,
+        e.g. with asyncio.gather.
+        
+        Args:
+            chat_messages: List of message dictionaries in OpenAI format
+        
+        Returns:
+            Response text from the model
+        """
+        response = await aretry_call(
+            self.async_client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            messages=self._with_prefix(chat_messages),
+            **self._base_params,
+        )
+        return response.choices[0].message.content.strip()
+    
+    def make_llm_calls(
+        self,
+        list_of_chat_messages: list[list[dict]],
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> list[str]:
+        """
+        Run make_llm_call over many independent conversations concurrently.
+        
+        Unlike make_llm_call_batch, results come back as fast as the deployment's
+        rate limit allows; rate-limited requests are retried with backoff. Runs
+        its own event loop, so it must not be called from async code; use
+        amake_llm_call with asyncio.gather there instead.
+        
+        Args:
+            list_of_chat_messages: One list of message dictionaries per request
+            max_concurrency: Maximum number of requests in flight at once
+        
+        Returns:
+            Response texts in the same order as list_of_chat_messages
+        """
+        async def run_all() -> list[str]:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def run_one(chat_messages: list[dict]) -> str:
+                async with semaphore:
+                    return await self.amake_llm_call(chat_messages)
+            
+            return await asyncio.gather(
+                *[run_one(chat_messages) for chat_messages in list_of_chat_messages]
+            )
+        
+        return asyncio.run(run_all())
+    
+    def make_llm_call_batch(
+        self,
+        list_of_chat_messages: list[list[dict]],
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+    ) -> list[str]:
+        """
+        Run many chat completions through the Azure OpenAI Batch API.
+        
+        Batch jobs are billed at a lower rate and don't count against the
+        deployment's requests-per-minute limit, but they can take up to 24 hours
+        to finish. Use this for bulk, non-interactive work; the deployment must
+        be a batch deployment (e.g. "GlobalBatch").
+        
+        Args:
+            list_of_chat_messages: One list of message dictionaries per request
+            poll_interval: Initial number of seconds between status checks
+            max_poll_interval: Upper bound for the exponential polling backoff
+        
+        Returns:
+            Response texts in the same order as list_of_chat_messages
+        
+        Raises:
+            RuntimeError: If the batch job or any request in it fails
+        """
+        if not list_of_chat_messages:
+            return []
+        
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": {**self._base_params, "messages": self._with_prefix(chat_messages)},
+            })
+            for i, chat_messages in enumerate(list_of_chat_messages)
+        ]
+        batch_input = io.BytesIO("\n".join(lines).encode("utf-8"))
+        retry_kwargs = {"max_attempts": self.max_attempts, "retry_on": openai_retryable_errors()}
+        input_file = retry_call(
+            self.client.files.create,
+            **retry_kwargs,
+            file=("batch_input.jsonl", batch_input),
+            purpose="batch",
+        )
+        batch = retry_call(
+            self.client.batches.create,
+            **retry_kwargs,
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h",
+        )
+        
+        # Poll with exponential backoff until the job reaches a terminal state
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+            batch = retry_call(self.client.batches.retrieve, batch.id, **retry_kwargs)
+        
+        if batch.status != "completed":
+            raise RuntimeError(f"Azure OpenAI batch {batch.id} ended with status '{batch.status}'")
+        
+        results = [None] * len(list_of_chat_messages)
+        if batch.output_file_id:
+            output = retry_call(self.client.files.content, batch.output_file_id, **retry_kwargs).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    results[int(record["custom_id"])] = content.strip()
+        
+        failed = [i for i, result in enumerate(results) if result is None]
+        if failed:
+            raise RuntimeError(
+                f"Azure OpenAI batch {batch.id} has {len(failed)} failed request(s): {failed}"
+            )
+        return results
+    
     def to_dict(self):
         """Serialize configuration to dictionary."""
         base_dict = super().to_dict()
@@ -98,6 +328,9 @@ class AzureOpenAIChatAPI(LLM):
             'api_version': self.api_version,
             'temperature': self.temperature,
             'max_tokens': self.max_tokens,
+            'max_attempts': self.max_attempts,
+            'static_system_prompt': self.static_system_prompt,
+            'user': self.user,
             'azure_endpoint': self.azure_endpoint,
             'api_key': self.api_key,
         })
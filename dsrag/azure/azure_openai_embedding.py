@@ -1,19 +1,53 @@
 """Azure OpenAI Embedding implementation for dsRAG."""
 
 import os
-from typing import Optional, List
+import base64
+import asyncio
+import functools
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
 
-try:
-    from openai import AzureOpenAI
-except ImportError:
-    raise ImportError(
-        "OpenAI package not found. Install with: pip install 'dsrag[openai]'"
-    )
+import numpy as np
 
-import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from dsrag.embedding import Embedding
 from dsrag.database.vector.types import Vector
+from dsrag.azure._client_cache import get_async_azure_openai_client, get_azure_openai_client
+from dsrag.azure._retry import DEFAULT_MAX_ATTEMPTS, aretry_call, openai_retryable_errors, retry_call
+
+# Maximum number of inputs Azure OpenAI accepts in a single embeddings request
+MAX_BATCH_SIZE = 2048
+
+# Maximum total number of tokens Azure OpenAI accepts in a single embeddings request.
+# Every token is at least one UTF-8 byte, so batches are capped by byte length, which
+# never undercounts and doesn't need a tokenizer pass over every input.
+MAX_BATCH_TOKENS = 300000
+
+# Maximum number of sub-batch requests get_embeddings has in flight at once
+MAX_PARALLEL_REQUESTS = 8
+
+# Maximum number of keys per lookup query on the disk cache (SQLite's default variable limit is 999)
+DISK_CACHE_LOOKUP_BATCH_SIZE = 500
+
+# Runs of whitespace, collapsed to one space when normalize_cache_keys is set
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=32)
+def _probe_dimension(client, deployment_name: str, max_attempts: int) -> int:
+    """Return the size of the embeddings a deployment returns, by embedding one short text."""
+    response = retry_call(
+        client.embeddings.create,
+        max_attempts=max_attempts,
+        retry_on=openai_retryable_errors(),
+        model=deployment_name,
+        input=["x"],
+    )
+    return len(response.data[0].embedding)
 
 
 class AzureOpenAIEmbedding(Embedding):
@@ -27,24 +61,58 @@ class AzureOpenAIEmbedding(Embedding):
     def __init__(
         self,
         deployment_name: str,
-        dimension: int = 1536,
+        dimension: Optional[int] = 1536,
         api_version: str = "2024-02-15-preview",
         azure_endpoint: Optional[str] = None,
         api_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        return_numpy: bool = False,
+        cache_size: int = 10000,
+        cache_dir: Optional[str] = None,
+        normalize_cache_keys: bool = False,
+        max_batch_size: Optional[int] = None,
+        send_dimensions: bool = False,
     ):
         """
         Initialize Azure OpenAI Embedding.
         
         Args:
             deployment_name: Name of the Azure OpenAI embedding deployment
-            dimension: Embedding dimension (depends on the model used)
+            dimension: Embedding dimension (depends on the model used). None looks it up
+                with one embedding request, made once per deployment per process.
             api_version: Azure OpenAI API version
             azure_endpoint: Azure OpenAI endpoint URL (falls back to AZURE_OPENAI_ENDPOINT env var)
             api_key: Azure OpenAI API key (falls back to AZURE_OPENAI_API_KEY env var)
+            max_attempts: Attempts per API call on rate limits and transient errors (1 disables retries)
+            return_numpy: Return embeddings as a float32 np.ndarray of shape (N, dimension)
+                instead of lists of Python floats
+            cache_size: Number of embeddings kept in an in-process LRU cache, so texts
+                repeated across calls aren't re-embedded (0 disables the cache)
+            cache_dir: Directory for a persistent SQLite cache of embeddings, shared across
+                runs and processes, e.g. "~/.cache/dsrag/embeddings" (None disables it).
+                Re-ingesting unchanged text then makes no API calls.
+            normalize_cache_keys: Key both caches on the text with case folded and runs of
+                whitespace collapsed, so texts that differ only in case or whitespace (e.g.
+                a re-exported document) share one cached embedding: the one computed for
+                the first variant embedded. Off by default, since such texts can embed
+                slightly differently.
+            max_batch_size: Maximum number of inputs per embeddings request, for deployments
+                or API versions with a lower limit (e.g. 16). Defaults to MAX_BATCH_SIZE.
+            send_dimensions: Pass dimension to the API, so text-embedding-3 deployments return
+                shortened embeddings (e.g. 512 instead of 1536 values). Off by default, since
+                it changes the size of the vectors a deployment returns, which must match
+                those already stored in a knowledge base.
         """
         super().__init__(dimension)
         self.deployment_name = deployment_name
         self.api_version = api_version
+        self.max_attempts = max_attempts
+        self.return_numpy = return_numpy
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.normalize_cache_keys = normalize_cache_keys
+        self.max_batch_size = max_batch_size
+        self.send_dimensions = send_dimensions
         
         # Get credentials from parameters or environment
         self.azure_endpoint = azure_endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT")
@@ -62,34 +130,221 @@ class AzureOpenAIEmbedding(Embedding):
                 "or AZURE_OPENAI_API_KEY environment variable"
             )
         
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
-            api_key=self.api_key,
-            api_version=self.api_version,
-            azure_endpoint=self.azure_endpoint,
-        )
+        # Cached client, shared by components with the same credentials
+        self.client = get_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
+        
+        if dimension is None:
+            dimension = self.dimension = _probe_dimension(self.client, deployment_name, max_attempts)
+        
+        # Request parameters shared by every call, built once
+        self._base_params = {
+            "model": self.deployment_name,  # In Azure, this is the deployment name
+            "encoding_format": "base64",
+        }
+        if send_dimensions:
+            self._base_params["dimensions"] = dimension
+        
+        # LRU cache of embeddings keyed by a truncated SHA-256 of the text
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Persistent cache with the same keys, one SQLite file per deployment (and per
+        # dimension, if embeddings are shortened)
+        self._disk_cache: Optional[sqlite3.Connection] = None
+        self._disk_cache_lock = threading.Lock()
+        if cache_dir:
+            cache_name = f"{deployment_name}-{dimension}" if send_dimensions else deployment_name
+            cache_path = os.path.join(os.path.expanduser(cache_dir), f"{cache_name}.sqlite")
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self._disk_cache = sqlite3.connect(cache_path, check_same_thread=False)
+            self._disk_cache.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._disk_cache.commit()
+    
+    @property
+    def async_client(self):
+        """AsyncAzureOpenAI client for the running event loop (async connections can't outlive their loop)."""
+        return get_async_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
+    
+    @staticmethod
+    def _decode_embeddings(response) -> np.ndarray:
+        """Decode a base64 embeddings response into a float32 array of shape (N, dimension), in input order."""
+        return np.stack([
+            np.frombuffer(base64.b64decode(embedding_item.embedding), dtype=np.float32)
+            for embedding_item in sorted(response.data, key=lambda item: item.index)
+        ])
+    
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into consecutive request batches within max_batch_size and MAX_BATCH_TOKENS."""
+        max_batch_size = self.max_batch_size or MAX_BATCH_SIZE
+        batches = []
+        batch, batch_size = [], 0
+        for t in texts:
+            size = len(t.encode("utf-8"))
+            if batch and (len(batch) == max_batch_size or batch_size + size > MAX_BATCH_TOKENS):
+                batches.append(batch)
+                batch, batch_size = [], 0
+            batch.append(t)
+            batch_size += size
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _cache_key(self, text: str) -> bytes:
+        if self.normalize_cache_keys:
+            # Prefixed so normalized keys never collide with exact-text keys in a shared cache_dir
+            text = "normalized\0" + _WHITESPACE_RE.sub(" ", text).strip().casefold()
+        return hashlib.sha256(text.encode("utf-8")).digest()[:16]
+    
+    def _lookup(self, texts: List[str]) -> tuple:
+        """
+        Resolve texts against the cache.
+        
+        Returns:
+            Tuple of (keys, found, missing): the cache key of every text, the cached
+            vectors by key, and the unique texts that still need embedding
+        """
+        keys = [self._cache_key(t) for t in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        with self._cache_lock:
+            for key, t in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing[key] = t
+        if missing and self._disk_cache is not None:
+            self._lookup_disk(found, missing)
+        return keys, found, missing
+    
+    def _lookup_disk(self, found: Dict[bytes, np.ndarray], missing: Dict[bytes, str]) -> None:
+        """Move texts found in the disk cache from missing to found, and into the memory cache."""
+        missing_keys = list(missing)
+        rows = []
+        with self._disk_cache_lock:
+            for i in range(0, len(missing_keys), DISK_CACHE_LOOKUP_BATCH_SIZE):
+                batch = missing_keys[i:i + DISK_CACHE_LOOKUP_BATCH_SIZE]
+                rows.extend(self._disk_cache.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall())
+        hits = {bytes(key): np.frombuffer(vector, dtype=np.float32) for key, vector in rows}
+        for key in hits:
+            del missing[key]
+        found.update(hits)
+        self._store_in_memory(hits)
+    
+    def _store(self, found: Dict[bytes, np.ndarray], missing_keys: List[bytes], batch_embeddings: List[np.ndarray]) -> None:
+        """Add newly fetched vectors to found and to the cache, evicting the oldest entries."""
+        vectors = [vector for batch in batch_embeddings for vector in batch]
+        new_vectors = dict(zip(missing_keys, vectors))
+        found.update(new_vectors)
+        self._store_in_memory(new_vectors)
+        if new_vectors and self._disk_cache is not None:
+            with self._disk_cache_lock:
+                self._disk_cache.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in new_vectors.items()],
+                )
+                self._disk_cache.commit()
+    
+    def _store_in_memory(self, vectors: Dict[bytes, np.ndarray]) -> None:
+        """Add vectors to the in-process LRU cache, evicting the oldest entries."""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for key, vector in vectors.items():
+                self._cache[key] = vector
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _format_embeddings(self, text, keys: List[bytes], found: Dict[bytes, np.ndarray]):
+        """Assemble vectors in input order and convert them to the configured return type."""
+        if keys:
+            embeddings = np.stack([found[key] for key in keys])
+        else:
+            embeddings = np.empty((0, self.dimension), dtype=np.float32)
+        if not self.return_numpy:
+            embeddings = embeddings.tolist()
+        return embeddings[0] if isinstance(text, str) else embeddings
     
     def get_embeddings(self, text: List[str], input_type: Optional[str] = None) -> List[Vector]:
         """
         Generate embeddings for text using Azure OpenAI.
         
+        Only texts not already in the cache are sent, each at most once, even if
+        they appear several times in the input. Embeddings are requested
+        base64-encoded, which is smaller on the wire and decodes straight into a
+        float32 array instead of JSON floats. Inputs larger than one request allows
+        are split into sub-batches that are sent from a thread pool.
+        
         Args:
             text: Text or list of texts to embed
             input_type: Optional input type hint (not used by Azure OpenAI)
         
         Returns:
-            Embedding vector(s)
+            Embedding vector(s); an np.ndarray if return_numpy is set
         """
         # Ensure text is a list
         texts = [text] if isinstance(text, str) else text
         
-        response = self.client.embeddings.create(
-            input=texts,
-            model=self.deployment_name,  # In Azure, this is the deployment name
-        )
+        keys, found, missing = self._lookup(texts)
+        batches = self._batches(list(missing.values()))
         
-        embeddings = [embedding_item.embedding for embedding_item in response.data]
-        return embeddings[0] if isinstance(text, str) else embeddings
+        def embed_batch(batch: List[str]) -> np.ndarray:
+            response = retry_call(
+                self.client.embeddings.create,
+                max_attempts=self.max_attempts,
+                retry_on=openai_retryable_errors(),
+                input=batch,
+                **self._base_params,
+            )
+            return self._decode_embeddings(response)
+        
+        if len(batches) <= 1:
+            batch_embeddings = [embed_batch(batch) for batch in batches]
+        else:
+            # The requests are network-bound; map keeps the results in batch order
+            with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REQUESTS, len(batches))) as executor:
+                batch_embeddings = list(executor.map(embed_batch, batches))
+        self._store(found, list(missing), batch_embeddings)
+        return self._format_embeddings(text, keys, found)
+    
+    async def aget_embeddings(self, text: List[str], input_type: Optional[str] = None) -> List[Vector]:
+        """
+        Async version of get_embeddings.
+        
+        Inputs larger than one request allows are split into sub-batches that are
+        sent concurrently, and the results are returned in input order.
+        
+        Args:
+            text: Text or list of texts to embed
+            input_type: Optional input type hint (not used by Azure OpenAI)
+        
+        Returns:
+            Embedding vector(s); an np.ndarray if return_numpy is set
+        """
+        texts = [text] if isinstance(text, str) else text
+        
+        keys, found, missing = self._lookup(texts)
+        batches = self._batches(list(missing.values()))
+        responses = await asyncio.gather(*[
+            aretry_call(
+                self.async_client.embeddings.create,
+                max_attempts=self.max_attempts,
+                retry_on=openai_retryable_errors(),
+                input=batch,
+                **self._base_params,
+            )
+            for batch in batches
+        ])
+        self._store(found, list(missing), [self._decode_embeddings(response) for response in responses])
+        return self._format_embeddings(text, keys, found)
     
     def to_dict(self):
         """Serialize configuration to dictionary."""
@@ -97,6 +352,13 @@ class AzureOpenAIEmbedding(Embedding):
         base_dict.update({
             'deployment_name': self.deployment_name,
             'api_version': self.api_version,
+            'max_attempts': self.max_attempts,
+            'return_numpy': self.return_numpy,
+            'cache_size': self.cache_size,
+            'cache_dir': self.cache_dir,
+            'normalize_cache_keys': self.normalize_cache_keys,
+            'max_batch_size': self.max_batch_size,
+            'send_dimensions': self.send_dimensions,
             'azure_endpoint': self.azure_endpoint,
             'api_key': self.api_key,
         })
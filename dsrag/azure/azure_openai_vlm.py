@@ -1,20 +1,95 @@
 """Azure OpenAI VLM (Vision Language Model) implementation for dsRAG."""
 
+import io
 import os
-from typing import Any, Dict, Optional
+import json
+import asyncio
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional
 import base64
 
 try:
-    from openai import AzureOpenAI
+    from openai import AsyncAzureOpenAI
 except ImportError:
     raise ImportError(
         "OpenAI package not found. Install with: pip install 'dsrag[openai]'"
     )
 
-import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from dsrag.dsparse.file_parsing.vlm_clients import VLM
+from dsrag.azure._client_cache import get_async_azure_openai_client, get_azure_openai_client
+from dsrag.azure._retry import DEFAULT_MAX_ATTEMPTS, aretry_call, openai_retryable_errors, retry_call
 
+# Media types for supported image extensions; unknown extensions default to jpeg
+_EXT_TO_MIME = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+# Read size for streaming base64 encoding; a multiple of 3 so chunks encode without padding
+_ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
+# Number of encoded images kept in memory per instance, so retries and repeated
+# prompts for the same page don't re-read and re-encode the file
+DATA_URL_CACHE_SIZE = 32
+
+# Default limit on concurrent requests in make_llm_calls
+MAX_CONCURRENT_REQUESTS = 10
+
+# Date of the first API version that supports json_schema structured outputs
+STRUCTURED_OUTPUTS_API_VERSION = "2024-08-01"
+
+# Property used to wrap schemas whose root isn't an object, which structured outputs require
+_WRAPPER_KEY = "items"
+
+
+def _supports_structured_outputs(api_version: str) -> bool:
+    """
+    Whether an API version supports json_schema structured outputs.
+    
+    Versions are compared by their date, so "2024-08-01" and "2024-08-01-preview"
+    are the same version. Versions without a date (e.g. "preview" of the v1 API)
+    are newer than any dated one.
+    """
+    try:
+        version_date = date.fromisoformat(api_version[:10])
+    except ValueError:
+        return True
+    return version_date >= date.fromisoformat(STRUCTURED_OUTPUTS_API_VERSION)
+
+
+def _strict_json_schema(schema: Any) -> Optional[Any]:
+    """
+    Return a copy of schema that meets the strict structured-output rules.
+    
+    Objects get "additionalProperties": false. Returns None if the schema can't be
+    made strict without changing its meaning (an object with optional properties).
+    """
+    if isinstance(schema, list):
+        items = [_strict_json_schema(item) for item in schema]
+        return None if any(item is None for item in items) else items
+    if not isinstance(schema, dict):
+        return schema
+    
+    strict_schema = {}
+    for key, value in schema.items():
+        if isinstance(value, (dict, list)):
+            value = _strict_json_schema(value)
+            if value is None:
+                return None
+        strict_schema[key] = value
+    
+    if schema.get("type") == "object" and isinstance(schema.get("properties"), dict):
+        if set(schema.get("required", [])) != set(schema["properties"]):
+            return None
+        strict_schema.setdefault("additionalProperties", False)
+    return strict_schema
 
 class AzureOpenAIVLM(VLM):
     """
@@ -29,11 +104,14 @@ class AzureOpenAIVLM(VLM):
     - azure_endpoint: Azure OpenAI endpoint URL (optional, falls back to env var)
     - api_key: Azure OpenAI API key (optional, falls back to env var)
     - api_version: Azure API version (default: "2024-02-15-preview")
+    - max_attempts: Attempts per API call on transient errors (default: 5)
+    - cache_dir: Directory for caching responses on disk (optional, default: no caching)
     
     Behavior
     --------
     - Encodes images as base64 for API submission
-    - Supports JSON mode for structured outputs
+    - Enforces response schemas with structured outputs (json_schema) on API
+      versions from 2024-08-01-preview, and uses JSON mode on older versions
     - Uses Azure OpenAI's vision capabilities
     """
     
@@ -43,6 +121,8 @@ class AzureOpenAIVLM(VLM):
         azure_endpoint: Optional[str] = None,
         api_key: Optional[str] = None,
         api_version: str = "2024-02-15-preview",
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        cache_dir: Optional[str] = None,
     ) -> None:
         """
         Initialize Azure OpenAI VLM client.
@@ -52,9 +132,23 @@ class AzureOpenAIVLM(VLM):
             azure_endpoint: Azure OpenAI endpoint URL (falls back to AZURE_OPENAI_ENDPOINT env var)
             api_key: Azure OpenAI API key (falls back to AZURE_OPENAI_API_KEY env var)
             api_version: Azure OpenAI API version
+            max_attempts: Attempts per API call on rate limits and transient errors (1 disables retries)
+            cache_dir: If set, responses are cached on disk by image content and request
+                parameters, so repeated calls for the same page skip the API
         """
         self.deployment_name = deployment_name
         self.api_version = api_version
+        self.max_attempts = max_attempts
+        self.cache_dir = cache_dir
+        
+        # response_format per response schema, keyed by id(schema). Callers pass the
+        # same schema object on every page, so it's only converted once per instance.
+        self._response_formats: Dict[int, tuple] = {}
+        # Data URLs keyed by (path, mtime_ns, size), least recently used first
+        self._data_urls: "OrderedDict[tuple, str]" = OrderedDict()
+        self._data_urls_lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
         
         # Get credentials from parameters or environment
         self.azure_endpoint = azure_endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT")
@@ -72,64 +166,81 @@ class AzureOpenAIVLM(VLM):
                 "or AZURE_OPENAI_API_KEY environment variable"
             )
         
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
-            api_key=self.api_key,
-            api_version=self.api_version,
-            azure_endpoint=self.azure_endpoint,
-        )
+        # Cached client, shared by components with the same credentials
+        self.client = get_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
     
-    def _encode_image(self, image_path: str) -> str:
+    @property
+    def async_client(self) -> AsyncAzureOpenAI:
+        """Async client for the running event loop (async connections can't outlive their loop)."""
+        return get_async_azure_openai_client(self.api_key, self.api_version, self.azure_endpoint)
+    
+    def _encode_image(self, image_path: str, image_bytes: Optional[bytes] = None) -> str:
         """
-        Encode image file as base64 string.
+        Encode image file as a base64 data URL, reusing a recent encoding.
+        
+        Encodings are cached in memory by path, modification time and size, so
+        a file that is rewritten in place is encoded again.
         
         Args:
             image_path: Path to the image file
+            image_bytes: Contents of the file, if already read
         
         Returns:
-            Base64-encoded image string
+            Data URL of the form "data:<media type>;base64,<data>"
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._data_urls_lock:
+            data_url = self._data_urls.get(key)
+            if data_url is not None:
+                self._data_urls.move_to_end(key)
+                return data_url
+        
+        data_url = self._read_data_url(image_path, image_bytes)
+        with self._data_urls_lock:
+            self._data_urls[key] = data_url
+            self._data_urls.move_to_end(key)
+            while len(self._data_urls) > DATA_URL_CACHE_SIZE:
+                self._data_urls.popitem(last=False)
+        return data_url
     
-    def make_llm_call(
-        self,
-        image_path: str,
-        system_message: str,
-        response_schema: Optional[Dict[str, Any]] = None,
-        max_tokens: int = 4000,
-        temperature: float = 0.5,
-    ) -> str:
+    @staticmethod
+    def _read_data_url(image_path: str, image_bytes: Optional[bytes] = None) -> str:
         """
-        Perform a VLM call to Azure OpenAI and return the response text.
+        Read and encode image file as a base64 data URL.
         
-        Args:
-            image_path: Path to the image file to analyze
-            system_message: System/user message with instructions
-            response_schema: Optional JSON schema for structured output
-            max_tokens: Maximum tokens in response
-            temperature: Sampling temperature (0-2)
-        
-        Returns:
-            Response text from the model
+        The prefix and the chunked encoding are written into one buffer, so the
+        encoded image is never copied into a second string. The file is only
+        read if image_bytes isn't given.
         """
-        # Encode the image
-        base64_image = self._encode_image(image_path)
-        
         # Determine image format from file extension
         image_ext = os.path.splitext(image_path)[1].lower()
-        if image_ext in ['.jpg', '.jpeg']:
-            media_type = "image/jpeg"
-        elif image_ext == '.png':
-            media_type = "image/png"
-        elif image_ext == '.gif':
-            media_type = "image/gif"
-        elif image_ext == '.webp':
-            media_type = "image/webp"
+        media_type = _EXT_TO_MIME.get(image_ext, "image/jpeg")
+        
+        buffer = io.BytesIO()
+        buffer.write(f"data:{media_type};base64,".encode("ascii"))
+        if image_bytes is not None:
+            buffer.write(base64.b64encode(image_bytes))
         else:
-            # Default to jpeg if unknown
-            media_type = "image/jpeg"
+            with open(image_path, "rb") as image_file:
+                for chunk in iter(lambda: image_file.read(_ENCODE_CHUNK_SIZE), b""):
+                    buffer.write(base64.b64encode(chunk))
+        return buffer.getvalue().decode("ascii")
+    
+    def _build_api_params(
+        self,
+        data_url: str,
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+    ) -> tuple:
+        """
+        Build the chat completion parameters for one image.
         
+        Returns:
+            Tuple of (api_params, wrapped); see _response_format for wrapped
+        """
         # Build the message content
         message_content = [
             {
@@ -139,7 +250,7 @@ class AzureOpenAIVLM(VLM):
             {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:{media_type};base64,{base64_image}"
+                    "url": data_url
                 }
             }
         ]
@@ -160,14 +271,253 @@ class AzureOpenAIVLM(VLM):
             "temperature": temperature,
         }
         
-        # Add response format for JSON mode if schema provided
+        # Enforce the schema server-side where the API supports it, else fall back to JSON mode
+        wrapped = False
         if response_schema is not None:
-            api_params["response_format"] = {"type": "json_object"}
+            cached = self._response_formats.get(id(response_schema))
+            # Keep a reference to the schema so its id can't be reused by another object
+            if cached is None or cached[0] is not response_schema:
+                if len(self._response_formats) >= 16:
+                    self._response_formats.clear()  # Callers building a new schema per call
+                cached = (response_schema, *self._response_format(response_schema))
+                self._response_formats[id(response_schema)] = cached
+            _, api_params["response_format"], wrapped = cached
+        return api_params, wrapped
+    
+    @staticmethod
+    def _response_text(response, wrapped: bool) -> str:
+        """Extract the response text, removing the schema wrapper object if one was added."""
+        content = response.choices[0].message.content.strip()
+        if wrapped:
+            try:
+                content = json.dumps(json.loads(content)[_WRAPPER_KEY])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                pass  # Leave malformed output for the caller's own parsing and retries
+        return content
+    
+    def _cache_path(
+        self,
+        image_bytes: bytes,
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        """Return the cache file for a request."""
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        # The API version decides how response_schema is sent (json_schema or JSON mode)
+        request = json.dumps(
+            [self.deployment_name, self.api_version, system_message, response_schema, max_tokens, temperature],
+            sort_keys=True,
+        )
+        request_hash = hashlib.sha256(request.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{image_hash}{request_hash}.json")
+    
+    def _cached_response(
+        self,
+        image_path: str,
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+    ) -> tuple:
+        """
+        Look a request up in the response cache.
+        
+        Returns:
+            Tuple of (cache_path, response_text, image_bytes): the cache file (None if
+            caching is disabled), the cached response (None on a miss), and the image
+            file's contents read to key the cache, reused to encode it on a miss
+        """
+        if not self.cache_dir:
+            return None, None, None
+        with open(image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+        cache_path = self._cache_path(image_bytes, system_message, response_schema, max_tokens, temperature)
+        return cache_path, self._read_cache(cache_path), image_bytes
+    
+    @staticmethod
+    def _read_cache(cache_path: Optional[str]) -> Optional[str]:
+        """Return the cached response text, or None on a miss."""
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r") as f:
+            return json.load(f)["response"]
+    
+    def _write_cache(self, cache_path: Optional[str], response_text: str) -> None:
+        """Atomically write a response to the cache, so readers never see a partial file."""
+        if cache_path is None:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"response": response_text}, f)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    
+    def make_llm_call(
+        self,
+        image_path: str,
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 4000,
+        temperature: float = 0.5,
+    ) -> str:
+        """
+        Perform a VLM call to Azure OpenAI and return the response text.
+        
+        Args:
+            image_path: Path to the image file to analyze
+            system_message: System/user message with instructions
+            response_schema: Optional JSON schema for structured output
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-2)
+        
+        Returns:
+            Response text from the model
+        """
+        cache_path, cached, image_bytes = self._cached_response(
+            image_path, system_message, response_schema, max_tokens, temperature
+        )
+        if cached is not None:
+            return cached
+        
+        data_url = self._encode_image(image_path, image_bytes)
+        api_params, wrapped = self._build_api_params(
+            data_url, system_message, response_schema, max_tokens, temperature
+        )
         
         # Make the API call
-        response = self.client.chat.completions.create(**api_params)
+        response = retry_call(
+            self.client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            **api_params,
+        )
+        response_text = self._response_text(response, wrapped)
+        self._write_cache(cache_path, response_text)
+        return response_text
+    
+    async def amake_llm_call(
+        self,
+        image_path: str,
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 4000,
+        temperature: float = 0.5,
+    ) -> str:
+        """
+        Async version of make_llm_call.
         
-        return response.choices[0].message.content.strip()
+        The image is encoded in a worker thread, so encoding one image overlaps
+        with requests already in flight for others.
+        
+        Args:
+            image_path: Path to the image file to analyze
+            system_message: System/user message with instructions
+            response_schema: Optional JSON schema for structured output
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-2)
+        
+        Returns:
+            Response text from the model
+        """
+        cache_path, cached, image_bytes = await asyncio.to_thread(
+            self._cached_response, image_path, system_message, response_schema, max_tokens, temperature
+        )
+        if cached is not None:
+            return cached
+        
+        data_url = await asyncio.to_thread(self._encode_image, image_path, image_bytes)
+        api_params, wrapped = self._build_api_params(
+            data_url, system_message, response_schema, max_tokens, temperature
+        )
+        
+        response = await aretry_call(
+            self.async_client.chat.completions.create,
+            max_attempts=self.max_attempts,
+            retry_on=openai_retryable_errors(),
+            **api_params,
+        )
+        response_text = self._response_text(response, wrapped)
+        if cache_path is not None:
+            await asyncio.to_thread(self._write_cache, cache_path, response_text)
+        return response_text
+    
+    def make_llm_calls(
+        self,
+        image_paths: List[str],
+        system_message: str,
+        response_schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 4000,
+        temperature: float = 0.5,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> List[str]:
+        """
+        Run make_llm_call over many images concurrently.
+        
+        Runs its own event loop, so it must not be called from async code; use
+        amake_llm_call with asyncio.gather there instead.
+        
+        Args:
+            image_paths: Paths to the image files to analyze
+            system_message: System/user message with instructions
+            response_schema: Optional JSON schema for structured output
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-2)
+            max_concurrency: Maximum number of requests in flight at once
+        
+        Returns:
+            Response texts in the same order as image_paths
+        """
+        async def run_all() -> List[str]:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def run_one(image_path: str) -> str:
+                async with semaphore:
+                    return await self.amake_llm_call(
+                        image_path,
+                        system_message,
+                        response_schema=response_schema,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                    )
+            
+            return await asyncio.gather(*[run_one(image_path) for image_path in image_paths])
+        
+        return asyncio.run(run_all())
+    
+    def _response_format(self, response_schema: Dict[str, Any]) -> tuple:
+        """
+        Build the response_format parameter for a response schema.
+        
+        Args:
+            response_schema: JSON schema for structured output
+        
+        Returns:
+            Tuple of (response_format, wrapped), where wrapped is True if the schema
+            was placed under a wrapper object that must be removed from the output
+        """
+        if not _supports_structured_outputs(self.api_version):
+            return {"type": "json_object"}, False
+        
+        wrapped = response_schema.get("type") != "object"
+        if wrapped:
+            response_schema = {
+                "type": "object",
+                "properties": {_WRAPPER_KEY: response_schema},
+                "required": [_WRAPPER_KEY],
+            }
+        
+        strict_schema = _strict_json_schema(response_schema)
+        json_schema = {
+            "name": "response",
+            "strict": strict_schema is not None,
+            "schema": strict_schema if strict_schema is not None else response_schema,
+        }
+        return {"type": "json_schema", "json_schema": json_schema}, wrapped
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -182,4 +532,6 @@ class AzureOpenAIVLM(VLM):
             "azure_endpoint": self.azure_endpoint,
             "api_key": self.api_key,
             "api_version": self.api_version,
+            "max_attempts": self.max_attempts,
+            "cache_dir": self.cache_dir,
         }
@@ -1,27 +1,208 @@
 """Azure Blob Storage implementation for dsRAG file system."""
 
 import os
-import io
+import asyncio
+import atexit
+import hashlib
+import tempfile
 import json
-from typing import List, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
 from datetime import datetime
 
 try:
-    from azure.storage.blob import BlobServiceClient, ContentSettings
-    from azure.core.exceptions import ResourceNotFoundError
+    import requests  # Installed with azure-core, which uses it for the sync transport
+    from azure.storage.blob import BlobServiceClient, ContentSettings, ExponentialRetry
+    from azure.core import MatchConditions
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.core.exceptions import AzureError, ResourceNotFoundError, ResourceNotModifiedError
 except ImportError:
     raise ImportError(
         "Azure storage dependencies not found. Install with: pip install 'dsrag[azure-storage]'"
     )
 
-import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from dsrag.dsparse.file_parsing.file_system import FileSystem
+# orjson is an optional speedup for JSON encoding and decoding; the stdlib json module is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from dsrag.dsparse.file_parsing.file_system import FileSystem, page_number_from_path
+
+# Retries for transient storage errors (timeouts, 5xx, throttling): waits of about 1, 3, 5, 9
+# and 17 seconds, instead of the SDK default of 15, 18 and 24 seconds
+STORAGE_RETRY_TOTAL = 5
+STORAGE_RETRY_INITIAL_BACKOFF = 1
+STORAGE_RETRY_INCREMENT_BASE = 2
+STORAGE_RETRY_JITTER = 1
+
+# Downloads are latency-bound, so many run at once
+MAX_DOWNLOAD_WORKERS = 32
+
+# Default parallel connections used to transfer each individual blob
+MAX_CONCURRENCY_PER_BLOB = 16
+
+# Default transfer sizes: blobs up to MAX_SINGLE_GET_SIZE are fetched in one request,
+# larger ones in MAX_CHUNK_GET_SIZE ranges downloaded in parallel. Larger ranges than
+# the SDK's 4 MiB default mean fewer round trips per blob.
+MAX_CHUNK_GET_SIZE = 16 * 1024 * 1024
+MAX_SINGLE_GET_SIZE = 64 * 1024 * 1024
+
+# Default size of each block when uploading blobs too large for a single request
+MAX_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Encoded images larger than this are spooled to disk before upload
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+# Options for encoding page images
+JPEG_SAVE_OPTIONS = {'format': 'JPEG'}
+
+# Maximum number of sub-requests in one Blob Batch request
+MAX_BATCH_DELETE_SIZE = 256
+
+# Number of batch delete requests in flight at once
+MAX_DELETE_WORKERS = 8
+
+# Small uploads (e.g. per-page content) are latency-bound too
+MAX_UPLOAD_WORKERS = 32
+
+# Minimum size of the sync client's HTTP connection pool. requests keeps only 10 idle
+# connections per host by default, so with more threads than that in flight, extra
+# connections are opened and discarded ("Connection pool is full") on every request.
+MIN_CONNECTION_POOL_SIZE = max(MAX_DOWNLOAD_WORKERS, MAX_UPLOAD_WORKERS)
+
+# Buffered error logs are flushed once this many are pending, or after ERROR_FLUSH_INTERVAL seconds
+ERROR_FLUSH_SIZE = 50
+ERROR_FLUSH_INTERVAL = 5.0
+
+# Maximum number of JSON blobs kept in the in-process cache
+MAX_JSON_CACHE_ENTRIES = 1024
+
+# Default seconds a cached JSON blob is served without revalidating it against Azure;
+# 0 revalidates every read with a conditional GET, so other writers are never missed
+JSON_CACHE_TTL = 0.0
+
+# Maximum number of documents whose page image listing is kept in the in-process cache
+MAX_PAGE_LISTING_CACHE_ENTRIES = 256
+
+# Page image extensions, in the order they're tried for backward compatibility
+PAGE_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+
+# Content types of image files uploaded as is
+IMAGE_CONTENT_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png'}
+
+# Images given as these types are already encoded, and are uploaded without re-encoding
+ENCODED_IMAGE_TYPES = (bytes, bytearray, memoryview)
+
+
+# Sync clients shared by AzureBlobStorage instances: (credentials, transfer settings) -> client
+_blob_service_clients: dict = {}
+_blob_service_clients_lock = threading.Lock()
+
+# Containers already checked (or created) through a shared client: (client, container name)
+_verified_containers: set = set()
+
+
+def close_shared_blob_service_clients() -> None:
+    """Close all shared BlobServiceClients; instances created afterwards open new ones."""
+    with _blob_service_clients_lock:
+        for client in _blob_service_clients.values():
+            client.close()
+        _blob_service_clients.clear()
+        _verified_containers.clear()
+
+
+# Instances with buffered error logs, flushed at interpreter exit
+_pending_error_logs: "weakref.WeakSet" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_pending_error_logs() -> None:
+    """Write error logs still buffered when the interpreter exits."""
+    for storage in list(_pending_error_logs):
+        storage.flush_errors()
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize obj to compact UTF-8 JSON, with orjson if it's installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # Types orjson doesn't support, e.g. subclasses of float
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(raw: bytes):
+    """Parse UTF-8 JSON bytes, with orjson if it's installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _raise_on_failed_deletes(statuses: List[int]) -> None:
+    """
+    Raise if any sub-request of a batch delete failed.
+    
+    Blobs that are already gone (404, e.g. deleted concurrently) count as deleted.
+    """
+    failed = [status for status in statuses if status >= 400 and status != 404]
+    if failed:
+        raise AzureError(f"Failed to delete {len(failed)} blobs (statuses {sorted(set(failed))})")
+
+
+def _image_content_type(file_name: str) -> str:
+    """Content type of an image file, from its extension (JPEG if it's unknown)."""
+    return IMAGE_CONTENT_TYPES.get(os.path.splitext(file_name)[1].lower(), 'image/jpeg')
+
+
+def _select_page_blobs(blob_names, prefix: str) -> dict:
+    """
+    Map each page number to its image blob, given the blob names under prefix.
+    
+    If a page was stored under several extensions, the first in
+    PAGE_IMAGE_EXTENSIONS wins, as when they were tried one by one.
+    """
+    rank = {ext: i for i, ext in enumerate(PAGE_IMAGE_EXTENSIONS)}
+    page_blobs = {}
+    for name in blob_names:
+        stem, ext = os.path.splitext(name[len(prefix):])
+        number = stem[len("page_"):]
+        if ext not in rank or not stem.startswith("page_") or not number.isdigit():
+            continue
+        page_number = int(number)
+        current = page_blobs.get(page_number)
+        if current is None or rank[ext] < rank[os.path.splitext(current)[1]]:
+            page_blobs[page_number] = name
+    return page_blobs
+
+
+async def _gather_limited(coroutines, limit: int, return_exceptions: bool = False) -> list:
+    """Await coroutines concurrently, at most limit at a time, and return results in order."""
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+    
+    return await asyncio.gather(
+        *[run(coroutine) for coroutine in coroutines], return_exceptions=return_exceptions
+    )
 
 
 class AzureBlobStorage(FileSystem):
     """
     Uses Azure Blob Storage to store and retrieve page image files and other data.
+    
+    Credentials that aren't passed in are read from the environment:
+    AZURE_STORAGE_CONNECTION_STRING, or AZURE_STORAGE_ACCOUNT_NAME and
+    AZURE_STORAGE_ACCOUNT_KEY. to_dict never includes the connection string or
+    account key, so a configuration restored with from_dict (e.g. when a
+    knowledge base is loaded) gets them from these variables.
     """
     
     def __init__(
@@ -31,6 +212,11 @@ class AzureBlobStorage(FileSystem):
         connection_string: Optional[str] = None,
         account_name: Optional[str] = None,
         account_key: Optional[str] = None,
+        max_concurrency: int = MAX_CONCURRENCY_PER_BLOB,
+        max_chunk_get_size: int = MAX_CHUNK_GET_SIZE,
+        max_single_get_size: int = MAX_SINGLE_GET_SIZE,
+        max_block_size: int = MAX_BLOCK_SIZE,
+        json_cache_ttl: float = JSON_CACHE_TTL,
     ):
         """
         Initialize Azure Blob Storage file system.
@@ -41,112 +227,388 @@ class AzureBlobStorage(FileSystem):
             connection_string: Azure Storage connection string (preferred method)
             account_name: Azure Storage account name (alternative to connection_string)
             account_key: Azure Storage account key (alternative to connection_string)
+            max_concurrency: Parallel connections used to upload or download each blob
+            max_chunk_get_size: Size in bytes of each ranged request when downloading large blobs
+            max_single_get_size: Blobs up to this size in bytes are downloaded in a single request
+            max_block_size: Size in bytes of each block when uploading large blobs. Up to
+                max_concurrency blocks or ranges are buffered per transfer, so raising these
+                sizes together with max_concurrency increases peak memory use.
+            json_cache_ttl: Seconds a cached JSON blob (e.g. page content) is served without
+                checking Azure for a newer version. By default every read is revalidated,
+                which costs a 304 response for an unchanged blob. Raising it saves those
+                requests, but writes by other processes may then take this long to appear.
         """
         super().__init__(base_path)
         self.container_name = container_name
+        self.max_concurrency = max_concurrency
+        self.max_chunk_get_size = max_chunk_get_size
+        self.max_single_get_size = max_single_get_size
+        self.max_block_size = max_block_size
+        self.json_cache_ttl = json_cache_ttl
+        
+        # Fall back to the environment only when no secret was passed in, so explicit
+        # account credentials aren't overridden by a connection string in the environment
+        if not connection_string and not account_key:
+            connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
+            if not connection_string:
+                account_key = os.environ.get("AZURE_STORAGE_ACCOUNT_KEY")
+        account_name = account_name or os.environ.get("AZURE_STORAGE_ACCOUNT_NAME")
+        
         self.connection_string = connection_string
         self.account_name = account_name
         self.account_key = account_key
         
-        # Initialize blob service client
-        if connection_string:
-            self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        elif account_name and account_key:
-            account_url = f"https://{account_name}.blob.core.windows.net"
-            self.blob_service_client = BlobServiceClient(
-                account_url=account_url,
-                credential=account_key
-            )
-        else:
+        if not connection_string and not (account_name and account_key):
             raise ValueError(
                 "Either connection_string or both account_name and account_key must be provided"
             )
         
+        # Instances with the same account and transfer settings share one client, and with
+        # it one connection pool, instead of each opening their own connections
+        client_key = (
+            connection_string, account_name, account_key,
+            max_concurrency, max_chunk_get_size, max_single_get_size, max_block_size,
+        )
+        with _blob_service_clients_lock:
+            self.blob_service_client = _blob_service_clients.get(client_key)
+            if self.blob_service_client is None:
+                self.blob_service_client = self._create_blob_service_client()
+                _blob_service_clients[client_key] = self.blob_service_client
+        
+        # One container client for all operations, so they share its pipeline and connection pool
+        self.container_client = self.blob_service_client.get_container_client(container_name)
+        
+        # LRU cache of JSON blobs: blob path -> (etag, raw bytes, time last validated)
+        self._json_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._json_cache_lock = threading.Lock()
+        
+        # LRU cache of page image listings: (kb_id, doc_id) -> {page number: blob path}
+        self._page_blob_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._page_blob_cache_lock = threading.Lock()
+        
+        # Error log lines waiting to be appended: blob path -> JSON lines
+        self._error_buffer: dict = {}
+        self._error_count = 0
+        self._error_flush_timer: Optional[threading.Timer] = None
+        self._error_lock = threading.Lock()
+        
         # Ensure container exists
         self._ensure_container_exists()
     
+    def _create_blob_service_client(self) -> "BlobServiceClient":
+        """Create the sync client for this instance's account and transfer settings."""
+        client_kwargs = self._client_kwargs(ExponentialRetry)
+        client_kwargs["transport"] = self._requests_transport()
+        if self.connection_string:
+            return BlobServiceClient.from_connection_string(self.connection_string, **client_kwargs)
+        return BlobServiceClient(
+            account_url=f"https://{self.account_name}.blob.core.windows.net",
+            credential=self.account_key,
+            **client_kwargs,
+        )
+    
+    @staticmethod
+    def _retry_policy(retry_class):
+        """Build the exponential retry policy used by the sync and async clients."""
+        return retry_class(
+            initial_backoff=STORAGE_RETRY_INITIAL_BACKOFF,
+            increment_base=STORAGE_RETRY_INCREMENT_BASE,
+            retry_total=STORAGE_RETRY_TOTAL,
+            random_jitter_range=STORAGE_RETRY_JITTER,
+        )
+
+    def _client_kwargs(self, retry_class) -> dict:
+        """Keyword arguments shared by the sync and async client constructors."""
+        return {
+            "retry_policy": self._retry_policy(retry_class),
+            "max_chunk_get_size": self.max_chunk_get_size,
+            "max_single_get_size": self.max_single_get_size,
+            "max_block_size": self.max_block_size,
+        }
+
+    def _requests_transport(self) -> "RequestsTransport":
+        """Sync transport with a connection pool sized for the parallel transfers."""
+        pool_size = max(self.max_concurrency, MIN_CONNECTION_POOL_SIZE)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return RequestsTransport(session=session, session_owner=True)
+
     def _ensure_container_exists(self) -> None:
-        """Create container if it doesn't exist."""
+        """
+        Create container if it doesn't exist.
+        
+        The check is made once per shared client and container, so instances created
+        later (e.g. when a knowledge base is loaded again) don't repeat the request.
+        """
+        key = (self.blob_service_client, self.container_name)
+        with _blob_service_clients_lock:
+            if key in _verified_containers:
+                return
         try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
-            container_client.get_container_properties()
+            self.container_client.get_container_properties()
         except ResourceNotFoundError:
-            self.blob_service_client.create_container(self.container_name)
+            self.container_client.create_container()
+        with _blob_service_clients_lock:
+            _verified_containers.add(key)
     
     def _get_blob_client(self, blob_path: str):
         """Get a blob client for the specified path."""
-        return self.blob_service_client.get_blob_client(
-            container=self.container_name,
-            blob=blob_path
-        )
+        return self.container_client.get_blob_client(blob_path)
+    
+    def _download_json(self, blob_path: str):
+        """
+        Download and parse a JSON blob, using the in-process cache when it's current.
+        
+        A cached blob is fetched with an If-None-Match conditional GET on its
+        etag, so an unchanged blob costs a 304 response instead of the full
+        download while a blob changed by another writer is always picked up.
+        Only if json_cache_ttl is set is a blob validated within that many
+        seconds served without a request. Raw bytes are cached and parsed on
+        each call, so callers never share mutable results.
+        """
+        now = time.monotonic()
+        with self._json_cache_lock:
+            cached = self._json_cache.get(blob_path)
+            if cached is not None and now - cached[2] < self.json_cache_ttl:
+                self._json_cache.move_to_end(blob_path)
+                return _json_loads(cached[1])
+        
+        blob_client = self._get_blob_client(blob_path)
+        try:
+            if cached is not None:
+                download_stream = blob_client.download_blob(
+                    etag=cached[0], match_condition=MatchConditions.IfModified
+                )
+            else:
+                download_stream = blob_client.download_blob()
+            raw = download_stream.readall()
+        except ResourceNotModifiedError:
+            etag, raw = cached[0], cached[1]
+        else:
+            etag = download_stream.properties.etag
+        
+        self._cache_json(blob_path, etag, raw, now)
+        return _json_loads(raw)
+    
+    def _cache_json(self, blob_path: str, etag: str, raw: bytes, validated_at: float) -> None:
+        """Record the current contents of a JSON blob, evicting the least recently used entries."""
+        with self._json_cache_lock:
+            self._json_cache[blob_path] = (etag, raw, validated_at)
+            self._json_cache.move_to_end(blob_path)
+            while len(self._json_cache) > MAX_JSON_CACHE_ENTRIES:
+                self._json_cache.popitem(last=False)
+    
+    def _json_upload_kwargs(self, data: bytes) -> dict:
+        """Keyword arguments for uploading a JSON blob with the sync or async client."""
+        return {
+            # Passing the length lets blobs larger than the single-put limit
+            # (e.g. elements.json of a long document) upload as parallel blocks
+            "length": len(data),
+            "overwrite": True,
+            "content_settings": ContentSettings(
+                content_type='application/json',
+                content_md5=bytearray(hashlib.md5(data).digest()),
+            ),
+            "max_concurrency": self.max_concurrency,
+        }
+    
+    def _after_json_upload(self, blob_path: str, data: bytes, response) -> None:
+        """Cache a JSON blob just written, so reading it back is at most a conditional GET."""
+        etag = response.get("etag") if response else None
+        if etag:
+            self._cache_json(blob_path, etag, data, time.monotonic())
+        else:
+            self._evict_json(blob_path)
+    
+    def _upload_json(self, blob_path: str, data: bytes) -> None:
+        """Upload a JSON blob and cache what was written."""
+        try:
+            response = self._get_blob_client(blob_path).upload_blob(data, **self._json_upload_kwargs(data))
+        except Exception:
+            self._evict_json(blob_path)
+            raise
+        self._after_json_upload(blob_path, data, response)
+    
+    def _evict_json(self, blob_path: str) -> None:
+        """Drop a blob from the JSON cache after overwriting it."""
+        with self._json_cache_lock:
+            self._json_cache.pop(blob_path, None)
+    
+    def _evict_json_prefix(self, prefix: str) -> None:
+        """Drop all cached blobs under a prefix after deleting it."""
+        with self._json_cache_lock:
+            for blob_path in [path for path in self._json_cache if path.startswith(prefix)]:
+                del self._json_cache[blob_path]
     
-    def create_directory(self, kb_id: str, doc_id: str) -> None:
+    def _cached_page_blobs(self, kb_id: str, doc_id: str, pages: range) -> Optional[dict]:
+        """
+        Return the cached page listing of a document, if it has every page in pages.
+        
+        Pages that may have been added since the listing was cached cause a miss,
+        so a stale listing is never trusted for a page it doesn't know about.
+        """
+        with self._page_blob_cache_lock:
+            page_blobs = self._page_blob_cache.get((kb_id, doc_id))
+            if page_blobs is None or any(i not in page_blobs for i in pages):
+                return None
+            self._page_blob_cache.move_to_end((kb_id, doc_id))
+            return page_blobs
+    
+    def _cache_page_blobs(self, kb_id: str, doc_id: str, blob_names: List[str]) -> dict:
+        """Build a document's page listing from its page_* blob names and cache it."""
+        page_blobs = _select_page_blobs(blob_names, f"{kb_id}/{doc_id}/")
+        with self._page_blob_cache_lock:
+            self._page_blob_cache[(kb_id, doc_id)] = page_blobs
+            self._page_blob_cache.move_to_end((kb_id, doc_id))
+            while len(self._page_blob_cache) > MAX_PAGE_LISTING_CACHE_ENTRIES:
+                self._page_blob_cache.popitem(last=False)
+        return page_blobs
+    
+    def _evict_page_blobs(self, kb_id: str, doc_id: Optional[str] = None) -> None:
+        """Drop cached page listings of a document, or of a whole knowledge base if doc_id is None."""
+        with self._page_blob_cache_lock:
+            for key in list(self._page_blob_cache):
+                if key[0] == kb_id and doc_id in (None, key[1]):
+                    del self._page_blob_cache[key]
+    
+    def create_directory(self, kb_id: str, doc_id: str, overwrite: bool = True) -> None:
         """
         This function is not needed for Azure Blob Storage as directories are virtual.
-        We'll just ensure any existing files in this path are deleted.
+        We'll just ensure any existing files in this path are deleted, so pages left
+        from an earlier version of the document aren't served.
+        
+        Args:
+            overwrite: Delete existing files under the path. Callers that know the
+                document is new can pass False to skip the listing request. dsRAG's own
+                ingestion calls this through the FileSystem interface, which has no such
+                argument, so it always clears the path.
         """
-        prefix = f"{kb_id}/{doc_id}/"
-        self.delete_directory(kb_id, doc_id)
+        if overwrite:
+            self.delete_directory(kb_id, doc_id)
+    
+    def _delete_prefix(self, prefix: str) -> None:
+        """
+        Delete all blobs under a prefix.
+        
+        Blobs are deleted with the Blob Batch API, up to 256 per request, and a
+        few batch requests run concurrently. Blobs that no longer exist are skipped.
+        """
+        container_client = self.container_client
+        blob_names = [
+            blob.name
+            for blob in container_client.list_blobs(name_starts_with=prefix, results_per_page=5000)
+        ]
+        batches = [
+            blob_names[i:i + MAX_BATCH_DELETE_SIZE]
+            for i in range(0, len(blob_names), MAX_BATCH_DELETE_SIZE)
+        ]
+        
+        def delete_batch(batch):
+            responses = container_client.delete_blobs(*batch, raise_on_any_failure=False)
+            _raise_on_failed_deletes([response.status_code for response in responses])
+        
+        with ThreadPoolExecutor(max_workers=MAX_DELETE_WORKERS) as executor:
+            # list() re-raises the first failed batch
+            list(executor.map(delete_batch, batches))
     
     def delete_directory(self, kb_id: str, doc_id: str) -> None:
         """Delete all blobs in the specified directory."""
         prefix = f"{kb_id}/{doc_id}/"
-        container_client = self.blob_service_client.get_container_client(self.container_name)
-        
         try:
-            blob_list = container_client.list_blobs(name_starts_with=prefix)
-            for blob in blob_list:
-                blob_client = self._get_blob_client(blob.name)
-                blob_client.delete_blob()
-        except Exception as e:
+            self._delete_prefix(prefix)
+        except AzureError as e:
             print(f"Error deleting directory {prefix}: {e}")
+        finally:
+            self._evict_page_blobs(kb_id, doc_id)
+            self._evict_json_prefix(prefix)
     
     def delete_kb(self, kb_id: str) -> None:
         """Delete all blobs for a knowledge base."""
-        prefix = f"{kb_id}/"
-        container_client = self.blob_service_client.get_container_client(self.container_name)
-        
         try:
-            blob_list = container_client.list_blobs(name_starts_with=prefix)
-            for blob in blob_list:
-                blob_client = self._get_blob_client(blob.name)
-                blob_client.delete_blob()
-        except Exception as e:
+            self._delete_prefix(f"{kb_id}/")
+        except AzureError as e:
             print(f"Error deleting knowledge base {kb_id}: {e}")
+        finally:
+            self._evict_page_blobs(kb_id)
+            self._evict_json_prefix(f"{kb_id}/")
     
     def save_json(self, kb_id: str, doc_id: str, file_name: str, file: dict) -> None:
         """Save JSON data to Azure Blob Storage."""
         blob_path = f"{kb_id}/{doc_id}/{file_name}"
-        json_data = json.dumps(file, indent=2)
-        
-        blob_client = self._get_blob_client(blob_path)
         try:
-            content_settings = ContentSettings(content_type='application/json')
-            blob_client.upload_blob(
-                json_data,
-                overwrite=True,
-                content_settings=content_settings
-            )
+            self._upload_json(blob_path, _json_dumps(file))
         except Exception as e:
             raise RuntimeError(f"Failed to upload JSON to Azure Blob Storage: {e}") from e
     
     def save_image(self, kb_id: str, doc_id: str, file_name: str, image: any) -> None:
-        """Save image to Azure Blob Storage."""
-        blob_path = f"{kb_id}/{doc_id}/{file_name}"
-        buffer = io.BytesIO()
-        image.save(buffer, format='JPEG')
-        buffer.seek(0)
+        """
+        Save image to Azure Blob Storage.
         
+        A PIL image is encoded as JPEG. Image bytes (e.g. read from a file, or kept
+        from an earlier attempt) are uploaded as is, typed by file_name's extension.
+        """
+        blob_path = f"{kb_id}/{doc_id}/{file_name}"
         blob_client = self._get_blob_client(blob_path)
+        
+        if isinstance(image, ENCODED_IMAGE_TYPES):
+            data = bytes(image)
+            try:
+                blob_client.upload_blob(
+                    data,
+                    length=len(data),
+                    overwrite=True,
+                    content_settings=ContentSettings(content_type=_image_content_type(file_name)),
+                    max_concurrency=self.max_concurrency,
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to upload image to Azure Blob Storage: {e}") from e
+            finally:
+                self._evict_page_blobs(kb_id, doc_id)
+            return
+        
+        # Encode into a spooled file: small images stay in memory, large ones spill to disk
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            image.save(buffer, **JPEG_SAVE_OPTIONS)
+            length = buffer.tell()
+            buffer.seek(0)
+            
+            try:
+                content_settings = ContentSettings(content_type='image/jpeg')
+                blob_client.upload_blob(
+                    buffer,
+                    length=length,
+                    overwrite=True,
+                    content_settings=content_settings,
+                    max_concurrency=self.max_concurrency,
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to upload image to Azure Blob Storage: {e}") from e
+            finally:
+                self._evict_page_blobs(kb_id, doc_id)
+    
+    def save_image_from_path(self, kb_id: str, doc_id: str, file_name: str, image_path: str) -> None:
+        """
+        Upload an image file as is, without decoding and re-encoding it.
+        
+        The file is streamed from disk. Its content type is taken from its extension.
+        """
+        blob_path = f"{kb_id}/{doc_id}/{file_name}"
+        content_type = _image_content_type(image_path)
         try:
-            content_settings = ContentSettings(content_type='image/jpeg')
-            blob_client.upload_blob(
-                buffer,
-                overwrite=True,
-                content_settings=content_settings
-            )
+            with open(image_path, 'rb') as f:
+                self._get_blob_client(blob_path).upload_blob(
+                    f,
+                    length=os.path.getsize(image_path),
+                    overwrite=True,
+                    content_settings=ContentSettings(content_type=content_type),
+                    max_concurrency=self.max_concurrency,
+                )
         except Exception as e:
             raise RuntimeError(f"Failed to upload image to Azure Blob Storage: {e}") from e
+        finally:
+            self._evict_page_blobs(kb_id, doc_id)
     
     def get_files(self, kb_id: str, doc_id: str, page_start: int, page_end: int) -> List[str]:
         """
@@ -164,42 +626,47 @@ class AzureBlobStorage(FileSystem):
         if page_start is None or page_end is None:
             return []
         
-        file_paths = []
-        output_folder = os.path.join(self.base_path, kb_id, doc_id)
+        os.makedirs(os.path.join(self.base_path, kb_id, doc_id), exist_ok=True)
         
-        # Create local directory if needed
-        if not os.path.exists(output_folder):
-            try:
-                os.makedirs(output_folder)
-            except FileExistsError:
-                pass
-        
-        # Try multiple extensions for backward compatibility
-        for i in range(page_start, page_end + 1):
-            found_file = False
-            for ext in ['.jpg', '.jpeg', '.png']:
-                blob_path = f"{kb_id}/{doc_id}/page_{i}{ext}"
-                local_path = os.path.join(self.base_path, blob_path)
-                
-                blob_client = self._get_blob_client(blob_path)
-                try:
-                    # Download the blob
-                    with open(local_path, 'wb') as f:
-                        download_stream = blob_client.download_blob()
-                        f.write(download_stream.readall())
-                    file_paths.append(local_path)
-                    found_file = True
-                    break
-                except ResourceNotFoundError:
-                    continue
-                except Exception as e:
-                    print(f"Error downloading blob {blob_path}: {e}")
-                    continue
-            
-            if not found_file:
-                print(f"Warning: No image file found for page {i} in Azure Blob Storage")
+        # One listing finds each page's blob, instead of probing every extension with a GET.
+        # It's cached, since retrieval fetches page ranges of the same document repeatedly.
+        pages = range(page_start, page_end + 1)
+        page_blobs = self._cached_page_blobs(kb_id, doc_id, pages)
+        if page_blobs is None:
+            blob_names = [
+                blob.name
+                for blob in self.container_client.list_blobs(
+                    name_starts_with=f"{kb_id}/{doc_id}/page_", results_per_page=5000
+                )
+            ]
+            page_blobs = self._cache_page_blobs(kb_id, doc_id, blob_names)
+        
+        # Download pages concurrently; map preserves page order
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            results = executor.map(lambda i: self._download_page(page_blobs.get(i), i), pages)
+            return [path for path in results if path is not None]
+    
+    def _download_blob(self, blob_path: str) -> str:
+        """Stream a blob to the matching path under base_path and return that path."""
+        local_path = os.path.join(self.base_path, blob_path)
+        blob_client = self._get_blob_client(blob_path)
         
-        return file_paths
+        # Start the download before opening the file so a missing blob leaves no empty file behind
+        download_stream = blob_client.download_blob(max_concurrency=self.max_concurrency)
+        with open(local_path, 'wb') as f:
+            download_stream.readinto(f)
+        return local_path
+    
+    def _download_page(self, blob_path: Optional[str], page_number: int) -> Optional[str]:
+        """Download one page image, if one was found. Returns the local path or None."""
+        if blob_path is None:
+            print(f"Warning: No image file found for page {page_number} in Azure Blob Storage")
+            return None
+        try:
+            return self._download_blob(blob_path)
+        except Exception as e:
+            print(f"Error downloading blob {blob_path}: {e}")
+            return None
     
     def get_all_jpg_files(self, kb_id: str, doc_id: str) -> List[str]:
         """
@@ -209,10 +676,9 @@ class AzureBlobStorage(FileSystem):
             Sorted list of local file paths
         """
         prefix = f"{kb_id}/{doc_id}/"
-        container_client = self.blob_service_client.get_container_client(self.container_name)
         
         try:
-            blob_list = container_client.list_blobs(name_starts_with=prefix)
+            blob_list = self.container_client.list_blobs(name_starts_with=prefix, results_per_page=5000)
             image_files = [
                 blob.name for blob in blob_list
                 if blob.name.lower().endswith(('.jpg', '.jpeg', '.png'))
@@ -225,79 +691,112 @@ class AzureBlobStorage(FileSystem):
             output_folder = os.path.join(self.base_path, kb_id, doc_id)
             os.makedirs(output_folder, exist_ok=True)
             
-            # Download each file
+            # Download files concurrently, streaming each one to disk
             local_file_paths = []
-            for blob_name in image_files:
-                local_path = os.path.join(self.base_path, blob_name)
-                blob_client = self._get_blob_client(blob_name)
-                
-                try:
-                    with open(local_path, 'wb') as f:
-                        download_stream = blob_client.download_blob()
-                        f.write(download_stream.readall())
-                    local_file_paths.append(local_path)
-                except Exception as e:
-                    print(f"Error downloading blob {blob_name}: {e}")
-                    continue
+            with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+                futures = {
+                    executor.submit(self._download_blob, blob_name): blob_name
+                    for blob_name in image_files
+                }
+                for future in as_completed(futures):
+                    try:
+                        local_file_paths.append(future.result())
+                    except Exception as e:
+                        print(f"Error downloading blob {futures[future]}: {e}")
             
             # Sort by page number
-            local_file_paths.sort(key=lambda x: int(x.split('_')[-1].split('.')[0]))
+            local_file_paths.sort(key=page_number_from_path)
             return local_file_paths
             
-        except Exception as e:
+        except AzureError as e:
             print(f"Error listing/downloading files from Azure Blob Storage: {e}")
             return []
     
-    def log_error(self, kb_id: str, doc_id: str, error: dict) -> None:
-        """Log error to Azure Blob Storage."""
-        timestamp = datetime.now().isoformat()
+    def log_error(self, kb_id: str, doc_id: str, error: dict, sync: bool = False) -> None:
+        """
+        Log error to Azure Blob Storage.
+        
+        Errors are buffered and appended as JSON lines to the document's
+        errors/errors.jsonl append blob, one append per document per flush. (Older
+        versions wrote each error to its own errors/<timestamp>.json blob; those
+        are left as they are.) A flush happens once ERROR_FLUSH_SIZE errors are
+        pending or ERROR_FLUSH_INTERVAL seconds after the first one, and errors
+        still pending at interpreter exit are flushed then.
+        
+        Args:
+            kb_id: Knowledge base ID
+            doc_id: Document ID
+            error: Error details to log
+            sync: If True, flush all pending errors before returning
+        """
         error_data = {
             'kb_id': kb_id,
             'doc_id': doc_id,
             'error': error,
-            'timestamp': timestamp
+            'timestamp': datetime.now().isoformat()
         }
+        blob_path = f"{kb_id}/{doc_id}/errors/errors.jsonl"
         
-        # Save error log as JSON
-        blob_path = f"{kb_id}/{doc_id}/errors/{timestamp}.json"
-        blob_client = self._get_blob_client(blob_path)
+        with self._error_lock:
+            self._error_buffer.setdefault(blob_path, []).append(_json_dumps(error_data))
+            self._error_count += 1
+            flush_now = sync or self._error_count >= ERROR_FLUSH_SIZE
+            if not flush_now and self._error_flush_timer is None:
+                # A daemon timer doesn't hold up interpreter exit; the atexit hook flushes instead
+                self._error_flush_timer = threading.Timer(ERROR_FLUSH_INTERVAL, self.flush_errors)
+                self._error_flush_timer.daemon = True
+                self._error_flush_timer.start()
+            _pending_error_logs.add(self)
         
-        try:
-            json_data = json.dumps(error_data, indent=2)
-            content_settings = ContentSettings(content_type='application/json')
-            blob_client.upload_blob(
-                json_data,
-                overwrite=True,
-                content_settings=content_settings
-            )
-        except Exception as e:
-            print(f"Failed to log error to Azure Blob Storage: {e}")
+        if flush_now:
+            self.flush_errors()
+    
+    def flush_errors(self) -> None:
+        """Append all buffered error logs to their blobs."""
+        with self._error_lock:
+            pending, self._error_buffer = self._error_buffer, {}
+            self._error_count = 0
+            if self._error_flush_timer is not None:
+                self._error_flush_timer.cancel()
+                self._error_flush_timer = None
+            _pending_error_logs.discard(self)
+        
+        for blob_path, lines in pending.items():
+            blob_client = self._get_blob_client(blob_path)
+            data = b"".join(line + b"\n" for line in lines)
+            try:
+                try:
+                    blob_client.append_block(data)
+                except ResourceNotFoundError:
+                    blob_client.create_append_blob(
+                        content_settings=ContentSettings(content_type='application/x-ndjson')
+                    )
+                    blob_client.append_block(data)
+            except Exception as e:
+                print(f"Failed to log error to Azure Blob Storage: {e}")
     
     def save_page_content(self, kb_id: str, doc_id: str, page_number: int, content: str) -> None:
         """Save page content to Azure Blob Storage."""
         blob_path = f"{kb_id}/{doc_id}/page_content_{page_number}.json"
-        data = json.dumps({"content": content})
-        
-        blob_client = self._get_blob_client(blob_path)
         try:
-            content_settings = ContentSettings(content_type='application/json')
-            blob_client.upload_blob(
-                data,
-                overwrite=True,
-                content_settings=content_settings
-            )
+            self._upload_json(blob_path, _json_dumps({"content": content}))
         except Exception as e:
             raise RuntimeError(f"Failed to upload page content to Azure Blob Storage: {e}") from e
     
+    def save_page_contents(self, kb_id: str, doc_id: str, pages: Dict[int, str]) -> None:
+        """Save the content of several pages, uploading them concurrently."""
+        with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+            list(executor.map(
+                lambda page: self.save_page_content(kb_id, doc_id, page[0], page[1]),
+                pages.items(),
+            ))
+    
     def load_page_content(self, kb_id: str, doc_id: str, page_number: int) -> Optional[str]:
         """Load page content from Azure Blob Storage."""
         blob_path = f"{kb_id}/{doc_id}/page_content_{page_number}.json"
-        blob_client = self._get_blob_client(blob_path)
         
         try:
-            download_stream = blob_client.download_blob()
-            data = json.loads(download_stream.readall().decode('utf-8'))
-            return data["content"]
+            return self._download_json(blob_path)["content"]
         except ResourceNotFoundError:
             return None
         except Exception as e:
@@ -305,22 +804,18 @@ class AzureBlobStorage(FileSystem):
             return None
     
     def load_page_content_range(self, kb_id: str, doc_id: str, page_start: int, page_end: int) -> list[str]:
-        """Load page content for a range of pages."""
-        page_contents = []
-        for page_num in range(page_start, page_end + 1):
-            content = self.load_page_content(kb_id, doc_id, page_num)
-            if content is not None:
-                page_contents.append(content)
-        return page_contents
+        """Load page content for a range of pages, fetching pages concurrently."""
+        pages = range(page_start, page_end + 1)
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            results = executor.map(lambda i: self.load_page_content(kb_id, doc_id, i), pages)
+            return [content for content in results if content is not None]
     
     def load_data(self, kb_id: str, doc_id: str, data_name: str) -> Optional[dict]:
         """Load JSON data from Azure Blob Storage."""
         blob_path = f"{kb_id}/{doc_id}/{data_name}.json"
-        blob_client = self._get_blob_client(blob_path)
         
         try:
-            download_stream = blob_client.download_blob()
-            return json.loads(download_stream.readall().decode('utf-8'))
+            return self._download_json(blob_path)
         except ResourceNotFoundError:
             print(f"Blob not found: {blob_path}")
             return None
@@ -331,13 +826,267 @@ class AzureBlobStorage(FileSystem):
             print(f"Error loading data from Azure Blob Storage: {str(e)}")
             return None
     
+    # Async variants, for pipelines that overlap storage I/O with other work (e.g. VLM calls)
+    
+    def _new_async_container_client(self):
+        """
+        Create an async container client for one async operation.
+        
+        Async clients hold connections bound to the event loop that opened them, so
+        each operation opens (and closes) its own instead of sharing one on the instance.
+        """
+        from azure.storage.blob.aio import ContainerClient as AsyncContainerClient
+        from azure.storage.blob.aio import ExponentialRetry as AsyncExponentialRetry
+        
+        client_kwargs = self._client_kwargs(AsyncExponentialRetry)
+        if self.connection_string:
+            return AsyncContainerClient.from_connection_string(
+                self.connection_string, self.container_name, **client_kwargs
+            )
+        return AsyncContainerClient(
+            account_url=f"https://{self.account_name}.blob.core.windows.net",
+            container_name=self.container_name,
+            credential=self.account_key,
+            **client_kwargs,
+        )
+    
+    async def _adelete_prefix(self, container_client, prefix: str) -> None:
+        """Async version of _delete_prefix."""
+        blob_names = [
+            blob.name
+            async for blob in container_client.list_blobs(name_starts_with=prefix, results_per_page=5000)
+        ]
+        
+        async def delete_batch(batch):
+            responses = await container_client.delete_blobs(*batch, raise_on_any_failure=False)
+            _raise_on_failed_deletes([response.status_code async for response in responses])
+        
+        await _gather_limited(
+            [
+                delete_batch(blob_names[i:i + MAX_BATCH_DELETE_SIZE])
+                for i in range(0, len(blob_names), MAX_BATCH_DELETE_SIZE)
+            ],
+            MAX_DELETE_WORKERS,
+        )
+    
+    async def adelete_directory(self, kb_id: str, doc_id: str) -> None:
+        """Async version of delete_directory."""
+        prefix = f"{kb_id}/{doc_id}/"
+        try:
+            async with self._new_async_container_client() as container_client:
+                await self._adelete_prefix(container_client, prefix)
+        except AzureError as e:
+            print(f"Error deleting directory {prefix}: {e}")
+        finally:
+            self._evict_page_blobs(kb_id, doc_id)
+            self._evict_json_prefix(prefix)
+    
+    async def adelete_kb(self, kb_id: str) -> None:
+        """Async version of delete_kb."""
+        try:
+            async with self._new_async_container_client() as container_client:
+                await self._adelete_prefix(container_client, f"{kb_id}/")
+        except AzureError as e:
+            print(f"Error deleting knowledge base {kb_id}: {e}")
+        finally:
+            self._evict_page_blobs(kb_id)
+            self._evict_json_prefix(f"{kb_id}/")
+    
+    async def _aupload_json(self, container_client, blob_path: str, data: bytes) -> None:
+        """Async version of _upload_json."""
+        try:
+            response = await container_client.get_blob_client(blob_path).upload_blob(
+                data, **self._json_upload_kwargs(data)
+            )
+        except Exception:
+            self._evict_json(blob_path)
+            raise
+        self._after_json_upload(blob_path, data, response)
+    
+    async def asave_json(self, kb_id: str, doc_id: str, file_name: str, file: dict) -> None:
+        """Async version of save_json."""
+        blob_path = f"{kb_id}/{doc_id}/{file_name}"
+        json_data = _json_dumps(file)
+        
+        try:
+            async with self._new_async_container_client() as container_client:
+                await self._aupload_json(container_client, blob_path, json_data)
+        except Exception as e:
+            raise RuntimeError(f"Failed to upload JSON to Azure Blob Storage: {e}") from e
+    
+    async def asave_page_contents(self, kb_id: str, doc_id: str, pages: Dict[int, str]) -> None:
+        """Async version of save_page_contents, uploading over one async client."""
+        uploads = {
+            f"{kb_id}/{doc_id}/page_content_{page_number}.json": _json_dumps({"content": content})
+            for page_number, content in pages.items()
+        }
+        
+        try:
+            async with self._new_async_container_client() as container_client:
+                await _gather_limited(
+                    [
+                        self._aupload_json(container_client, blob_path, data)
+                        for blob_path, data in uploads.items()
+                    ],
+                    MAX_UPLOAD_WORKERS,
+                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to upload page content to Azure Blob Storage: {e}") from e
+    
+    async def asave_image(self, kb_id: str, doc_id: str, file_name: str, image: any) -> None:
+        """Async version of save_image. The image is encoded in a worker thread."""
+        try:
+            async with self._new_async_container_client() as container_client:
+                await self._aupload_image(container_client, f"{kb_id}/{doc_id}/{file_name}", image)
+        finally:
+            self._evict_page_blobs(kb_id, doc_id)
+    
+    async def asave_images(self, kb_id: str, doc_id: str, images: dict) -> None:
+        """
+        Save several images concurrently over one async client.
+        
+        Args:
+            kb_id: Knowledge base ID
+            doc_id: Document ID
+            images: Mapping of file name (e.g. "page_1.jpg") to PIL image
+        """
+        try:
+            async with self._new_async_container_client() as container_client:
+                await _gather_limited(
+                    [
+                        self._aupload_image(container_client, f"{kb_id}/{doc_id}/{file_name}", image)
+                        for file_name, image in images.items()
+                    ],
+                    MAX_DOWNLOAD_WORKERS,
+                )
+        finally:
+            self._evict_page_blobs(kb_id, doc_id)
+    
+    async def _aupload_image(self, container_client, blob_path: str, image: any) -> None:
+        """Encode image as JPEG in a worker thread and upload it; image bytes are uploaded as is."""
+        if isinstance(image, ENCODED_IMAGE_TYPES):
+            data = bytes(image)
+            try:
+                await container_client.get_blob_client(blob_path).upload_blob(
+                    data,
+                    length=len(data),
+                    overwrite=True,
+                    content_settings=ContentSettings(content_type=_image_content_type(blob_path)),
+                    max_concurrency=self.max_concurrency,
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to upload image to Azure Blob Storage: {e}") from e
+            return
+        
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            await asyncio.to_thread(image.save, buffer, **JPEG_SAVE_OPTIONS)
+            length = buffer.tell()
+            buffer.seek(0)
+            
+            try:
+                await container_client.get_blob_client(blob_path).upload_blob(
+                    buffer,
+                    length=length,
+                    overwrite=True,
+                    content_settings=ContentSettings(content_type='image/jpeg'),
+                    max_concurrency=self.max_concurrency,
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to upload image to Azure Blob Storage: {e}") from e
+    
+    async def _adownload_blob(self, container_client, blob_path: str) -> str:
+        """Async version of _download_blob."""
+        local_path = os.path.join(self.base_path, blob_path)
+        download_stream = await container_client.get_blob_client(blob_path).download_blob(
+            max_concurrency=self.max_concurrency
+        )
+        with open(local_path, 'wb') as f:
+            await download_stream.readinto(f)
+        return local_path
+    
+    async def _adownload_page(self, container_client, blob_path: Optional[str], page_number: int) -> Optional[str]:
+        """Async version of _download_page."""
+        if blob_path is None:
+            print(f"Warning: No image file found for page {page_number} in Azure Blob Storage")
+            return None
+        try:
+            return await self._adownload_blob(container_client, blob_path)
+        except Exception as e:
+            print(f"Error downloading blob {blob_path}: {e}")
+            return None
+    
+    async def aget_files(self, kb_id: str, doc_id: str, page_start: int, page_end: int) -> List[str]:
+        """Async version of get_files."""
+        if page_start is None or page_end is None:
+            return []
+        
+        os.makedirs(os.path.join(self.base_path, kb_id, doc_id), exist_ok=True)
+        
+        pages = range(page_start, page_end + 1)
+        async with self._new_async_container_client() as container_client:
+            page_blobs = self._cached_page_blobs(kb_id, doc_id, pages)
+            if page_blobs is None:
+                blob_names = [
+                    blob.name
+                    async for blob in container_client.list_blobs(
+                        name_starts_with=f"{kb_id}/{doc_id}/page_", results_per_page=5000
+                    )
+                ]
+                page_blobs = self._cache_page_blobs(kb_id, doc_id, blob_names)
+            results = await _gather_limited(
+                [self._adownload_page(container_client, page_blobs.get(i), i) for i in pages],
+                MAX_DOWNLOAD_WORKERS,
+            )
+        return [path for path in results if path is not None]
+    
+    async def aget_all_jpg_files(self, kb_id: str, doc_id: str) -> List[str]:
+        """Async version of get_all_jpg_files."""
+        prefix = f"{kb_id}/{doc_id}/"
+        
+        try:
+            async with self._new_async_container_client() as container_client:
+                image_files = [
+                    blob.name
+                    async for blob in container_client.list_blobs(name_starts_with=prefix, results_per_page=5000)
+                    if blob.name.lower().endswith(('.jpg', '.jpeg', '.png'))
+                ]
+                if not image_files:
+                    return []
+                
+                os.makedirs(os.path.join(self.base_path, kb_id, doc_id), exist_ok=True)
+                results = await _gather_limited(
+                    [self._adownload_blob(container_client, blob_name) for blob_name in image_files],
+                    MAX_DOWNLOAD_WORKERS,
+                    return_exceptions=True,
+                )
+            
+            local_file_paths = []
+            for blob_name, result in zip(image_files, results):
+                if isinstance(result, Exception):
+                    print(f"Error downloading blob {blob_name}: {result}")
+                else:
+                    local_file_paths.append(result)
+            
+            # Sort by page number
+            local_file_paths.sort(key=page_number_from_path)
+            return local_file_paths
+            
+        except AzureError as e:
+            print(f"Error listing/downloading files from Azure Blob Storage: {e}")
+            return []
+    
     def to_dict(self):
-        """Serialize configuration to dictionary."""
+        """Serialize configuration to dictionary, without the connection string or account key."""
         base_dict = super().to_dict()
         base_dict.update({
             "container_name": self.container_name,
-            "connection_string": self.connection_string,
+            "connection_string": None,
             "account_name": self.account_name,
-            "account_key": self.account_key,
+            "account_key": None,
+            "max_concurrency": self.max_concurrency,
+            "max_chunk_get_size": self.max_chunk_get_size,
+            "max_single_get_size": self.max_single_get_size,
+            "max_block_size": self.max_block_size,
+            "json_cache_ttl": self.json_cache_ttl,
         })
         return base_dict
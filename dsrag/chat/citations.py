@@ -87,6 +87,6 @@ def convert_elements_to_page_content(elements: list[dict], kb_id: str, doc_id: s
         pages[page_num].append(element["content"])
 
     # Save each page's content
-    for page_num, contents in pages.items():
-        page_content = "\n".join(contents)
-        file_system.save_page_content(kb_id, doc_id, page_num, page_content)
\ No newline at end of file
+    file_system.save_page_contents(
+        kb_id, doc_id, {page_num: "\n".join(contents) for page_num, contents in pages.items()}
+    )
\ No newline at end of file
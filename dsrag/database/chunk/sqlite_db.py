@@ -58,6 +58,11 @@ class SQLiteDB(ChunkDB):
                 if column["name"] not in column_names:
                     # Add the column to the table
                     c.execute("ALTER TABLE documents ADD COLUMN {} {}".format(column["name"], column["type"]))
+        # Index doc_id lookups (get_all_doc_ids, get_chunk_text, remove_document) so they don't scan every chunk
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_doc_id_chunk_index ON documents (doc_id, chunk_index)"
+        )
+        conn.commit()
         conn.close()
 
         # Add these settings
@@ -2,19 +2,112 @@ import pickle
 from dsrag.database.vector.db import VectorDB
 from typing import Sequence, Optional
 from dsrag.database.vector.types import ChunkMetadata, Vector, VectorSearchResult
-from sklearn.metrics.pairwise import cosine_similarity
 import os
 import numpy as np
 from dsrag.utils.imports import faiss
 
+# Supported values of BasicVectorDB's quantization parameter
+QUANTIZATION_TYPES = (None, "binary", "int8")
+
+# Maximum number of vectors used to fit the projection for reduced_dimension
+PROJECTION_FIT_SAMPLE_SIZE = 10000
+
+# Rows of int8 codes converted to float32 at a time when scoring, so the temporary
+# copy stays cache-sized instead of growing to the full float32 matrix
+_INT8_SCAN_BLOCK_SIZE = 4096
+
+# Number of set bits in each byte value, for numpy versions without np.bitwise_count
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _hamming_distances(packed_vectors: np.ndarray, packed_query: np.ndarray) -> np.ndarray:
+    """Hamming distance from a packed bit vector to each row of packed bit vectors."""
+    xor = np.bitwise_xor(packed_vectors, packed_query)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[xor].sum(axis=1, dtype=np.int32)
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first, without sorting all of them."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.array([], dtype=np.intp)
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _fit_projection(vectors: np.ndarray, dimension: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit a PCA projection onto the top dimension principal components.
+
+    Returns the mean and the (d, dimension) component matrix, fitted on an evenly
+    spaced sample of at most PROJECTION_FIT_SAMPLE_SIZE rows.
+    """
+    step = max(1, len(vectors) // PROJECTION_FIT_SAMPLE_SIZE)
+    sample = np.asarray(vectors[::step][:PROJECTION_FIT_SAMPLE_SIZE], dtype=np.float32)
+    mean = sample.mean(axis=0)
+    _, _, components = np.linalg.svd(sample - mean, full_matrices=False)
+    return mean, np.ascontiguousarray(components[:dimension].T)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows as they are."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _int8_quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize unit-normalized rows to int8 with a per-row scale of 127 / max(abs(row)).
+
+    Returns the int8 codes and the inverse scales, so row i is approximately
+    codes[i] * inverse_scales[i].
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    vectors = _normalize_rows(vectors)
+    max_abs = np.abs(vectors).max(axis=1)
+    inverse_scales = np.where(max_abs == 0, 1, max_abs) / 127
+    codes = np.round(vectors / inverse_scales[:, None]).astype(np.int8)
+    return codes, inverse_scales.astype(np.float32)
+
 
 class BasicVectorDB(VectorDB):
+    """
+    Vector database that keeps all vectors in memory and searches them exhaustively.
+
+    With quantization="binary", search first ranks all vectors by Hamming distance
+    between their sign bits (1 bit per dimension, 32x less data to scan than
+    float32). With quantization="int8", it ranks them by approximate cosine
+    similarity computed from int8 codes with a per-vector scale (4x less data,
+    with very little ranking loss). With reduced_dimension set, vectors are first
+    projected onto their top principal components (e.g. 1536 -> 256 dimensions),
+    alone or combined with either quantization. In all these cases the best
+    rescore_multiplier * top_k candidates are then rescored by cosine similarity
+    on the full vectors, which are still stored.
+    """
+
     def __init__(
-        self, kb_id: str, storage_directory: str = "~/dsRAG", use_faiss: bool = False
+        self,
+        kb_id: str,
+        storage_directory: str = "~/dsRAG",
+        use_faiss: bool = False,
+        quantization: Optional[str] = None,
+        rescore_multiplier: int = 4,
+        reduced_dimension: Optional[int] = None,
     ) -> None:
+        if quantization not in QUANTIZATION_TYPES:
+            raise ValueError(
+                f"Unsupported quantization: {quantization}. Supported values: {QUANTIZATION_TYPES}"
+            )
         self.kb_id = kb_id
         self.storage_directory = storage_directory
         self.use_faiss = use_faiss
+        self.quantization = quantization
+        self.rescore_multiplier = rescore_multiplier
+        self.reduced_dimension = reduced_dimension
         self.vector_storage_path = os.path.join(
             self.storage_directory, "vector_storage", f"{kb_id}.pkl"
         )
@@ -31,12 +124,15 @@ class BasicVectorDB(VectorDB):
             )
         self.vectors.extend(vectors)
         self.metadata.extend(metadata)
+        self._reset_derived_vectors()
         self.save()
 
     def search(self, query_vector, top_k=10, metadata_filter: Optional[dict] = None) -> list[VectorSearchResult]:
         if not self.vectors:
             return []
 
+        if self.quantization is not None or self.reduced_dimension:
+            return self._rescored_search(query_vector, top_k)
         if self.use_faiss:
             try:
                 return self.search_faiss(query_vector, top_k)
@@ -46,63 +142,131 @@ class BasicVectorDB(VectorDB):
         else:
             return self._fallback_search(query_vector, top_k)
 
+    def search_batch(self, query_vectors, top_k=10, metadata_filter: Optional[dict] = None) -> list[list[VectorSearchResult]]:
+        """Score all queries against all vectors with one matrix multiplication (or one faiss search)."""
+        if not self.vectors or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+        if self.quantization is not None or self.reduced_dimension:
+            return super().search_batch(query_vectors, top_k, metadata_filter)
+
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        if self.use_faiss:
+            try:
+                similarities, indices = self._faiss_search(queries, top_k)
+                return [self._make_results(row_indices, row_similarities)
+                        for row_indices, row_similarities in zip(indices, similarities)]
+            except Exception as e:
+                print(f"Faiss search failed: {e}. Falling back to numpy search.")
+
+        # (num_queries, num_vectors) cosine similarities
+        similarities = queries @ self._unit_vectors().T
+        all_results = []
+        for row in similarities:
+            top = _top_k_indices(row, top_k)
+            all_results.append(self._make_results(top, row[top]))
+        return all_results
+
     def _fallback_search(self, query_vector, top_k=10) -> list[VectorSearchResult]:
         """Fallback search method using numpy when faiss is not available."""
-        similarities = cosine_similarity([query_vector], self.vectors)[0]
-        indexed_similarities = sorted(
-            enumerate(similarities), key=lambda x: x[1], reverse=True
-        )
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        similarities = self._unit_vectors() @ query
+        top = _top_k_indices(similarities, top_k)
+        return self._make_results(top, similarities[top])
+
+    def _unit_vectors(self) -> np.ndarray:
+        """The stored vectors as one contiguous float32 matrix of unit-length rows."""
+        if self._normalized_vectors is None:
+            self._normalized_vectors = np.ascontiguousarray(
+                _normalize_rows(np.asarray(self.vectors, dtype=np.float32))
+            )
+        return self._normalized_vectors
+
+    def _make_results(self, indices, similarities) -> list[VectorSearchResult]:
+        """Search results for vector indices and their similarities, best first."""
         results: list[VectorSearchResult] = []
-        for i, similarity in indexed_similarities[:top_k]:
+        for i, similarity in zip(indices, similarities):
             result = VectorSearchResult(
                 doc_id=None,
                 vector=None,
                 metadata=self.metadata[i],
-                similarity=similarity,
+                similarity=float(similarity),
             )
             results.append(result)
         return results
 
+    def _rescored_search(self, query_vector, top_k=10) -> list[VectorSearchResult]:
+        """Rank by the reduced or quantized vectors, then rescore the best candidates exactly."""
+        if self.quantization == "binary":
+            # Smaller Hamming distance is better, so negate it to get a score
+            scores = -self._binary_distances(query_vector)
+        elif self.quantization == "int8":
+            scores = self._int8_similarities(query_vector)
+        else:
+            scores = self._reduced_similarities(query_vector)
+
+        candidates = _top_k_indices(scores, top_k * self.rescore_multiplier)
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        similarities = self._unit_vectors()[candidates] @ query
+        top = _top_k_indices(similarities, top_k)
+        return self._make_results(candidates[top], similarities[top])
+
+    def _binary_distances(self, query_vector) -> np.ndarray:
+        """Hamming distance between the sign bits of the query and of each vector."""
+        if self._quantized_vectors is None:
+            self._quantized_vectors = np.packbits(self._reduce(self.vectors) > 0, axis=1)
+        packed_query = np.packbits(self._reduce([query_vector])[0] > 0)
+        return _hamming_distances(self._quantized_vectors, packed_query)
+
+    def _int8_similarities(self, query_vector) -> np.ndarray:
+        """Approximate cosine similarity between the query and each vector from int8 codes."""
+        if self._quantized_vectors is None:
+            self._quantized_vectors = _int8_quantize(self._reduce(self.vectors))
+        codes, inverse_scales = self._quantized_vectors
+        query_codes, query_inverse_scale = _int8_quantize(self._reduce([query_vector]))
+        query = query_codes[0].astype(np.float32)
+
+        dots = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _INT8_SCAN_BLOCK_SIZE):
+            block = codes[start:start + _INT8_SCAN_BLOCK_SIZE]
+            dots[start:start + len(block)] = block.astype(np.float32) @ query
+        return dots * inverse_scales * query_inverse_scale[0]
+
+    def _reduced_similarities(self, query_vector) -> np.ndarray:
+        """Cosine similarity between the query and each vector in the reduced space."""
+        if self._quantized_vectors is None:
+            self._quantized_vectors = _normalize_rows(self._reduce(self.vectors))
+        return self._quantized_vectors @ _normalize_rows(self._reduce([query_vector]))[0]
+
+    def _reduce(self, vectors) -> np.ndarray:
+        """Project rows onto the top reduced_dimension principal components, if set."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not self.reduced_dimension or self.reduced_dimension >= vectors.shape[1]:
+            return vectors
+        if self._projection is None:
+            self._projection = _fit_projection(self.vectors, self.reduced_dimension)
+        mean, components = self._projection
+        return (vectors - mean) @ components
+
     def search_faiss(self, query_vector, top_k=10) -> list[VectorSearchResult]:
-        # Limit top_k to the number of vectors we have - Faiss doesn't automatically handle this
-        top_k = min(top_k, len(self.vectors))
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))
+        similarities, indices = self._faiss_search(query, top_k)
+        return self._make_results(indices[0], similarities[0])
 
-        # faiss expects 2D arrays of vectors
-        vectors_array = (
-            np.array(self.vectors).astype("float32").reshape(len(self.vectors), -1)
-        )
-        query_vector_array = np.array(query_vector).astype("float32").reshape(1, -1)
+    def _faiss_search(self, queries: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Search unit-length query rows with an exact inner-product faiss index.
 
-        try:
-            # Access nested modules step by step
-            contrib = faiss.contrib
-            exhaustive_search = contrib.exhaustive_search
-            knn_func = exhaustive_search.knn
-            
-            _, I = knn_func(query_vector_array, vectors_array, top_k)
-        except AttributeError:
-            # If the nested module structure doesn't work, try direct import as a fallback
-            try:
-                from faiss.contrib.exhaustive_search import knn as direct_knn
-                _, I = direct_knn(query_vector_array, vectors_array, top_k)
-            except (ImportError, AttributeError):
-                # If both approaches fail, raise an error
-                raise ImportError(
-                    "Could not import faiss.contrib.exhaustive_search.knn. "
-                    "Please ensure faiss is installed correctly."
-                )
-                
-        # I is a list of indices in the corpus_vectors array
-        results: list[VectorSearchResult] = []
-        for i in I[0]:
-            result = VectorSearchResult(
-                doc_id=None,
-                vector=None,
-                metadata=self.metadata[i],
-                similarity=cosine_similarity([query_vector], [self.vectors[i]])[0][0],
-            )
-            results.append(result)
-        return results
+        The index holds the unit-length vectors, so inner products are cosine
+        similarities. It's built on the first search after the vectors change.
+        """
+        if self._faiss_index is None:
+            unit_vectors = self._unit_vectors()
+            index = faiss.IndexFlatIP(unit_vectors.shape[1])
+            index.add(unit_vectors)
+            self._faiss_index = index
+        # Limit top_k to the number of vectors we have - Faiss doesn't automatically handle this
+        top_k = min(top_k, len(self.vectors))
+        return self._faiss_index.search(np.ascontiguousarray(queries), top_k)
 
     def remove_document(self, doc_id):
         i = 0
@@ -112,6 +276,7 @@ class BasicVectorDB(VectorDB):
                 del self.metadata[i]
             else:
                 i += 1
+        self._reset_derived_vectors()
         self.save()
 
     def save(self):
@@ -128,6 +293,15 @@ class BasicVectorDB(VectorDB):
         else:
             self.vectors = []
             self.metadata = []
+        self._reset_derived_vectors()
+
+    def _reset_derived_vectors(self):
+        """Drop the copies of self.vectors built for searching, after the vectors change."""
+        # Each is built on the first search that needs it
+        self._projection = None
+        self._quantized_vectors = None
+        self._normalized_vectors = None
+        self._faiss_index = None
 
     def delete(self):
         if os.path.exists(self.vector_storage_path):
@@ -139,4 +313,7 @@ class BasicVectorDB(VectorDB):
             "kb_id": self.kb_id,
             "storage_directory": self.storage_directory,
             "use_faiss": self.use_faiss,
+            "quantization": self.quantization,
+            "rescore_multiplier": self.rescore_multiplier,
+            "reduced_dimension": self.reduced_dimension,
         }
@@ -60,6 +60,13 @@ class VectorDB(ABC):
         """
         pass
 
+    def search_batch(self, query_vectors, top_k: int=10, metadata_filter: Optional[dict] = None) -> list[list[VectorSearchResult]]:
+        """
+        Run search for each of several query vectors, returning one result list per query
+        in the same order. Subclasses can override this to score all queries at once.
+        """
+        return [self.search(query_vector, top_k, metadata_filter) for query_vector in query_vectors]
+
     @abstractmethod
     def delete(self) -> None:
         """
@@ -1,11 +1,20 @@
 import os
+import re
 from ..utils.imports import boto3
 import io
 import json
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
+# Page number in a page image file name, e.g. "page_12.jpg"
+_PAGE_NUMBER_RE = re.compile(r"_(\d+)\.[^.]+$")
+
+
+def page_number_from_path(path: str) -> int:
+    """Return the page number of a page image path, for sorting pages in order."""
+    return int(_PAGE_NUMBER_RE.search(path).group(1))
+
 
 class FileSystem(ABC):
     subclasses = {}
@@ -71,6 +80,12 @@ class FileSystem(ABC):
         """Save the text content of a page to a JSON file"""
         pass
 
+    def save_page_contents(self, kb_id: str, doc_id: str, pages: Dict[int, str]) -> None:
+        """Save the text content of several pages, given as {page_number: content}.
+        Remote file systems can override this to upload pages concurrently."""
+        for page_number, content in pages.items():
+            self.save_page_content(kb_id, doc_id, page_number, content)
+
     @abstractmethod
     def load_page_content(self, kb_id: str, doc_id: str, page_number: int) -> Optional[str]:
         """Load the text content of a page from its JSON file"""
@@ -184,7 +199,7 @@ class LocalFileSystem(FileSystem):
             image_file_paths.append(os.path.join(page_images_path, file))
 
         # Sort the files by page number
-        image_file_paths.sort(key=lambda x: int(x.split('_')[-1].split('.')[0]))
+        image_file_paths.sort(key=page_number_from_path)
         return image_file_paths
     
     def log_error(self, kb_id: str, doc_id: str, error: dict) -> None:
@@ -290,19 +305,23 @@ class S3FileSystem(FileSystem):
         s3_client = self.create_s3_client()
         prefix = f"{kb_id}/"
 
-        # List all objects with the specified prefix
-        response = s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix=prefix)
+        # List all objects with the specified prefix; a listing returns at most 1000 per page
+        paginator = s3_client.get_paginator('list_objects_v2')
+        objects_to_delete = [
+            {'Key': obj['Key']}
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for obj in page.get('Contents', [])
+        ]
         # Check if there are any objects to delete
-        if 'Contents' in response:
-            # Prepare a list of object keys to delete
-            objects_to_delete = [{'Key': obj['Key']} for obj in response['Contents']]
-
-            # Delete the objects
-            s3_client.delete_objects(Bucket=self.bucket_name, Delete={'Objects': objects_to_delete})
+        if objects_to_delete:
+            # Delete the objects, up to 1000 per request
+            for i in range(0, len(objects_to_delete), 1000):
+                s3_client.delete_objects(
+                    Bucket=self.bucket_name, Delete={'Objects': objects_to_delete[i:i + 1000]}
+                )
             print(f"Deleted all objects in {prefix} from {self.bucket_name}.")
         else:
             print(f"No objects found in {prefix}.")
-            objects_to_delete = []
         
         return objects_to_delete
 
@@ -441,7 +460,7 @@ class S3FileSystem(FileSystem):
                     continue
             
             # Sort the files by page number, similar to LocalFileSystem
-            local_file_paths.sort(key=lambda x: int(x.split('_')[-1].split('.')[0]))
+            local_file_paths.sort(key=page_number_from_path)
             return local_file_paths
             
         except Exception as e:
@@ -1,12 +1,30 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Any, Dict, Optional, Type
 import os
 
 from ..utils.imports import genai_new, vertexai  # lazy loaders
 
 
+@lru_cache(maxsize=4)
+def _get_gemini_client(api_key: str):
+    """Return a cached google-genai Client, so calls reuse its connection pool."""
+    return genai_new.Client(api_key=api_key)  # type: ignore[attr-defined]
+
+
+@lru_cache(maxsize=4)
+def _get_vertex_model(model: str, project_id: str, location: str):
+    """Return a cached GenerativeModel.
+
+    project_id and location are part of the cache key so each project and location
+    gets its own model. The caller runs vertexai.init before every call, since it
+    sets process-wide defaults that another client may have changed in between.
+    """
+    return vertexai.generative_models.GenerativeModel(model)  # type: ignore[attr-defined]
+
+
 class VLM(ABC):
     """Abstract base class for Visual Language Model clients.
 
@@ -79,12 +97,13 @@ class GeminiVLM(VLM):
     Behavior
     --------
     - Uses dsrag.dsparse.utils.imports.genai_new (lazy) to construct a
-      Client(api_key=os.environ["GEMINI_API_KEY"]).
+      Client(api_key=os.environ["GEMINI_API_KEY"]), cached per API key.
     - Builds GenerateContentConfig with response_mime_type="application/json",
       including optional response_schema when provided.
     - For models starting with "gemini-2.5", sets a ThinkingConfig with
       thinking_budget=0 to disable thinking as per existing behavior.
-    - Compresses images using compress_image from vlm.py.
+    - Sends JPEGs within the size limit as-is and compresses other images
+      using compress_image from vlm.py.
     """
 
     def __init__(self, model: str = "gemini-2.0-flash") -> None:
@@ -99,15 +118,14 @@ class GeminiVLM(VLM):
         temperature: float = 0.5,
     ) -> str:
         # Local import to avoid circular dependency at module import time
-        from .vlm import compress_image  # noqa: WPS433 (allow local import)
+        from .vlm import compress_image, read_jpeg_within_limit  # noqa: WPS433 (allow local import)
         import PIL.Image  # used only when this method is executed
-        import io
 
         # Create client using lazy loader with explicit API key check
         api_key = os.environ.get("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY not set; required for GeminiVLM")
-        client = genai_new.Client(api_key=api_key)  # type: ignore[attr-defined]
+        client = _get_gemini_client(api_key)
 
         # Base generation config
         config = genai_new.types.GenerateContentConfig(  # type: ignore[attr-defined]
@@ -120,12 +138,13 @@ class GeminiVLM(VLM):
 
         image = None
         try:
-            # Open and compress the image
-            image = PIL.Image.open(image_path)
-            compressed_image_bytes, _ = compress_image(image)
+            # Send JPEGs within the size limit as-is; otherwise open and compress the image
+            compressed_image_bytes = read_jpeg_within_limit(image_path)
+            if compressed_image_bytes is None:
+                image = PIL.Image.open(image_path)
+                compressed_image_bytes, _ = compress_image(image)
 
-            # Close the original image (safe to call multiple times)
-            if image:
+                # Close the original image (safe to call multiple times)
                 image.close()
 
             # Create content parts using bytes
@@ -178,7 +197,8 @@ class VertexAIVLM(VLM):
     Behavior
     --------
     - Uses dsrag.dsparse.utils.imports.vertexai (lazy) to initialize and call
-      the vertexai.generative_models API.
+      the vertexai.generative_models API. The model is created once per
+      (model, project_id, location).
     - Builds GenerationConfig with optional response_schema and returns
       response.text
     """
@@ -196,9 +216,8 @@ class VertexAIVLM(VLM):
         max_tokens: int = 4000,
         temperature: float = 0.5,
     ) -> str:
-        # Initialize Vertex AI client
         vertexai.init(project=self.project_id, location=self.location)  # type: ignore[attr-defined]
-        model = vertexai.generative_models.GenerativeModel(self.model)  # type: ignore[attr-defined]
+        model = _get_vertex_model(self.model, self.project_id, self.location)
 
         if response_schema is not None:
             generation_config = vertexai.generative_models.GenerationConfig(  # type: ignore[attr-defined]
@@ -5,7 +5,18 @@ from pdf2image import convert_from_path
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from dsparse.file_parsing.file_system import LocalFileSystem, S3FileSystem
+from dsparse.file_parsing.file_system import LocalFileSystem, S3FileSystem, page_number_from_path
+
+
+class TestPageNumberFromPath(unittest.TestCase):
+
+    def test_sorts_pages_numerically(self):
+        paths = ["/data/kb_1/doc_2/page_10.jpg", "/data/kb_1/doc_2/page_2.png", "/data/kb_1/doc_2/page_007.jpeg"]
+        self.assertEqual(sorted(paths, key=page_number_from_path), [
+            "/data/kb_1/doc_2/page_2.png",
+            "/data/kb_1/doc_2/page_007.jpeg",
+            "/data/kb_1/doc_2/page_10.jpg",
+        ])
 
 
 class TestLocalFileSystem(unittest.TestCase):
@@ -6,7 +6,15 @@ import json
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
-from dsrag.dsparse.file_parsing.vlm import make_llm_call_gemini
+import io
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import PIL.Image
+
+from dsrag.dsparse.file_parsing import vlm
+from dsrag.dsparse.file_parsing.vlm import make_llm_call_gemini, compress_image, read_jpeg_within_limit
 
 
 class TestVLM(unittest.TestCase):
@@ -183,5 +191,81 @@ class TestVLM(unittest.TestCase):
             raise
 
 
+class TestCompressImage(unittest.TestCase):
+    """Test cases for compress_image."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = PIL.Image.fromarray(rng.integers(0, 256, (600, 500, 3), dtype=np.uint8))
+
+    def test_small_image_keeps_quality(self):
+        """Images already under the limit are encoded once at the initial quality."""
+        data, quality = compress_image(self.image, max_size_bytes=10_000_000, quality=95)
+
+        self.assertEqual(quality, 95)
+        self.assertEqual(PIL.Image.open(io.BytesIO(data)).size, (500, 600))
+
+    def test_reduces_quality_to_fit(self):
+        """The highest quality that fits is found without resizing."""
+        full_size = len(compress_image(self.image, max_size_bytes=10_000_000)[0])
+
+        data, quality = compress_image(self.image, max_size_bytes=full_size // 2)
+
+        self.assertLessEqual(len(data), full_size // 2)
+        self.assertLess(quality, 95)
+        self.assertEqual(PIL.Image.open(io.BytesIO(data)).size, (500, 600))
+
+    def test_resizes_when_minimum_quality_too_large(self):
+        """Images that don't fit at the minimum quality are resized."""
+        data, quality = compress_image(self.image, max_size_bytes=20_000)
+
+        self.assertLessEqual(len(data), 20_000)
+        self.assertEqual(quality, 10)
+        self.assertLess(PIL.Image.open(io.BytesIO(data)).size[0], 500)
+
+
+    def test_resize_keeps_quality_below_minimum(self):
+        """A caller's quality below the minimum is kept when resizing, not raised to it."""
+        with patch.object(vlm, "_encode_jpeg", wraps=vlm._encode_jpeg) as encode:
+            data, quality = compress_image(self.image, max_size_bytes=20_000, quality=5)
+
+        self.assertEqual(quality, 5)
+        self.assertLessEqual(len(data), 20_000)
+        self.assertEqual({call.args[1] for call in encode.call_args_list}, {5})
+        at_minimum = compress_image(self.image, max_size_bytes=20_000)[0]
+        self.assertGreaterEqual(
+            PIL.Image.open(io.BytesIO(data)).size[0], PIL.Image.open(io.BytesIO(at_minimum)).size[0]
+        )
+
+
+class TestReadJpegWithinLimit(unittest.TestCase):
+    """Test cases for read_jpeg_within_limit."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image = PIL.Image.new("RGB", (50, 50), color="red")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _save(self, name, format):
+        path = os.path.join(self.temp_dir.name, name)
+        self.image.save(path, format=format)
+        return path
+
+    def test_small_jpeg_returned_as_is(self):
+        path = self._save("page_1.jpg", "JPEG")
+        with open(path, "rb") as f:
+            self.assertEqual(read_jpeg_within_limit(path), f.read())
+
+    def test_large_jpeg_needs_compression(self):
+        path = self._save("page_1.jpg", "JPEG")
+        self.assertIsNone(read_jpeg_within_limit(path, max_size_bytes=10))
+
+    def test_png_needs_compression(self):
+        path = self._save("page_1.png", "PNG")
+        self.assertIsNone(read_jpeg_within_limit(path))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,10 +1,12 @@
 import os
 import sys
 import unittest
+from unittest.mock import MagicMock, patch
 
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
+from dsrag.dsparse.file_parsing import vlm_clients
 from dsrag.dsparse.file_parsing.vlm_clients import VLM, GeminiVLM, VertexAIVLM
 
 
@@ -37,6 +39,39 @@ class TestVLMClients(unittest.TestCase):
         self.assertEqual(rebuilt.project_id, client.project_id)
         self.assertEqual(rebuilt.location, client.location)
 
+    # The lazy loaders are replaced through patch.dict; patch.object would probe them
+    # and import the SDKs, which aren't installed in the test environment
+    @patch.dict(vlm_clients.__dict__, {"vertexai": MagicMock()})
+    def test_vertex_model_created_once(self):
+        mock_vertexai = vlm_clients.vertexai
+        vlm_clients._get_vertex_model.cache_clear()
+        self.addCleanup(vlm_clients._get_vertex_model.cache_clear)
+        mock_vertexai.generative_models.GenerativeModel.return_value.generate_content.return_value.text = "{}"
+
+        client = VertexAIVLM(model="gemini-1.5-flash", project_id="proj", location="us-central1")
+        for _ in range(3):
+            self.assertEqual(client.make_llm_call("page_1.jpg", "describe"), "{}")
+
+        # init runs on every call, since its process-wide defaults may have been changed in between
+        self.assertEqual(mock_vertexai.init.call_count, 3)
+        mock_vertexai.init.assert_called_with(project="proj", location="us-central1")
+        mock_vertexai.generative_models.GenerativeModel.assert_called_once_with("gemini-1.5-flash")
+
+    @patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"})
+    @patch.dict(vlm_clients.__dict__, {"genai_new": MagicMock()})
+    def test_gemini_client_created_once(self):
+        mock_genai = vlm_clients.genai_new
+        vlm_clients._get_gemini_client.cache_clear()
+        self.addCleanup(vlm_clients._get_gemini_client.cache_clear)
+        mock_genai.Client.return_value.models.generate_content.return_value.text = "{}"
+
+        client = GeminiVLM()
+        with patch("dsrag.dsparse.file_parsing.vlm.read_jpeg_within_limit", return_value=b"jpeg"):
+            for _ in range(3):
+                self.assertEqual(client.make_llm_call("page_1.jpg", "describe"), "{}")
+
+        mock_genai.Client.assert_called_once_with(api_key="test_key")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
 import numpy as np
 import os
+import copy
+import json
 import time
 import uuid
 import logging
@@ -29,8 +31,23 @@ from dsrag.reranker import Reranker, CohereReranker
 from dsrag.llm import LLM, OpenAIChatAPI
 from dsrag.dsparse.file_parsing.file_system import FileSystem, LocalFileSystem
 from dsrag.metadata import MetadataStorage, LocalMetadataStorage
+from dsrag.semantic_cache import SemanticCache
 from dsrag.chat.citations import convert_elements_to_page_content
 from dsrag.dsparse.file_parsing.vlm_clients import VLM
+from dsrag import azure as azure_components
+
+
+def _register_azure_components(*configs):
+    """Import the Azure components referenced by serialized configs.
+
+    Azure components are imported lazily, so their subclasses are not registered
+    for from_dict until they have been accessed at least once.
+    """
+    for config in configs:
+        subclass_name = config.get("subclass_name") if isinstance(config, dict) else None
+        if subclass_name in azure_components.__all__:
+            getattr(azure_components, subclass_name)
+
 
 class KnowledgeBase:
     def __init__(
@@ -51,6 +68,7 @@ class KnowledgeBase:
         save_metadata_to_disk: bool = True,
         metadata_storage: Optional[MetadataStorage] = None,
         vlm_client: Optional[VLM] = None,
+        semantic_cache_threshold: Optional[float] = None,
     ):
         """Initialize a KnowledgeBase instance.
 
@@ -79,13 +97,24 @@ class KnowledgeBase:
                 Defaults to LocalMetadataStorage.
             vlm_client (Optional[VLM], optional): VLM client for parsing documents. 
                 Defaults to None.
+            semantic_cache_threshold (Optional[float], optional): If set, search results for
+                each query are cached in memory, and a later query whose embedding has at least
+                this cosine similarity (e.g. 0.95) to a cached one reuses its results instead of
+                searching and reranking again. Defaults to None (no cache).
 
         Raises:
             ValueError: If KB exists and exists_ok is False.
         """
         self.kb_id = kb_id
         self.storage_directory = os.path.expanduser(storage_directory)
+        self.semantic_cache = (
+            SemanticCache(threshold=semantic_cache_threshold)
+            if semantic_cache_threshold is not None
+            else None
+        )
         self.metadata_storage = metadata_storage if metadata_storage else LocalMetadataStorage(self.storage_directory)
+        # Config as last saved or loaded, so saving it again unchanged can be skipped
+        self._saved_data = None
 
         if save_metadata_to_disk:
             # load the KB if it exists; otherwise, initialize it and save it to disk
@@ -182,7 +211,11 @@ class KnowledgeBase:
         # Combine metadata and components
         full_data = {**self.kb_metadata, "components": components}
 
+        # Adding a document rarely changes the config, so only write it when it has changed
+        if full_data == self._saved_data:
+            return
         self.metadata_storage.save(full_data, self.kb_id)
+        self._saved_data = copy.deepcopy(full_data)
 
     def _load(self, auto_context_model=None, reranker=None, file_system=None, chunk_db=None, vector_db=None, vlm_client: Optional[VLM] = None):
         """Load a knowledge base configuration from disk.
@@ -201,10 +234,12 @@ class KnowledgeBase:
             Other component overrides may break functionality if not compatible.
         """
         data = self.metadata_storage.load(self.kb_id)
+        self._saved_data = copy.deepcopy(data)
         self.kb_metadata = {
             key: value for key, value in data.items() if key != "components"
         }
         components = data.get("components", {})
+        _register_azure_components(*components.values())
         # Deserialize components
         self.embedding_model = Embedding.from_dict(
             components.get("embedding_model", {}))
@@ -265,10 +300,14 @@ class KnowledgeBase:
 
         Removes all documents, vectors, chunks, and metadata associated with this KB.
         """
-        # delete all documents in the KB
+        # delete all documents in the KB. Their files are removed together by
+        # file_system.delete_kb below (one prefix delete instead of one per document).
         doc_ids_to_delete = self.chunk_db.get_all_doc_ids()
         for doc_id in doc_ids_to_delete:
-            self.delete_document(doc_id)
+            self.chunk_db.remove_document(doc_id)
+            self.vector_db.remove_document(doc_id)
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
 
         self.chunk_db.delete()
         self.vector_db.delete()
@@ -276,6 +315,7 @@ class KnowledgeBase:
 
         # delete the metadata file
         self.metadata_storage.delete(self.kb_id)
+        self._saved_data = None
 
     def add_document(
         self,
@@ -471,6 +511,7 @@ class KnowledgeBase:
             try:
                 vlm_serialized = file_parsing_config.get("vlm") if isinstance(file_parsing_config, dict) else None
                 vlm_fallback_serialized = file_parsing_config.get("vlm_fallback") if isinstance(file_parsing_config, dict) else None
+                _register_azure_components(vlm_serialized, vlm_fallback_serialized)
                 if vlm_serialized:
                     resolved_vlm_client = VLM.from_dict(vlm_serialized)
                 elif getattr(self, "vlm_client", None) is not None:
@@ -589,6 +630,8 @@ class KnowledgeBase:
                     )
 
             self._save()  # save to disk after adding a document
+            if self.semantic_cache is not None:
+                self.semantic_cache.clear()
             
             # Log successful completion with total duration
             overall_duration = time.perf_counter() - overall_start_time
@@ -736,6 +779,8 @@ class KnowledgeBase:
         self.chunk_db.remove_document(doc_id)
         self.vector_db.remove_document(doc_id)
         self.file_system.delete_directory(self.kb_id, doc_id)
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
 
     def _get_chunk_text(self, doc_id: str, chunk_index: int) -> Optional[str]:
         """Get the text content of a specific chunk.
@@ -784,29 +829,70 @@ class KnowledgeBase:
         """
         return np.dot(v1, v2)
 
-    def _search(self, query: str, top_k: int, metadata_filter: Optional[MetadataFilter] = None) -> list:
+    def _search(
+        self,
+        query: str,
+        top_k: int,
+        metadata_filter: Optional[MetadataFilter] = None,
+        query_vector: Optional[Vector] = None,
+    ) -> list:
         """Search the knowledge base for relevant chunks.
 
-        Internal method for single query search.
+        Internal method for single query search. Pass query_vector if the query
+        has already been embedded.
         """
-        query_vector = self._get_embeddings([query], input_type="query")[0]
+        if query_vector is None:
+            query_vector = self._get_embeddings([query], input_type="query")[0]
         search_results = self.vector_db.search(query_vector, top_k, metadata_filter)
+        return self._rerank(query, search_results)
+
+    def _rerank(self, query: str, search_results: list) -> list:
+        """Rerank the search results of a query.
+
+        Internal method shared by single and batched search.
+        """
         if len(search_results) == 0:
             return []
-        search_results = self.reranker.rerank_search_results(query, search_results)
-        return search_results
+        return self.reranker.rerank_search_results(query, search_results)
 
     def _get_all_ranked_results(self, search_queries: list[str], metadata_filter: Optional[MetadataFilter] = None):
         """Execute multiple search queries.
 
         Internal method for parallel query execution.
         """
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(self._search, query, 200, metadata_filter) for query in search_queries]
-            all_ranked_results = []
-            for future in futures:
-                ranked_results = future.result()
-                all_ranked_results.append(ranked_results)
+        # Embed all queries in one request and score them against the vector DB together
+        query_vectors = self._get_embeddings(search_queries, input_type="query")
+        all_ranked_results = [None] * len(search_queries)
+
+        # Reuse the results of earlier, sufficiently similar queries with the same filter
+        cache_key = json.dumps(metadata_filter, sort_keys=True, default=str)
+        if self.semantic_cache is not None:
+            for i, query_vector in enumerate(query_vectors):
+                all_ranked_results[i] = self.semantic_cache.lookup(query_vector, cache_key)
+        uncached = [i for i, ranked_results in enumerate(all_ranked_results) if ranked_results is None]
+        if not uncached:
+            return all_ranked_results
+
+        if len(uncached) == 1:
+            i = uncached[0]
+            all_ranked_results[i] = self._search(
+                search_queries[i], 200, metadata_filter, query_vector=query_vectors[i]
+            )
+        else:
+            all_search_results = self.vector_db.search_batch(
+                [query_vectors[i] for i in uncached], 200, metadata_filter
+            )
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                futures = [
+                    executor.submit(self._rerank, search_queries[i], search_results)
+                    for i, search_results in zip(uncached, all_search_results)
+                ]
+                for i, future in zip(uncached, futures):
+                    all_ranked_results[i] = future.result()
+
+        if self.semantic_cache is not None:
+            for i in uncached:
+                self.semantic_cache.put(query_vectors[i], all_ranked_results[i], cache_key)
         return all_ranked_results
     
     def _get_segment_page_numbers(self, doc_id: str, chunk_start: int, chunk_end: int) -> tuple:
@@ -1,5 +1,6 @@
 # Metadata storage handling
 import os
+import tempfile
 from decimal import Decimal
 import json
 from typing import Any
@@ -48,8 +49,16 @@ class LocalMetadataStorage(MetadataStorage):
         if not os.path.exists(metadata_dir):
             os.makedirs(metadata_dir)
 
-        with open(metadata_path, "w") as f:
-            json.dump(full_data, f, indent=4)
+        # Write to a temp file and rename it into place, so concurrent loaders
+        # (possibly in other processes) never read a partially written config
+        fd, temp_path = tempfile.mkstemp(dir=metadata_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(full_data, f, indent=4)
+            os.replace(temp_path, metadata_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
 
     def delete(self, kb_id: str):
         metadata_path = self.get_metadata_path(kb_id)
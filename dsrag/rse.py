@@ -16,6 +16,9 @@ def get_best_segments(all_relevance_values: list[list], document_splits: list[in
     total_length = 0
     rv_index = 0
     bad_rv_indices = []
+    # segment values and static validity masks for each query, indexed by [start, length - 1]
+    all_segment_values = [_get_segment_values(relevance_values, document_splits, max_length) for relevance_values in all_relevance_values]
+    lengths = np.arange(1, max_length + 1)
     while total_length < overall_max_length:
         # cycle through the queries
         if rv_index >= len(all_relevance_values):
@@ -29,30 +32,24 @@ def get_best_segments(all_relevance_values: list[list], document_splits: list[in
             continue
         
         # find the best remaining segment for this query
-        relevance_values = all_relevance_values[rv_index] # get the relevance values for this query
+        segment_values, valid = all_segment_values[rv_index]
         best_segment = None
         best_value = -1000
-        for start in range(len(relevance_values)):
-            # skip over negative value starting points
-            if relevance_values[start] < 0:
-                continue
-            for end in range(start+1, min(start+max_length+1, len(relevance_values)+1)):
-                # skip over negative value ending points
-                if relevance_values[end-1] < 0:
-                    continue
-                # check if this segment overlaps with any of the best segments
-                if any(start < seg_end and end > seg_start for seg_start, seg_end in best_segments):
-                    continue
-                # check if this segment overlaps with any of the document splits
-                if any(start < split and end > split for split in document_splits):
-                    continue
-                # check if this segment would push us over the overall max length
-                if total_length + end - start > overall_max_length:
-                    continue
-                segment_value = sum(relevance_values[start:end]) # define segment value as the sum of the relevance values of its chunks
-                if segment_value > best_value:
-                    best_value = segment_value
-                    best_segment = (start, end)
+        if segment_values.size:
+            starts = np.arange(segment_values.shape[0])[:, None]
+            ends = starts + lengths
+            # skip segments that overlap with any of the best segments
+            valid = valid.copy()
+            for seg_start, seg_end in best_segments:
+                valid &= ~((starts < seg_end) & (ends > seg_start))
+            # skip segments that would push us over the overall max length
+            valid &= lengths <= overall_max_length - total_length
+            # the first segment with the highest value, in order of start and then end
+            candidate_values = np.where(valid, segment_values, -np.inf)
+            best_start, best_length_index = np.unravel_index(np.argmax(candidate_values), candidate_values.shape)
+            if candidate_values[best_start, best_length_index] > best_value:
+                best_value = float(candidate_values[best_start, best_length_index])
+                best_segment = (int(best_start), int(best_start + best_length_index + 1))
         
         # if we didn't find a valid segment, mark this query as done
         if best_segment is None or best_value < minimum_value:
@@ -68,6 +65,29 @@ def get_best_segments(all_relevance_values: list[list], document_splits: list[in
     
     return best_segments, scores
 
+def _get_segment_values(relevance_values: list[float], document_splits: list[int], max_length: int):
+    """
+    Compute the value of every candidate segment of a meta-document for get_best_segments
+
+    Returns
+    - segment_values: an array where [start, length - 1] is the value of the segment (start, start + length), defined as the sum of the relevance values of its chunks
+    - valid: a boolean array of the same shape that is False for segments that run past the end of the meta-document, start or end on a chunk with a negative value, or overlap with a document split
+    """
+    relevance_values = np.asarray(relevance_values, dtype=float)
+    num_chunks = len(relevance_values)
+    starts = np.arange(num_chunks)[:, None]
+    ends = starts + np.arange(1, max_length + 1)
+    
+    # cumulative sums along each row add the values in the same order as summing the segment directly
+    padded_values = np.concatenate([relevance_values, np.zeros(max_length)])
+    segment_values = np.cumsum(padded_values[ends - 1], axis=1)
+    
+    in_bounds = ends <= num_chunks
+    valid = in_bounds & (relevance_values[:, None] >= 0) & (padded_values[ends - 1] >= 0)
+    for split in document_splits:
+        valid &= ~((starts < split) & (ends > split))
+    return segment_values, valid
+
 def get_meta_document(all_ranked_results: list[list], top_k_for_document_selection: int):
     # get the top_k results for each query - and the document IDs for the top results across all queries
     top_document_ids = []
@@ -108,11 +128,15 @@ def get_chunk_value(chunk_info: dict, irrelevant_chunk_penalty: float, decay_rat
 
 def get_relevance_values(all_ranked_results: list[list], meta_document_length: int, document_start_points: dict[str, int], unique_document_ids: list[str], irrelevant_chunk_penalty: float, decay_rate: int = 20, chunk_length_adjustment = True):
     # get the relevance values for each chunk in the meta-document, separately for each query
+    unique_document_ids = set(unique_document_ids)
     all_relevance_values = []
     for ranked_results in all_ranked_results:
         
-        # loop through the top results for each query and add their rank to the relevance ranks list
-        all_chunk_info = [{} for _ in range(meta_document_length)]
+        # record the rank, relevance and length of each top result for this query at its position in the meta-document
+        # (chunks without a result keep the defaults used by get_chunk_value: rank 1000, relevance 0.0, length 0)
+        ranks = np.full(meta_document_length, 1000.0)
+        absolute_relevance_values = np.zeros(meta_document_length)
+        chunk_lengths = np.zeros(meta_document_length)
         for rank, result in enumerate(ranked_results):
             document_id = result["metadata"]["doc_id"]
             if document_id not in unique_document_ids:
@@ -120,19 +144,18 @@ def get_relevance_values(all_ranked_results: list[list], meta_document_length: i
             
             chunk_index = int(result["metadata"]["chunk_index"])
             meta_document_index = int(document_start_points[document_id] + chunk_index) # find the correct index for this chunk in the meta-document
-            absolute_relevance_value = result["similarity"]
-            chunk_length = len(result["metadata"]["chunk_text"]) # get the length of the chunk in characters
-            all_chunk_info[meta_document_index] = {'rank': rank, 'absolute_relevance_value': absolute_relevance_value, 'chunk_length': chunk_length}
+            ranks[meta_document_index] = rank
+            absolute_relevance_values[meta_document_index] = result["similarity"]
+            chunk_lengths[meta_document_index] = len(result["metadata"]["chunk_text"]) # get the length of the chunk in characters
 
-        # convert the relevance ranks and other info to chunk values
-        relevance_values = [get_chunk_value(chunk_info, irrelevant_chunk_penalty, decay_rate) for chunk_info in all_chunk_info]
+        # convert the relevance ranks and other info to chunk values, for all chunks at once (same formula as get_chunk_value)
+        relevance_values = np.exp(-ranks / decay_rate) * absolute_relevance_values - irrelevant_chunk_penalty
 
         if chunk_length_adjustment:
             # adjust the relevance values for the length of the chunks
-            chunk_lengths = [chunk_info.get('chunk_length', 0.0) for chunk_info in all_chunk_info]
             relevance_values = adjust_relevance_values_for_chunk_length(relevance_values, chunk_lengths)
 
-        all_relevance_values.append(relevance_values)
+        all_relevance_values.append(np.asarray(relevance_values).tolist())
     
     return all_relevance_values
 
@@ -142,11 +165,8 @@ def adjust_relevance_values_for_chunk_length(relevance_values: list[float], chun
     - reference_length is the length of a standard chunk, measured in number of characters (default is 700 characters, because this is the average length of a chunk when you set the max to 800, which is the default.)
     """
     assert len(relevance_values) == len(chunk_lengths), "The length of relevance_values and chunk_lengths must be the same"
-    adjusted_relevance_values = []
-    for relevance_value, chunk_length in zip(relevance_values, chunk_lengths):
-        bounded_chunk_length = max(chunk_length, reference_length) # only adjust relevance values for chunks that are longer than the reference length
-        adjusted_relevance_values.append(relevance_value * (bounded_chunk_length / reference_length))
-    return adjusted_relevance_values
+    bounded_chunk_lengths = np.maximum(np.asarray(chunk_lengths, dtype=float), reference_length) # only adjust relevance values for chunks that are longer than the reference length
+    return (np.asarray(relevance_values, dtype=float) * (bounded_chunk_lengths / reference_length)).tolist()
 
 RSE_PARAMS_PRESETS = {
     "balanced": {
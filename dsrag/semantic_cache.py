@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-memory cache from query embeddings to results, matched by cosine similarity.
+
+    A lookup returns the value stored for the most similar cached vector, if its
+    similarity is at least threshold, so repeated and near-duplicate queries reuse
+    earlier results. Entries expire after ttl seconds; when the cache is full, the
+    least recently used entry is replaced. Entries are only matched against lookups
+    with the same key (e.g. a serialized metadata filter).
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 1024, ttl: float = 300.0):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        # Unit-length vectors, one row per slot; allocated on the first put
+        self._vectors: Optional[np.ndarray] = None
+        # Per slot: None if free, else (key, value, created_at, last_used_at)
+        self._entries: list = [None] * max_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _is_live(self, entry, now: float) -> bool:
+        return entry is not None and now - entry[2] < self.ttl
+
+    def lookup(self, vector, key: Hashable = None) -> Optional[Any]:
+        """Return the value cached for the most similar vector with the same key, or None."""
+        query = self._normalize(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                return None
+            now = time.monotonic()
+            similarities = self._vectors @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                entry = self._entries[slot]
+                if self._is_live(entry, now) and entry[0] == key:
+                    self._entries[slot] = (entry[0], entry[1], entry[2], now)
+                    return entry[1]
+        return None
+
+    def put(self, vector, value: Any, key: Hashable = None) -> None:
+        """Cache value for vector and key, replacing an expired or the least recently used entry if full."""
+        vector = self._normalize(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_size
+            now = time.monotonic()
+            slot = next(
+                (i for i, entry in enumerate(self._entries) if not self._is_live(entry, now)),
+                None,
+            )
+            if slot is None:
+                slot = min(range(self.max_size), key=lambda i: self._entries[i][3])
+            self._vectors[slot] = vector
+            self._entries[slot] = (key, value, now, now)
+
+    def clear(self) -> None:
+        """Remove all entries, e.g. after the underlying data changes."""
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self.max_size
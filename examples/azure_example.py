@@ -14,10 +14,6 @@ Before running this example, set the following environment variables:
 
 import os
 import sys
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -26,6 +22,61 @@ from dsrag.knowledge_base import KnowledgeBase
 from dsrag.azure import AzureBlobStorage, AzureOpenAIChatAPI, AzureOpenAIEmbedding
 # AzureOpenAIVLM is imported conditionally in the example
 
+# Sample document for step 5, built once at import time
+SAMPLE_TEXT = """
+Microsoft Azure: A Comprehensive Cloud Platform
+
+Microsoft Azure is a comprehensive cloud computing platform that provides a wide array
+of services to help businesses build, deploy, and manage applications. Azure offers
+infrastructure as a service (IaaS), platform as a service (PaaS), and software as a
+service (SaaS) solutions.
+
+Key Azure Services:
+
+1. Compute Services: Azure provides virtual machines, container services (AKS), and
+   serverless computing (Azure Functions) to run applications.
+
+2. Storage Services: Azure Blob Storage offers scalable object storage for unstructured
+   data. It's ideal for storing documents, images, and backups.
+
+3. AI and Machine Learning: Azure OpenAI Service provides access to powerful language
+   models like GPT-4 for natural language processing, content generation, and more.
+
+4. Database Services: Azure offers managed database services including Azure SQL Database,
+   Cosmos DB for NoSQL, and Azure Database for PostgreSQL.
+
+5. Networking: Azure Virtual Network enables secure communication between Azure resources
+   and on-premises infrastructure.
+
+Azure OpenAI Service:
+
+Azure OpenAI Service combines OpenAI's cutting-edge models with Azure's enterprise-grade
+capabilities. It provides REST API access to GPT-4, GPT-3.5-Turbo, and embedding models.
+These models can be used for:
+- Content generation and summarization
+- Semantic search and retrieval
+- Code generation and analysis
+- Language translation
+- Question answering systems
+
+Azure Blob Storage:
+
+Azure Blob Storage is optimized for storing massive amounts of unstructured data. It offers:
+- Three storage tiers: Hot, Cool, and Archive
+- High availability and durability
+- Built-in security with encryption at rest
+- Global distribution with geo-replication
+- Integration with Azure CDN for fast content delivery
+
+Benefits of Using Azure:
+
+1. Scalability: Easily scale resources up or down based on demand
+2. Global Reach: Data centers in multiple regions worldwide
+3. Security: Enterprise-grade security and compliance certifications
+4. Cost Efficiency: Pay-as-you-go pricing with no upfront costs
+5. Integration: Seamless integration with other Microsoft services
+"""
+
 
 def main():
     """Main example function."""
@@ -41,11 +92,18 @@ def main():
     embedding_deployment = "text-embedding-ada-002"  # Change to your deployment name
     
     # Step 1: Initialize Azure Blob Storage
+    # Large blobs are downloaded as max_chunk_get_size ranges over up to max_concurrency
+    # parallel connections; blobs below max_single_get_size take a single request.
+    # Large uploads are split into max_block_size blocks the same way.
     print("\n1. Initializing Azure Blob Storage...")
     azure_storage = AzureBlobStorage(
         base_path=os.path.expanduser("~/dsrag_azure_example"),
         container_name=container_name,
         connection_string=os.environ.get("AZURE_STORAGE_CONNECTION_STRING"),
+        max_concurrency=16,
+        max_chunk_get_size=16 * 1024 * 1024,
+        max_single_get_size=64 * 1024 * 1024,
+        max_block_size=8 * 1024 * 1024,
     )
     print(f"   ✓ Azure Blob Storage initialized with container: {container_name}")
     
@@ -67,6 +125,8 @@ def main():
         dimension=1536,
         azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT"),
         api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
+        # Persist embeddings across runs, so re-ingesting unchanged text makes no API calls
+        cache_dir="~/.cache/dsrag/embeddings",
     )
     print(f"   ✓ Azure OpenAI Embedding initialized with deployment: {embedding_deployment}")
     
@@ -99,63 +159,11 @@ def main():
     
     # Step 5: Add a sample document
     print("\n5. Adding sample document...")
-    sample_text = """
-    Microsoft Azure: A Comprehensive Cloud Platform
-    
-    Microsoft Azure is a comprehensive cloud computing platform that provides a wide array
-    of services to help businesses build, deploy, and manage applications. Azure offers
-    infrastructure as a service (IaaS), platform as a service (PaaS), and software as a
-    service (SaaS) solutions.
-    
-    Key Azure Services:
-    
-    1. Compute Services: Azure provides virtual machines, container services (AKS), and
-       serverless computing (Azure Functions) to run applications.
-    
-    2. Storage Services: Azure Blob Storage offers scalable object storage for unstructured
-       data. It's ideal for storing documents, images, and backups.
-    
-    3. AI and Machine Learning: Azure OpenAI Service provides access to powerful language
-       models like GPT-4 for natural language processing, content generation, and more.
-    
-    4. Database Services: Azure offers managed database services including Azure SQL Database,
-       Cosmos DB for NoSQL, and Azure Database for PostgreSQL.
-    
-    5. Networking: Azure Virtual Network enables secure communication between Azure resources
-       and on-premises infrastructure.
-    
-    Azure OpenAI Service:
-    
-    Azure OpenAI Service combines OpenAI's cutting-edge models with Azure's enterprise-grade
-    capabilities. It provides REST API access to GPT-4, GPT-3.5-Turbo, and embedding models.
-    These models can be used for:
-    - Content generation and summarization
-    - Semantic search and retrieval
-    - Code generation and analysis
-    - Language translation
-    - Question answering systems
-    
-    Azure Blob Storage:
-    
-    Azure Blob Storage is optimized for storing massive amounts of unstructured data. It offers:
-    - Three storage tiers: Hot, Cool, and Archive
-    - High availability and durability
-    - Built-in security with encryption at rest
-    - Global distribution with geo-replication
-    - Integration with Azure CDN for fast content delivery
-    
-    Benefits of Using Azure:
-    
-    1. Scalability: Easily scale resources up or down based on demand
-    2. Global Reach: Data centers in multiple regions worldwide
-    3. Security: Enterprise-grade security and compliance certifications
-    4. Cost Efficiency: Pay-as-you-go pricing with no upfront costs
-    5. Integration: Seamless integration with other Microsoft services
-    """
-    
+    # add_document skips doc_ids already in the knowledge base, so re-running the
+    # example doesn't parse, embed or store this document again
     kb.add_document(
         doc_id="azure_overview",
-        text=sample_text,
+        text=SAMPLE_TEXT,
         document_title="Microsoft Azure Overview",
     )
     print("   ✓ Document 'azure_overview' added successfully")
@@ -196,8 +204,12 @@ def main():
     # Step 8: Test Azure OpenAI Embedding directly
     print("\n8. Testing Azure OpenAI Embedding directly...")
     test_texts = ["Azure is a cloud platform", "Machine learning in the cloud"]
+    test_texts += [f"Sample sentence number {i} about cloud storage" for i in range(198)]
+    # Pass all texts in one call: they are sent in batches of up to MAX_BATCH_SIZE (2048)
+    # texts per request, instead of one request per text. aget_embeddings also sends
+    # several batches concurrently.
     embeddings = azure_embedding.get_embeddings(test_texts)
-    print(f"   ✓ Generated {len(embeddings)} embeddings")
+    print(f"   ✓ Generated {len(embeddings)} embeddings in one request")
     print(f"   Embedding dimension: {len(embeddings[0])}")
     
     # Step 9: Demonstrate persistence
@@ -245,6 +257,10 @@ def cleanup_example():
 
 if __name__ == "__main__":
     import argparse
+    from dotenv import load_dotenv
+    
+    # Load environment variables
+    load_dotenv()
     
     parser = argparse.ArgumentParser(description="dsRAG Azure Integration Example")
     parser.add_argument(
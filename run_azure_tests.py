@@ -7,12 +7,11 @@ This script provides a convenient way to run Azure tests with different options.
 
 import sys
 import os
+import io
+import contextlib
 import subprocess
 import argparse
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from concurrent.futures import ProcessPoolExecutor
 
 
 def print_header(text):
@@ -34,20 +33,27 @@ def check_syntax():
         "dsrag/azure/azure_openai_vlm.py",
     ]
     
+    # Compile in this process rather than in a py_compile subprocess, which would
+    # pay for a second interpreter startup on every run
+    errors = []
     try:
-        cmd = ["python3", "-m", "py_compile"] + azure_files
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print("✓ All Azure module files have valid Python syntax")
-            return True
-        else:
-            print("✗ Syntax errors found:")
-            print(result.stderr)
-            return False
+        for path in azure_files:
+            with open(path, "rb") as f:
+                source = f.read()
+            try:
+                compile(source, path, "exec")
+            except SyntaxError as e:
+                errors.append(f"  {path}:{e.lineno}: {e.msg}")
     except Exception as e:
         print(f"✗ Error checking syntax: {e}")
         return False
+    
+    if errors:
+        print("✗ Syntax errors found:")
+        print("\n".join(errors))
+        return False
+    print("✓ All Azure module files have valid Python syntax")
+    return True
 
 
 def run_unit_tests():
@@ -109,6 +115,7 @@ def run_integration_tests():
         return False
     
     try:
+        # The test classes share the storage container, so they run in one process, in order
         cmd = ["python3", "tests/integration/test_azure_integration.py"]
         result = subprocess.run(cmd, capture_output=True, text=True)
         
@@ -173,6 +180,41 @@ def cleanup_example():
         return False
 
 
+def _run_captured(stages):
+    """Run stages in order in a worker process, returning whether each passed and what they printed."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        passed = [stage() for _, stage in stages]
+    return passed, buffer.getvalue()
+
+
+def run_stage_groups_in_parallel(groups):
+    """
+    Run groups of stages at the same time, each group in its own process.
+    
+    Stages within a group run one after another, so stages that share Azure
+    resources belong in the same group. Output is printed group by group once
+    all have finished, so it isn't interleaved.
+    
+    Args:
+        groups: List of lists of (name, function) pairs; each function returns True if the stage passed
+    
+    Returns:
+        List of (name, passed) pairs, in the order of groups and their stages
+    """
+    if len(groups) == 1:
+        return [(name, stage()) for name, stage in groups[0]]
+    
+    with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+        outcomes = list(executor.map(_run_captured, groups))
+    
+    results = []
+    for stages, (passed, output) in zip(groups, outcomes):
+        print(output, end="")
+        results.extend((name, stage_passed) for (name, _), stage_passed in zip(stages, passed))
+    return results
+
+
 def check_environment():
     """Check environment setup."""
     print_header("Checking Environment")
@@ -283,6 +325,12 @@ Examples:
         parser.print_help()
         return
     
+    # Load environment variables from .env file, unless only checking syntax. Worker
+    # processes for the parallel stages inherit them.
+    if any(value for name, value in vars(args).items() if name != "syntax"):
+        from dotenv import load_dotenv
+        load_dotenv()
+    
     results = []
     
     if args.check:
@@ -291,14 +339,27 @@ Examples:
     if args.syntax or args.all:
         results.append(("Syntax Check", check_syntax()))
     
+    # The unit tests don't touch Azure, so they run alongside the stages that do.
+    # Those share the storage container, so they run one after another. All are
+    # gated on the syntax check passing.
+    local_stages = []
     if args.unit or args.all:
-        results.append(("Unit Tests", run_unit_tests()))
+        local_stages.append(("Unit Tests", run_unit_tests))
     
+    azure_stages = []
     if args.integration or args.all:
-        results.append(("Integration Tests", run_integration_tests()))
+        azure_stages.append(("Integration Tests", run_integration_tests))
     
     if args.example:
-        results.append(("Example", run_example()))
+        azure_stages.append(("Example", run_example))
+    
+    groups = [group for group in (local_stages, azure_stages) if group]
+    if groups:
+        if all(passed for _, passed in results):
+            results.extend(run_stage_groups_in_parallel(groups))
+        else:
+            print("\nSkipping remaining stages because the syntax check failed.")
+            results.extend((name, False) for group in groups for name, _ in group)
     
     if args.cleanup:
         results.append(("Cleanup", cleanup_example()))
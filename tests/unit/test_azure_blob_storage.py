@@ -3,8 +3,13 @@
 import os
 import sys
 import unittest
+import asyncio
 import json
-from unittest.mock import Mock, patch, MagicMock
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import ANY, AsyncMock, Mock, patch, MagicMock
 from io import BytesIO
 from PIL import Image
 
@@ -15,12 +20,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 sys.modules['azure.storage.blob'] = MagicMock()
 sys.modules['azure.core.exceptions'] = MagicMock()
 
-from dsrag.azure.blob_storage import AzureBlobStorage
+from dsrag.azure.blob_storage import JPEG_SAVE_OPTIONS, AzureBlobStorage, close_shared_blob_service_clients
+from dsrag.azure import blob_storage
 
 
 class TestAzureBlobStorageInit(unittest.TestCase):
     """Test initialization of AzureBlobStorage."""
     
+    def setUp(self):
+        """Start each test without shared clients from earlier tests."""
+        close_shared_blob_service_clients()
+    
     @patch('dsrag.azure.blob_storage.BlobServiceClient')
     def test_init_with_connection_string(self, mock_blob_service):
         """Test initialization with connection string."""
@@ -38,7 +48,16 @@ class TestAzureBlobStorageInit(unittest.TestCase):
         self.assertEqual(storage.base_path, "/tmp/test")
         self.assertEqual(storage.container_name, "test-container")
         self.assertEqual(storage.connection_string, "test_connection_string")
-        mock_blob_service.from_connection_string.assert_called_once_with("test_connection_string")
+        mock_blob_service.from_connection_string.assert_called_once_with(
+            "test_connection_string",
+            retry_policy=ANY,
+            max_chunk_get_size=16 * 1024 * 1024,
+            max_single_get_size=64 * 1024 * 1024,
+            max_block_size=8 * 1024 * 1024,
+            transport=ANY,
+        )
+        mock_client.get_container_client.assert_called_once_with("test-container")
+        self.assertIs(storage.container_client, mock_container)
     
     @patch('dsrag.azure.blob_storage.BlobServiceClient')
     def test_init_with_account_credentials(self, mock_blob_service):
@@ -58,7 +77,124 @@ class TestAzureBlobStorageInit(unittest.TestCase):
         self.assertEqual(storage.account_name, "testaccount")
         self.assertEqual(storage.account_key, "testkey")
         mock_blob_service.assert_called_once()
+        self.assertIn("retry_policy", mock_blob_service.call_args.kwargs)
+    
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_with_transfer_options(self, mock_blob_service):
+        """Transfer sizes go to the client and round-trip through to_dict."""
+        storage = AzureBlobStorage(
+            base_path="/tmp/test",
+            container_name="test-container",
+            connection_string="test_connection_string",
+            max_concurrency=4,
+            max_chunk_get_size=8 * 1024 * 1024,
+            max_single_get_size=32 * 1024 * 1024,
+            max_block_size=4 * 1024 * 1024,
+        )
+        
+        kwargs = mock_blob_service.from_connection_string.call_args.kwargs
+        self.assertEqual(kwargs["max_chunk_get_size"], 8 * 1024 * 1024)
+        self.assertEqual(kwargs["max_single_get_size"], 32 * 1024 * 1024)
+        self.assertEqual(kwargs["max_block_size"], 4 * 1024 * 1024)
+        config = storage.to_dict()
+        self.assertEqual(config["max_concurrency"], 4)
+        self.assertEqual(config["max_chunk_get_size"], 8 * 1024 * 1024)
+        self.assertEqual(config["max_single_get_size"], 32 * 1024 * 1024)
+        self.assertEqual(config["max_block_size"], 4 * 1024 * 1024)
+    
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_sizes_connection_pool(self, mock_blob_service):
+        """The sync transport keeps enough connections for max_concurrency parallel transfers."""
+        AzureBlobStorage(
+            base_path="/tmp/test",
+            container_name="test-container",
+            connection_string="test_connection_string",
+            max_concurrency=64,
+        )
+        
+        transport = mock_blob_service.from_connection_string.call_args.kwargs["transport"]
+        adapter = transport.session.get_adapter("https://testaccount.blob.core.windows.net")
+        self.assertEqual(adapter._pool_maxsize, 64)
+    
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_shares_client(self, mock_blob_service):
+        """Instances with the same account and settings share one client until it's closed."""
+        def make_storage(**kwargs):
+            return AzureBlobStorage(
+                base_path="/tmp/test",
+                container_name="test-container",
+                connection_string="test_connection_string",
+                **kwargs,
+            )
+        
+        first, second = make_storage(), make_storage()
+        make_storage(max_concurrency=4)
+        
+        self.assertIs(first.blob_service_client, second.blob_service_client)
+        self.assertEqual(mock_blob_service.from_connection_string.call_count, 2)
+        
+        close_shared_blob_service_clients()
+        first.blob_service_client.close.assert_called()
+        make_storage()
+        self.assertEqual(mock_blob_service.from_connection_string.call_count, 3)
     
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_checks_container_once(self, mock_blob_service):
+        """The container is checked once per shared client, until the clients are closed."""
+        def make_storage():
+            return AzureBlobStorage(
+                base_path="/tmp/test",
+                container_name="test-container",
+                connection_string="test_connection_string",
+            )
+        
+        container_client = make_storage().container_client
+        make_storage()
+        self.assertEqual(container_client.get_container_properties.call_count, 1)
+        
+        close_shared_blob_service_clients()
+        make_storage()
+        self.assertEqual(container_client.get_container_properties.call_count, 2)
+    
+    @patch.dict(os.environ, {"AZURE_STORAGE_CONNECTION_STRING": "env_connection_string"})
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_reads_connection_string_from_environment(self, mock_blob_service):
+        """A configuration restored from to_dict gets its secrets from the environment."""
+        config = AzureBlobStorage(
+            base_path="/tmp/test",
+            container_name="test-container",
+            connection_string="test_connection_string",
+        ).to_dict()
+        self.assertNotIn("test_connection_string", json.dumps(config))
+        
+        config.pop("subclass_name")
+        storage = AzureBlobStorage(**config)
+        
+        self.assertEqual(storage.connection_string, "env_connection_string")
+        mock_blob_service.from_connection_string.assert_called_with(
+            "env_connection_string",
+            retry_policy=ANY,
+            max_chunk_get_size=ANY,
+            max_single_get_size=ANY,
+            max_block_size=ANY,
+            transport=ANY,
+        )
+    
+    @patch.dict(os.environ, {"AZURE_STORAGE_CONNECTION_STRING": "env_connection_string"})
+    @patch('dsrag.azure.blob_storage.BlobServiceClient')
+    def test_init_explicit_account_key_ignores_environment(self, mock_blob_service):
+        """Explicit account credentials aren't overridden by a connection string in the environment."""
+        storage = AzureBlobStorage(
+            base_path="/tmp/test",
+            container_name="test-container",
+            account_name="testaccount",
+            account_key="testkey",
+        )
+        
+        self.assertIsNone(storage.connection_string)
+        mock_blob_service.from_connection_string.assert_not_called()
+    
+    @patch.dict(os.environ, clear=True)
     @patch('dsrag.azure.blob_storage.BlobServiceClient')
     def test_init_without_credentials_raises_error(self, mock_blob_service):
         """Test that initialization without credentials raises ValueError."""
@@ -74,13 +210,14 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures."""
+        close_shared_blob_service_clients()
         with patch('dsrag.azure.blob_storage.BlobServiceClient'):
             self.storage = AzureBlobStorage(
                 base_path="/tmp/test",
                 container_name="test-container",
                 connection_string="test_connection_string"
             )
-            self.storage.blob_service_client = MagicMock()
+            self.storage.container_client = MagicMock()
     
     def test_create_directory(self):
         """Test create_directory method."""
@@ -89,6 +226,13 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
             self.storage.create_directory("kb1", "doc1")
             self.storage.delete_directory.assert_called_once_with("kb1", "doc1")
     
+    def test_create_directory_without_overwrite(self):
+        """With overwrite=False, no requests are made."""
+        with patch.object(self.storage, 'delete_directory'):
+            self.storage.create_directory("kb1", "doc1", overwrite=False)
+            self.storage.delete_directory.assert_not_called()
+        self.storage.container_client.list_blobs.assert_not_called()
+    
     def test_delete_directory(self):
         """Test delete_directory method."""
         mock_container = MagicMock()
@@ -98,19 +242,15 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
         mock_blob2.name = "kb1/doc1/file2.json"
         
         mock_container.list_blobs.return_value = [mock_blob1, mock_blob2]
-        self.storage.blob_service_client.get_container_client.return_value = mock_container
-        
-        mock_blob_client1 = MagicMock()
-        mock_blob_client2 = MagicMock()
-        self.storage.blob_service_client.get_blob_client.side_effect = [
-            mock_blob_client1, mock_blob_client2
-        ]
+        self.storage.container_client = mock_container
         
         self.storage.delete_directory("kb1", "doc1")
         
-        mock_container.list_blobs.assert_called_once_with(name_starts_with="kb1/doc1/")
-        self.assertEqual(mock_blob_client1.delete_blob.call_count, 1)
-        self.assertEqual(mock_blob_client2.delete_blob.call_count, 1)
+        mock_container.list_blobs.assert_called_once_with(name_starts_with="kb1/doc1/", results_per_page=5000)
+        mock_container.delete_blobs.assert_called_once_with(
+            "kb1/doc1/file1.jpg", "kb1/doc1/file2.json", raise_on_any_failure=False
+        )
+        self.storage.container_client.get_blob_client.assert_not_called()
     
     def test_delete_kb(self):
         """Test delete_kb method."""
@@ -118,64 +258,225 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
         mock_blob = MagicMock()
         mock_blob.name = "kb1/file1.jpg"
         mock_container.list_blobs.return_value = [mock_blob]
-        self.storage.blob_service_client.get_container_client.return_value = mock_container
+        self.storage.container_client = mock_container
         
-        mock_blob_client = MagicMock()
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.delete_kb("kb1")
+        
+        mock_container.list_blobs.assert_called_once_with(name_starts_with="kb1/", results_per_page=5000)
+        mock_container.delete_blobs.assert_called_once_with("kb1/file1.jpg", raise_on_any_failure=False)
+    
+    @patch('dsrag.azure.blob_storage.MAX_BATCH_DELETE_SIZE', 2)
+    def test_delete_kb_batches(self):
+        """Blobs are deleted in batches of at most MAX_BATCH_DELETE_SIZE."""
+        mock_container = MagicMock()
+        blobs = []
+        for i in range(5):
+            blob = MagicMock()
+            blob.name = f"kb1/doc1/page_{i}.jpg"
+            blobs.append(blob)
+        mock_container.list_blobs.return_value = blobs
+        self.storage.container_client = mock_container
         
         self.storage.delete_kb("kb1")
         
-        mock_container.list_blobs.assert_called_once_with(name_starts_with="kb1/")
-        mock_blob_client.delete_blob.assert_called_once()
+        batches = sorted(call.args for call in mock_container.delete_blobs.call_args_list)
+        self.assertEqual(batches, [
+            ("kb1/doc1/page_0.jpg", "kb1/doc1/page_1.jpg"),
+            ("kb1/doc1/page_2.jpg", "kb1/doc1/page_3.jpg"),
+            ("kb1/doc1/page_4.jpg",),
+        ])
+    
+    def test_delete_prefix_ignores_missing_blobs(self):
+        """Blobs already deleted (404) don't fail the batch, other failed deletes raise."""
+        class StorageError(Exception):
+            pass
+        
+        mock_container = MagicMock()
+        mock_blob = MagicMock()
+        mock_blob.name = "kb1/doc1/file1.jpg"
+        mock_container.list_blobs.return_value = [mock_blob]
+        self.storage.container_client = mock_container
+        
+        with patch('dsrag.azure.blob_storage.AzureError', StorageError):
+            mock_container.delete_blobs.return_value = iter([Mock(status_code=202), Mock(status_code=404)])
+            self.storage._delete_prefix("kb1/doc1/")
+            
+            mock_container.delete_blobs.return_value = iter([Mock(status_code=404), Mock(status_code=403)])
+            with self.assertRaises(StorageError):
+                self.storage._delete_prefix("kb1/doc1/")
+    
+    def test_delete_directory_surfaces_programming_errors(self):
+        """Storage errors are logged, but other exceptions are raised."""
+        class StorageError(Exception):
+            pass
+        
+        with patch('dsrag.azure.blob_storage.AzureError', StorageError):
+            self.storage.container_client.list_blobs.side_effect = StorageError("throttled")
+            self.storage.delete_directory("kb1", "doc1")
+            
+            self.storage.container_client.list_blobs.side_effect = TypeError("bug")
+            with self.assertRaises(TypeError):
+                self.storage.delete_directory("kb1", "doc1")
     
     def test_save_json(self):
         """Test save_json method."""
         mock_blob_client = MagicMock()
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         test_data = {"key": "value", "number": 123}
         self.storage.save_json("kb1", "doc1", "test.json", test_data)
         
-        self.storage.blob_service_client.get_blob_client.assert_called_once_with(
-            container="test-container",
-            blob="kb1/doc1/test.json"
-        )
+        self.storage.container_client.get_blob_client.assert_called_once_with("kb1/doc1/test.json")
         mock_blob_client.upload_blob.assert_called_once()
+        data = mock_blob_client.upload_blob.call_args.args[0]
+        kwargs = mock_blob_client.upload_blob.call_args.kwargs
+        self.assertEqual(kwargs["length"], len(data))
+        self.assertEqual(kwargs["max_concurrency"], self.storage.max_concurrency)
     
     def test_save_image(self):
         """Test save_image method."""
         mock_blob_client = MagicMock()
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         # Create a test image
         image = Image.new('RGB', (100, 100), color='red')
         
         self.storage.save_image("kb1", "doc1", "test.jpg", image)
         
-        self.storage.blob_service_client.get_blob_client.assert_called_once_with(
-            container="test-container",
-            blob="kb1/doc1/test.jpg"
-        )
+        self.storage.container_client.get_blob_client.assert_called_once_with("kb1/doc1/test.jpg")
         mock_blob_client.upload_blob.assert_called_once()
+        encoded = BytesIO()
+        image.save(encoded, **JPEG_SAVE_OPTIONS)
+        kwargs = mock_blob_client.upload_blob.call_args.kwargs
+        self.assertEqual(kwargs["length"], len(encoded.getvalue()))
+        self.assertEqual(kwargs["max_concurrency"], self.storage.max_concurrency)
+    
+    def test_save_image_bytes_passthrough(self):
+        """Image bytes are uploaded as is, without decoding or re-encoding them."""
+        mock_blob_client = MagicMock()
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        
+        with patch.object(Image.Image, 'save') as image_save, \
+                patch('dsrag.azure.blob_storage.ContentSettings') as content_settings:
+            self.storage.save_image("kb1", "doc1", "page_1.png", memoryview(b"png bytes"))
+        
+        image_save.assert_not_called()
+        content_settings.assert_called_once_with(content_type='image/png')
+        args, kwargs = mock_blob_client.upload_blob.call_args
+        self.assertEqual(args[0], b"png bytes")
+        self.assertEqual(kwargs["length"], len(b"png bytes"))
+    
+    def test_save_image_from_path(self):
+        """Image files are uploaded as is, with their length and content type."""
+        mock_blob_client = MagicMock()
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, "page.PNG")
+            with open(image_path, "wb") as f:
+                f.write(b"png bytes")
+            
+            with patch('dsrag.azure.blob_storage.ContentSettings') as content_settings:
+                self.storage.save_image_from_path("kb1", "doc1", "page_1.png", image_path)
+        
+        content_settings.assert_called_once_with(content_type='image/png')
+        self.storage.container_client.get_blob_client.assert_called_once_with("kb1/doc1/page_1.png")
+        kwargs = mock_blob_client.upload_blob.call_args.kwargs
+        self.assertEqual(kwargs["length"], len(b"png bytes"))
+        self.assertTrue(kwargs["overwrite"])
     
     @patch('builtins.open', create=True)
-    @patch('os.path.exists')
     @patch('os.makedirs')
-    def test_get_files(self, mock_makedirs, mock_exists, mock_open):
+    def test_get_files(self, mock_makedirs, mock_open):
         """Test get_files method."""
-        mock_exists.return_value = False
+        blobs = []
+        for name in ["kb1/doc1/page_1.jpg", "kb1/doc1/page_2.jpg"]:
+            blob = MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        self.storage.container_client.list_blobs.return_value = blobs
         mock_blob_client = MagicMock()
-        mock_download = MagicMock()
-        mock_download.readall.return_value = b"fake image data"
-        mock_blob_client.download_blob.return_value = mock_download
-        
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         result = self.storage.get_files("kb1", "doc1", 1, 2)
         
-        # Should try to get 2 files (pages 1 and 2)
+        # Should get 2 files (pages 1 and 2) after a single listing
         self.assertEqual(len(result), 2)
         self.assertTrue(all("page_" in path for path in result))
+        # Pages download concurrently, so only the set of fetched blobs is fixed
+        downloaded = sorted(call.args[0] for call in self.storage.container_client.get_blob_client.call_args_list)
+        self.assertEqual(downloaded, ["kb1/doc1/page_1.jpg", "kb1/doc1/page_2.jpg"])
+        mock_makedirs.assert_called_once_with(os.path.join("/tmp/test", "kb1", "doc1"), exist_ok=True)
+        self.storage.container_client.list_blobs.assert_called_once_with(
+            name_starts_with="kb1/doc1/page_", results_per_page=5000
+        )
+    
+    def test_get_files_picks_extension_from_listing(self):
+        """Pages prefer .jpg, then .jpeg, then .png; missing pages are skipped and order is kept."""
+        blobs = []
+        for name in ["kb1/doc1/page_3.jpg", "kb1/doc1/page_1.png", "kb1/doc1/page_content_2.json",
+                     "kb1/doc1/page_3.png", "kb1/doc1/page_4.jpg"]:
+            blob = MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        self.storage.container_client.list_blobs.return_value = blobs
+        self.storage.base_path = tempfile.mkdtemp()
+
+        result = self.storage.get_files("kb1", "doc1", 1, 3)
+
+        self.assertEqual(result, [
+            os.path.join(self.storage.base_path, "kb1/doc1/page_1.png"),
+            os.path.join(self.storage.base_path, "kb1/doc1/page_3.jpg"),
+        ])
+        downloaded = sorted(call.args[0] for call in self.storage.container_client.get_blob_client.call_args_list)
+        self.assertEqual(downloaded, ["kb1/doc1/page_1.png", "kb1/doc1/page_3.jpg"])
+        shutil.rmtree(self.storage.base_path)
+    
+    def test_get_files_caches_page_listing(self):
+        """Page listings are reused until a page outside them is requested or an image is saved."""
+        blobs = []
+        for name in ["kb1/doc1/page_1.jpg", "kb1/doc1/page_2.jpg"]:
+            blob = MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        self.storage.container_client.list_blobs.return_value = blobs
+        self.storage.base_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage.base_path)
+        list_blobs = self.storage.container_client.list_blobs
+        
+        self.storage.get_files("kb1", "doc1", 1, 2)
+        self.storage.get_files("kb1", "doc1", 2, 2)
+        self.assertEqual(list_blobs.call_count, 1)
+        
+        # Page 3 may have been added since the listing, so it's refreshed
+        self.storage.get_files("kb1", "doc1", 2, 3)
+        self.assertEqual(list_blobs.call_count, 2)
+        
+        self.storage.save_image("kb1", "doc1", "page_3.jpg", Image.new('RGB', (10, 10)))
+        self.storage.get_files("kb1", "doc1", 1, 2)
+        self.assertEqual(list_blobs.call_count, 3)
+    
+    def test_get_all_jpg_files(self):
+        """All page images are downloaded and returned sorted by page number."""
+        mock_container = MagicMock()
+        blobs = []
+        for name in ["kb1/doc1/page_10.jpg", "kb1/doc1/page_2.jpg", "kb1/doc1/elements.json", "kb1/doc1/page_1.png"]:
+            blob = MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        mock_container.list_blobs.return_value = blobs
+        self.storage.container_client = mock_container
+        self.storage.base_path = tempfile.mkdtemp()
+
+        result = self.storage.get_all_jpg_files("kb1", "doc1")
+
+        self.assertEqual(result, [
+            os.path.join(self.storage.base_path, "kb1/doc1/page_1.png"),
+            os.path.join(self.storage.base_path, "kb1/doc1/page_2.jpg"),
+            os.path.join(self.storage.base_path, "kb1/doc1/page_10.jpg"),
+        ])
+        self.assertEqual(self.storage.container_client.get_blob_client.call_count, 3)
+        mock_container.list_blobs.assert_called_once_with(name_starts_with="kb1/doc1/", results_per_page=5000)
+        shutil.rmtree(self.storage.base_path)
     
     def test_load_page_content(self):
         """Test load_page_content method."""
@@ -185,7 +486,7 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
         mock_download.readall.return_value = json.dumps(test_content).encode('utf-8')
         mock_blob_client.download_blob.return_value = mock_download
         
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         result = self.storage.load_page_content("kb1", "doc1", 1)
         
@@ -199,15 +500,127 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
         mock_download.readall.return_value = json.dumps(test_data).encode('utf-8')
         mock_blob_client.download_blob.return_value = mock_download
         
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         result = self.storage.load_data("kb1", "doc1", "elements")
         
         self.assertEqual(result, test_data)
-        self.storage.blob_service_client.get_blob_client.assert_called_once_with(
-            container="test-container",
-            blob="kb1/doc1/elements.json"
-        )
+        self.storage.container_client.get_blob_client.assert_called_once_with("kb1/doc1/elements.json")
+    
+    def test_load_data_revalidates_cached_blob(self):
+        """By default a cached blob is re-read with a conditional GET and served from cache on 304."""
+        class NotModified(Exception):
+            pass
+
+        mock_blob_client = MagicMock()
+        first_download = MagicMock()
+        first_download.readall.return_value = json.dumps({"key": "value"}).encode('utf-8')
+        first_download.properties.etag = '"etag-1"'
+        mock_blob_client.download_blob.side_effect = [first_download, NotModified()]
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+
+        with patch('dsrag.azure.blob_storage.ResourceNotModifiedError', NotModified):
+            first = self.storage.load_data("kb1", "doc1", "elements")
+            first["key"] = "changed"
+            second = self.storage.load_data("kb1", "doc1", "elements")
+
+        self.assertEqual(second, {"key": "value"})
+        self.assertEqual(mock_blob_client.download_blob.call_args_list[1].kwargs["etag"], '"etag-1"')
+
+    def test_load_data_picks_up_changed_blob(self):
+        """A blob changed by another writer is downloaded again on the next read."""
+        mock_blob_client = MagicMock()
+        first_download = MagicMock()
+        first_download.readall.return_value = b'{"key": "value"}'
+        first_download.properties.etag = '"etag-1"'
+        second_download = MagicMock()
+        second_download.readall.return_value = b'{"key": "other"}'
+        second_download.properties.etag = '"etag-2"'
+        mock_blob_client.download_blob.side_effect = [first_download, second_download]
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+
+        self.storage.load_data("kb1", "doc1", "elements")
+
+        self.assertEqual(self.storage.load_data("kb1", "doc1", "elements"), {"key": "other"})
+        self.assertEqual(self.storage._json_cache["kb1/doc1/elements.json"][0], '"etag-2"')
+
+    def test_load_data_serves_recent_blob_from_cache(self):
+        """With json_cache_ttl set, a recently validated blob is returned without another request."""
+        mock_blob_client = MagicMock()
+        mock_blob_client.download_blob.return_value.readall.return_value = b'{"key": "value"}'
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        self.storage.json_cache_ttl = 60
+
+        first = self.storage.load_data("kb1", "doc1", "elements")
+        first["key"] = "changed"
+        second = self.storage.load_data("kb1", "doc1", "elements")
+
+        self.assertEqual(second, {"key": "value"})
+        mock_blob_client.download_blob.assert_called_once()
+
+    def test_delete_directory_evicts_cached_blobs(self):
+        """Deleting a directory drops its blobs from the cache, but not other documents'."""
+        self.storage._json_cache["kb1/doc1/elements.json"] = ('"etag-1"', b"{}", 0.0)
+        self.storage._json_cache["kb1/doc10/elements.json"] = ('"etag-1"', b"{}", 0.0)
+
+        self.storage.delete_directory("kb1", "doc1")
+
+        self.assertNotIn("kb1/doc1/elements.json", self.storage._json_cache)
+        self.assertIn("kb1/doc10/elements.json", self.storage._json_cache)
+
+    def test_save_json_caches_written_blob(self):
+        """Overwriting a blob replaces its cache entry, so reading it back is a conditional GET."""
+        class NotModified(Exception):
+            pass
+
+        mock_blob_client = MagicMock()
+        mock_blob_client.upload_blob.return_value = {"etag": '"etag-2"'}
+        mock_blob_client.download_blob.side_effect = NotModified()
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        self.storage._json_cache["kb1/doc1/elements.json"] = ('"etag-1"', b"{}", 0.0)
+
+        self.storage.save_json("kb1", "doc1", "elements.json", {"key": "value"})
+
+        self.assertEqual(self.storage._json_cache["kb1/doc1/elements.json"][0], '"etag-2"')
+        with patch('dsrag.azure.blob_storage.ResourceNotModifiedError', NotModified):
+            self.assertEqual(self.storage.load_data("kb1", "doc1", "elements"), {"key": "value"})
+        self.assertEqual(mock_blob_client.download_blob.call_args.kwargs["etag"], '"etag-2"')
+
+    def test_save_json_always_uploads(self):
+        """Saving contents identical to the cached blob still uploads, since another writer may have changed it."""
+        mock_blob_client = MagicMock()
+        mock_blob_client.upload_blob.return_value = {"etag": '"etag-1"'}
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+
+        self.storage.save_json("kb1", "doc1", "elements.json", {"key": "value"})
+        self.storage.save_json("kb1", "doc1", "elements.json", {"key": "value"})
+
+        self.assertEqual(mock_blob_client.upload_blob.call_count, 2)
+
+    def test_save_json_failure_evicts_cached_blob(self):
+        """A failed upload drops the blob from the cache, since its contents are unknown."""
+        mock_blob_client = MagicMock()
+        mock_blob_client.upload_blob.side_effect = Exception("network error")
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        self.storage._json_cache["kb1/doc1/elements.json"] = ('"etag-1"', b"{}", 0.0)
+
+        with self.assertRaises(RuntimeError):
+            self.storage.save_json("kb1", "doc1", "elements.json", {"key": "value"})
+
+        self.assertNotIn("kb1/doc1/elements.json", self.storage._json_cache)
+    
+    def test_json_round_trip_with_and_without_orjson(self):
+        """JSON blobs are written compactly and read back the same with or without orjson."""
+        from dsrag.azure import blob_storage
+        data = {"content": "Page text", "elements": [{"page_number": 1, "score": 0.5}], 2: None}
+        
+        with_orjson = blob_storage._json_dumps(data)
+        with patch.object(blob_storage, "orjson", None):
+            without_orjson = blob_storage._json_dumps(data)
+            self.assertEqual(blob_storage._json_loads(with_orjson), blob_storage._json_loads(without_orjson))
+        
+        self.assertEqual(json.loads(with_orjson), json.loads(json.dumps(data)))
+        self.assertNotIn(b"\n", without_orjson)
     
     def test_to_dict(self):
         """Test to_dict serialization."""
@@ -216,7 +629,169 @@ class TestAzureBlobStorageOperations(unittest.TestCase):
         self.assertEqual(result['subclass_name'], 'AzureBlobStorage')
         self.assertEqual(result['base_path'], '/tmp/test')
         self.assertEqual(result['container_name'], 'test-container')
-        self.assertIn('connection_string', result)
+        self.assertIsNone(result['connection_string'])
+        self.assertIsNone(result['account_key'])
+
+
+class TestAzureBlobStorageAsync(unittest.TestCase):
+    """Test the async variants of AzureBlobStorage operations."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        close_shared_blob_service_clients()
+        with patch('dsrag.azure.blob_storage.BlobServiceClient'):
+            self.storage = AzureBlobStorage(
+                base_path=tempfile.mkdtemp(),
+                container_name="test-container",
+                connection_string="test_connection_string"
+            )
+        self.addCleanup(shutil.rmtree, self.storage.base_path)
+        
+        # Async container client; blob clients are created per blob path
+        self.container = MagicMock()
+        self.container.__aenter__.return_value = self.container
+        self.container.delete_blobs = AsyncMock()
+        self.blob_clients = {}
+        
+        def get_blob_client(blob_path):
+            if blob_path not in self.blob_clients:
+                self.blob_clients[blob_path] = self.make_blob_client()
+            return self.blob_clients[blob_path]
+        
+        self.container.get_blob_client.side_effect = get_blob_client
+        patcher = patch.object(self.storage, '_new_async_container_client', return_value=self.container)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    @staticmethod
+    def make_blob_client():
+        blob_client = MagicMock()
+        blob_client.upload_blob = AsyncMock()
+        blob_client.download_blob = AsyncMock()
+        return blob_client
+    
+    def set_blobs(self, names):
+        blobs = []
+        for name in names:
+            blob = MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        self.container.list_blobs.return_value.__aiter__.return_value = blobs
+    
+    def test_aget_files_picks_extension_from_listing(self):
+        """Pages prefer .jpg, then .jpeg, then .png; missing pages are skipped and order is kept."""
+        self.set_blobs(["kb1/doc1/page_3.png", "kb1/doc1/page_1.png", "kb1/doc1/page_3.jpg"])
+        
+        result = asyncio.run(self.storage.aget_files("kb1", "doc1", 1, 3))
+        
+        self.assertEqual(result, [
+            os.path.join(self.storage.base_path, "kb1/doc1/page_1.png"),
+            os.path.join(self.storage.base_path, "kb1/doc1/page_3.jpg"),
+        ])
+        self.assertEqual(set(self.blob_clients), {"kb1/doc1/page_1.png", "kb1/doc1/page_3.jpg"})
+    
+    def test_aget_all_jpg_files(self):
+        """All page images are downloaded and returned sorted by page number."""
+        self.set_blobs(["kb1/doc1/page_10.jpg", "kb1/doc1/page_2.jpg", "kb1/doc1/elements.json"])
+        
+        result = asyncio.run(self.storage.aget_all_jpg_files("kb1", "doc1"))
+        
+        self.assertEqual(result, [
+            os.path.join(self.storage.base_path, "kb1/doc1/page_2.jpg"),
+            os.path.join(self.storage.base_path, "kb1/doc1/page_10.jpg"),
+        ])
+        self.assertEqual(set(self.blob_clients), {"kb1/doc1/page_10.jpg", "kb1/doc1/page_2.jpg"})
+    
+    @patch('dsrag.azure.blob_storage.MAX_BATCH_DELETE_SIZE', 2)
+    def test_adelete_kb_batches(self):
+        """Blobs are deleted in batches of at most MAX_BATCH_DELETE_SIZE."""
+        self.set_blobs([f"kb1/doc1/page_{i}.jpg" for i in range(3)])
+        
+        asyncio.run(self.storage.adelete_kb("kb1"))
+        
+        self.container.list_blobs.assert_called_once_with(name_starts_with="kb1/", results_per_page=5000)
+        batches = sorted(call.args for call in self.container.delete_blobs.call_args_list)
+        self.assertEqual(batches, [
+            ("kb1/doc1/page_0.jpg", "kb1/doc1/page_1.jpg"),
+            ("kb1/doc1/page_2.jpg",),
+        ])
+    
+    def test_adelete_prefix_ignores_missing_blobs(self):
+        """Blobs already deleted (404) don't fail the batch, other failed deletes raise."""
+        class StorageError(Exception):
+            pass
+        
+        self.set_blobs(["kb1/doc1/page_1.jpg", "kb1/doc1/page_2.jpg"])
+        
+        def delete_responses(*statuses):
+            responses = MagicMock()
+            responses.__aiter__.return_value = [Mock(status_code=status) for status in statuses]
+            return responses
+        
+        with patch('dsrag.azure.blob_storage.AzureError', StorageError):
+            self.container.delete_blobs.return_value = delete_responses(202, 404)
+            asyncio.run(self.storage._adelete_prefix(self.container, "kb1/doc1/"))
+            self.container.delete_blobs.assert_awaited_once_with(
+                "kb1/doc1/page_1.jpg", "kb1/doc1/page_2.jpg", raise_on_any_failure=False
+            )
+            
+            self.container.delete_blobs.return_value = delete_responses(404, 500)
+            with self.assertRaises(StorageError):
+                asyncio.run(self.storage._adelete_prefix(self.container, "kb1/doc1/"))
+    
+    def test_asave_json_caches_written_blob(self):
+        """asave_json uploads the JSON and caches it."""
+        self.storage._json_cache["kb1/doc1/elements.json"] = ('"etag-1"', b"{}", 0.0)
+        blob_client = self.make_blob_client()
+        blob_client.upload_blob.return_value = {"etag": '"etag-2"'}
+        self.blob_clients["kb1/doc1/elements.json"] = blob_client
+        
+        asyncio.run(self.storage.asave_json("kb1", "doc1", "elements.json", {"key": "value"}))
+        
+        blob_client.upload_blob.assert_awaited_once()
+        self.assertEqual(json.loads(blob_client.upload_blob.call_args.args[0]), {"key": "value"})
+        self.assertEqual(self.storage._json_cache["kb1/doc1/elements.json"][0], '"etag-2"')
+    
+    def test_asave_page_contents(self):
+        """asave_page_contents uploads every page."""
+        for page_number in (1, 2):
+            blob_client = self.make_blob_client()
+            blob_client.upload_blob.return_value = {"etag": f'"etag-{page_number}"'}
+            self.blob_clients[f"kb1/doc1/page_content_{page_number}.json"] = blob_client
+        
+        asyncio.run(self.storage.asave_page_contents("kb1", "doc1", {1: "Page one", 2: "Page two"}))
+        
+        for page_number, content in ((1, "Page one"), (2, "Page two")):
+            upload = self.blob_clients[f"kb1/doc1/page_content_{page_number}.json"].upload_blob
+            upload.assert_awaited_once()
+            self.assertEqual(json.loads(upload.call_args.args[0]), {"content": content})
+    
+    def test_asave_image(self):
+        """asave_image uploads the image encoded as JPEG."""
+        image = Image.new('RGB', (100, 100), color='red')
+        
+        asyncio.run(self.storage.asave_image("kb1", "doc1", "page_1.jpg", image))
+        
+        self.blob_clients["kb1/doc1/page_1.jpg"].upload_blob.assert_awaited_once()
+    
+    def test_asave_image_bytes_passthrough(self):
+        """asave_image uploads image bytes as is."""
+        asyncio.run(self.storage.asave_image("kb1", "doc1", "page_1.jpg", b"jpeg bytes"))
+        
+        upload = self.blob_clients["kb1/doc1/page_1.jpg"].upload_blob
+        upload.assert_awaited_once()
+        self.assertEqual(upload.call_args.args[0], b"jpeg bytes")
+    
+    def test_asave_images(self):
+        """asave_images uploads every image and invalidates the cached page listing."""
+        images = {f"page_{i}.jpg": Image.new('RGB', (10, 10)) for i in range(1, 4)}
+        self.storage._cache_page_blobs("kb1", "doc1", ["kb1/doc1/page_1.jpg"])
+        
+        asyncio.run(self.storage.asave_images("kb1", "doc1", images))
+        
+        for i in range(1, 4):
+            self.blob_clients[f"kb1/doc1/page_{i}.jpg"].upload_blob.assert_awaited_once()
+        self.assertIsNone(self.storage._cached_page_blobs("kb1", "doc1", [1]))
 
 
 class TestAzureBlobStorageErrorHandling(unittest.TestCase):
@@ -224,44 +799,117 @@ class TestAzureBlobStorageErrorHandling(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures."""
+        close_shared_blob_service_clients()
         with patch('dsrag.azure.blob_storage.BlobServiceClient'):
             self.storage = AzureBlobStorage(
                 base_path="/tmp/test",
                 container_name="test-container",
                 connection_string="test_connection_string"
             )
-            self.storage.blob_service_client = MagicMock()
+            self.storage.container_client = MagicMock()
     
-    def test_log_error(self):
-        """Test log_error method."""
+    @patch('dsrag.azure.blob_storage.threading.Timer')
+    def test_log_error(self, mock_timer):
+        """Errors are buffered and appended to the document's error log in one request."""
         mock_blob_client = MagicMock()
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
-        error_data = {"error": "Test error", "code": 500}
-        self.storage.log_error("kb1", "doc1", error_data)
+        self.storage.log_error("kb1", "doc1", {"error": "Test error", "code": 500})
+        self.storage.log_error("kb1", "doc1", {"error": "Another error"})
         
-        # Should create an error log blob
-        mock_blob_client.upload_blob.assert_called_once()
+        # Nothing is sent until the buffer is flushed; one timer covers both errors
+        mock_blob_client.append_block.assert_not_called()
+        mock_timer.assert_called_once()
+        
+        self.storage.flush_errors()
+        
+        self.storage.container_client.get_blob_client.assert_called_once_with("kb1/doc1/errors/errors.jsonl")
+        mock_blob_client.append_block.assert_called_once()
+        lines = mock_blob_client.append_block.call_args.args[0].decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)["error"] for line in lines], [
+            {"error": "Test error", "code": 500},
+            {"error": "Another error"},
+        ])
+        mock_timer.return_value.cancel.assert_called_once()
+    
+    @patch('dsrag.azure.blob_storage.threading.Timer')
+    def test_log_error_flushed_at_exit(self, mock_timer):
+        """The flush timer is a daemon thread; errors still pending at exit are flushed by the atexit hook."""
+        mock_blob_client = MagicMock()
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        
+        self.storage.log_error("kb1", "doc1", {"error": "Test error"})
+        
+        self.assertTrue(mock_timer.return_value.daemon)
+        blob_storage._flush_pending_error_logs()
+        mock_blob_client.append_block.assert_called_once()
+        self.assertNotIn(self.storage, blob_storage._pending_error_logs)
+    
+    def test_log_error_sync_creates_append_blob(self):
+        """A synchronous log creates the append blob if it doesn't exist yet."""
+        class NotFound(Exception):
+            pass
+        
+        mock_blob_client = MagicMock()
+        mock_blob_client.append_block.side_effect = [NotFound(), None]
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
+        
+        with patch('dsrag.azure.blob_storage.ResourceNotFoundError', NotFound):
+            self.storage.log_error("kb1", "doc1", {"error": "Test error"}, sync=True)
+        
+        mock_blob_client.create_append_blob.assert_called_once()
+        self.assertEqual(mock_blob_client.append_block.call_count, 2)
+        self.assertEqual(self.storage._error_buffer, {})
     
     def test_save_page_content(self):
         """Test save_page_content method."""
         mock_blob_client = MagicMock()
-        self.storage.blob_service_client.get_blob_client.return_value = mock_blob_client
+        self.storage.container_client.get_blob_client.return_value = mock_blob_client
         
         self.storage.save_page_content("kb1", "doc1", 1, "Test content")
         
         mock_blob_client.upload_blob.assert_called_once()
     
+    def test_save_page_contents(self):
+        """Each page is uploaded to its own page content blob."""
+        blob_clients = {}
+        self.storage.container_client.get_blob_client.side_effect = (
+            lambda blob_path: blob_clients.setdefault(blob_path, MagicMock())
+        )
+        
+        self.storage.save_page_contents("kb1", "doc1", {1: "Page one", 2: "Page two"})
+        
+        self.assertEqual(
+            sorted(blob_clients), ["kb1/doc1/page_content_1.json", "kb1/doc1/page_content_2.json"]
+        )
+        uploaded = blob_clients["kb1/doc1/page_content_2.json"].upload_blob.call_args.args[0]
+        self.assertEqual(json.loads(uploaded), {"content": "Page two"})
+    
     def test_load_page_content_range(self):
         """Test load_page_content_range method."""
         with patch.object(self.storage, 'load_page_content') as mock_load:
-            mock_load.side_effect = ["Content 1", "Content 2", "Content 3"]
+            # Pages load concurrently, so derive the content from the page number
+            mock_load.side_effect = lambda kb_id, doc_id, page_num: f"Content {page_num}"
             
             result = self.storage.load_page_content_range("kb1", "doc1", 1, 3)
             
             self.assertEqual(len(result), 3)
             self.assertEqual(result, ["Content 1", "Content 2", "Content 3"])
             self.assertEqual(mock_load.call_count, 3)
+    
+    def test_load_page_content_range_is_concurrent(self):
+        """All pages in the range are fetched at the same time, not one after another."""
+        # Each load waits until all three are in flight, which a sequential loop would never reach
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def load_page_content(kb_id, doc_id, page_num):
+            barrier.wait()
+            return f"Content {page_num}"
+        
+        with patch.object(self.storage, 'load_page_content', side_effect=load_page_content):
+            result = self.storage.load_page_content_range("kb1", "doc1", 1, 3)
+        
+        self.assertEqual(result, ["Content 1", "Content 2", "Content 3"])
 
 
 if __name__ == "__main__":
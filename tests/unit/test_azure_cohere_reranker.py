@@ -0,0 +1,75 @@
+"""Unit tests for the Azure Cohere reranker."""
+
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from scipy.stats import beta
+from cohere.errors import TooManyRequestsError
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.azure.azure_cohere_reranker import AzureCohereReranker
+
+
+def make_rerank_response(ranking):
+    """Build a fake rerank response from (index, relevance_score) pairs."""
+    response = MagicMock()
+    response.results = []
+    for index, score in ranking:
+        result = MagicMock()
+        result.index = index
+        result.relevance_score = score
+        response.results.append(result)
+    return response
+
+
+class TestAzureCohereReranker(unittest.TestCase):
+    """Test AzureCohereReranker.rerank_search_results."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch('dsrag.azure.azure_cohere_reranker.cohere.Client'):
+            self.reranker = AzureCohereReranker(
+                azure_endpoint="https://test-cohere.azure.com",
+                api_key="test_key",
+            )
+        self.reranker.client = MagicMock()
+        self.search_results = [
+            {'metadata': {'chunk_header': 'Doc 1', 'chunk_text': 'About cooking.'}, 'similarity': 0.5},
+            {'metadata': {'chunk_header': 'Doc 2', 'chunk_text': 'About Azure.'}, 'similarity': 0.4},
+        ]
+
+    def test_rerank_search_results(self):
+        """Results are reordered and scores are beta-transformed."""
+        self.reranker.client.rerank.return_value = make_rerank_response([(1, 0.9), (0, 0.1)])
+
+        reranked = self.reranker.rerank_search_results("What is Azure?", self.search_results)
+
+        self.reranker.client.rerank.assert_called_once_with(
+            model="Cohere-rerank-v3.5",
+            query="What is Azure?",
+            documents=["Doc 1\n\nAbout cooking.", "Doc 2\n\nAbout Azure."],
+        )
+        self.assertEqual([r['metadata']['chunk_header'] for r in reranked], ['Doc 2', 'Doc 1'])
+        self.assertAlmostEqual(reranked[0]['similarity'], beta.cdf(0.9, 0.4, 0.4))
+        self.assertAlmostEqual(reranked[1]['similarity'], beta.cdf(0.1, 0.4, 0.4))
+
+    @patch("tenacity.nap.time.sleep")
+    def test_rerank_retries_rate_limits(self, mock_sleep):
+        """Rate-limited rerank calls are retried."""
+        self.reranker.client.rerank.side_effect = [
+            TooManyRequestsError(body=None),
+            make_rerank_response([(0, 0.5), (1, 0.4)]),
+        ]
+
+        reranked = self.reranker.rerank_search_results("What is Azure?", self.search_results)
+
+        self.assertEqual(len(reranked), 2)
+        self.assertEqual(self.reranker.client.rerank.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
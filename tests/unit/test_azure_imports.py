@@ -0,0 +1,46 @@
+"""Unit tests for the lazy Azure component exports of dsrag and dsrag.azure."""
+
+import os
+import sys
+import importlib
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import dsrag
+import dsrag.azure
+
+
+class TestAzureImports(unittest.TestCase):
+    """Test that Azure components are exported lazily and only when available."""
+
+    def tearDown(self):
+        importlib.reload(dsrag.azure)
+
+    def test_unknown_names_raise_attribute_error(self):
+        """Unknown names raise AttributeError from both modules, so hasattr works."""
+        self.assertFalse(hasattr(dsrag.azure, "NotAComponent"))
+        with patch("importlib.import_module") as mock_import:
+            self.assertFalse(hasattr(dsrag, "NotAComponent"))
+        mock_import.assert_not_called()
+
+    def test_cohere_reranker_exported_only_with_cohere(self):
+        """AzureCohereReranker is in __all__ and accessible only if cohere is installed."""
+        with patch("importlib.util.find_spec", return_value=None):
+            importlib.reload(dsrag.azure)
+
+        self.assertNotIn("AzureCohereReranker", dsrag.azure.__all__)
+        self.assertFalse(hasattr(dsrag.azure, "AzureCohereReranker"))
+        self.assertFalse(hasattr(dsrag, "AzureCohereReranker"))
+
+    def test_components_resolve_through_dsrag(self):
+        """Azure components are reachable as dsrag attributes."""
+        from dsrag.azure.blob_storage import AzureBlobStorage
+
+        self.assertIs(dsrag.AzureBlobStorage, AzureBlobStorage)
+
+
+if __name__ == "__main__":
+    unittest.main()
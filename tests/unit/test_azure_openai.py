@@ -0,0 +1,858 @@
+"""Unit tests for the Azure OpenAI chat, embedding and VLM implementations."""
+
+import os
+import sys
+import json
+import base64
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import httpx
+import numpy as np
+import openai
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dsrag.azure import azure_openai_chat
+from dsrag.azure.azure_openai_chat import AzureOpenAIChatAPI
+from dsrag.azure import azure_openai_embedding
+from dsrag.azure.azure_openai_embedding import AzureOpenAIEmbedding
+from dsrag.azure import azure_openai_vlm
+from dsrag.azure.azure_openai_vlm import AzureOpenAIVLM
+from dsrag.azure._client_cache import (
+    close_shared_http_clients,
+    get_async_azure_openai_client,
+    get_shared_http_client,
+)
+
+
+def make_embedding_response(vectors):
+    """Build a fake base64-encoded embeddings response with one data item per vector."""
+    response = MagicMock()
+    response.data = []
+    for index, vector in enumerate(vectors):
+        item = MagicMock()
+        item.index = index
+        item.embedding = base64.b64encode(np.array(vector, dtype=np.float32).tobytes()).decode("ascii")
+        response.data.append(item)
+    return response
+
+
+def embed_inputs(vectors):
+    """Build an embeddings.create side effect that returns vectors[text] for each input, in any call order."""
+    def create(input, **kwargs):
+        return make_embedding_response([vectors[text] for text in input])
+    return create
+
+
+def make_chat_response(content):
+    """Build a fake chat completion response."""
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+def make_chat_chunks(pieces):
+    """Build fake streamed chat completion chunks, led by a content filter chunk without choices."""
+    chunks = [MagicMock(choices=[])]
+    for piece in pieces:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = piece
+        chunks.append(chunk)
+    return chunks
+
+
+class TestAzureOpenAIEmbedding(unittest.TestCase):
+    """Test AzureOpenAIEmbedding batching."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.embedding = AzureOpenAIEmbedding(
+            deployment_name="text-embedding-ada-002",
+            dimension=2,
+            azure_endpoint="https://test.openai.azure.com",
+            api_key="test_key",
+        )
+        self.embedding.client = MagicMock()
+        patcher = patch.object(azure_openai_embedding, "get_async_azure_openai_client", return_value=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_embeddings_single_request(self):
+        """A list of texts is sent in a single request."""
+        self.embedding.client.embeddings.create.return_value = make_embedding_response(
+            [[0.5, 0.25], [0.75, 1.5]]
+        )
+
+        result = self.embedding.get_embeddings(["a", "b"])
+
+        self.assertEqual(result, [[0.5, 0.25], [0.75, 1.5]])
+        self.embedding.client.embeddings.create.assert_called_once_with(
+            input=["a", "b"], model="text-embedding-ada-002", encoding_format="base64"
+        )
+
+    def test_get_embeddings_str_input(self):
+        """A single string returns a single vector."""
+        self.embedding.client.embeddings.create.return_value = make_embedding_response([[0.5, 0.25]])
+
+        result = self.embedding.get_embeddings("a")
+
+        self.assertEqual(result, [0.5, 0.25])
+
+    @patch.object(azure_openai_embedding, "MAX_BATCH_SIZE", 2)
+    def test_get_embeddings_splits_large_inputs(self):
+        """Inputs larger than MAX_BATCH_SIZE are split into sub-batches."""
+        self.embedding.client.embeddings.create.side_effect = embed_inputs(
+            {"a": [1.0, 0.0], "b": [2.0, 0.0], "c": [3.0, 0.0]}
+        )
+
+        result = self.embedding.get_embeddings(["a", "b", "c"])
+
+        self.assertEqual(result, [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]])
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 2)
+
+    def test_get_embeddings_max_batch_size(self):
+        """max_batch_size lowers the number of inputs per request."""
+        self.embedding.max_batch_size = 2
+        self.embedding.client.embeddings.create.side_effect = embed_inputs(
+            {"a": [1.0, 0.0], "b": [2.0, 0.0], "c": [3.0, 0.0]}
+        )
+
+        result = self.embedding.get_embeddings(["a", "b", "c"])
+
+        self.assertEqual(result, [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]])
+        inputs = [call.kwargs["input"] for call in self.embedding.client.embeddings.create.call_args_list]
+        self.assertEqual(sorted(inputs), [["a", "b"], ["c"]])
+        self.assertEqual(self.embedding.to_dict()["max_batch_size"], 2)
+
+    @patch.object(azure_openai_embedding, "MAX_BATCH_TOKENS", 10)
+    def test_get_embeddings_splits_by_request_tokens(self):
+        """Batches are also split so no request exceeds MAX_BATCH_TOKENS."""
+        self.embedding.client.embeddings.create.side_effect = embed_inputs(
+            {"aaaa": [1.0, 0.0], "bbbb": [2.0, 0.0], "cccc": [3.0, 0.0]}
+        )
+
+        self.embedding.get_embeddings(["aaaa", "bbbb", "cccc"])
+
+        calls = self.embedding.client.embeddings.create.call_args_list
+        self.assertEqual(sorted(call.kwargs["input"] for call in calls), [["aaaa", "bbbb"], ["cccc"]])
+
+    def test_get_embeddings_sends_sub_batches_concurrently(self):
+        """Sub-batches are in flight at the same time and results keep input order."""
+        self.embedding.max_batch_size = 1
+        # Each request waits until all three are in flight, which sequential requests never reach
+        barrier = threading.Barrier(3, timeout=5)
+        create = embed_inputs({"a": [1.0, 0.0], "b": [2.0, 0.0], "c": [3.0, 0.0]})
+
+        def create_after_barrier(**kwargs):
+            barrier.wait()
+            return create(**kwargs)
+
+        self.embedding.client.embeddings.create.side_effect = create_after_barrier
+
+        result = self.embedding.get_embeddings(["a", "b", "c"])
+
+        self.assertEqual(result, [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]])
+
+    def test_get_embeddings_orders_by_response_index(self):
+        """Response items are matched to inputs by their index, not their position."""
+        response = make_embedding_response([[1.0, 0.0], [2.0, 0.0]])
+        response.data.reverse()
+        self.embedding.client.embeddings.create.return_value = response
+
+        self.assertEqual(self.embedding.get_embeddings(["a", "b"]), [[1.0, 0.0], [2.0, 0.0]])
+
+    def test_get_embeddings_deduplicates_and_caches(self):
+        """Duplicate and previously embedded texts are not sent again."""
+        self.embedding.client.embeddings.create.side_effect = [
+            make_embedding_response([[1.0, 0.0], [2.0, 0.0]]),
+            make_embedding_response([[3.0, 0.0]]),
+        ]
+
+        first = self.embedding.get_embeddings(["a", "b", "a"])
+        second = self.embedding.get_embeddings(["b", "c"])
+
+        self.assertEqual(first, [[1.0, 0.0], [2.0, 0.0], [1.0, 0.0]])
+        self.assertEqual(second, [[2.0, 0.0], [3.0, 0.0]])
+        calls = self.embedding.client.embeddings.create.call_args_list
+        self.assertEqual([call.kwargs["input"] for call in calls], [["a", "b"], ["c"]])
+
+    def test_get_embeddings_cache_evicts_least_recently_used(self):
+        """The cache holds at most cache_size embeddings."""
+        self.embedding.cache_size = 1
+        self.embedding.client.embeddings.create.side_effect = [
+            make_embedding_response([[1.0, 0.0]]),
+            make_embedding_response([[2.0, 0.0]]),
+            make_embedding_response([[1.0, 0.0]]),
+        ]
+
+        self.embedding.get_embeddings("a")
+        self.embedding.get_embeddings("b")
+        self.embedding.get_embeddings("a")
+
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 3)
+
+    def test_get_embeddings_normalized_cache_keys(self):
+        """With normalize_cache_keys, texts differing only in case or whitespace share an embedding."""
+        self.embedding.client.embeddings.create.side_effect = [
+            make_embedding_response([[1.0, 0.0]]),
+            make_embedding_response([[1.0, 0.0]]),
+        ]
+        self.embedding.get_embeddings("Hello  world")
+        self.embedding.get_embeddings("hello world")
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 2)
+
+        self.embedding.normalize_cache_keys = True
+        self.embedding.client.embeddings.create.reset_mock()
+        self.embedding.client.embeddings.create.side_effect = [
+            make_embedding_response([[1.0, 0.0], [2.0, 0.0]]),
+        ]
+
+        result = self.embedding.get_embeddings(["Hello  world", " hello\nWORLD ", "other"])
+
+        self.assertEqual(result, [[1.0, 0.0], [1.0, 0.0], [2.0, 0.0]])
+        self.assertEqual(
+            self.embedding.client.embeddings.create.call_args.kwargs["input"], ["Hello  world", "other"]
+        )
+        self.assertTrue(self.embedding.to_dict()["normalize_cache_keys"])
+
+    def test_get_embeddings_disk_cache(self):
+        """Embeddings in the disk cache are reused by new instances without calling the API."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            def make_embedding():
+                embedding = AzureOpenAIEmbedding(
+                    deployment_name="text-embedding-ada-002",
+                    dimension=2,
+                    azure_endpoint="https://test.openai.azure.com",
+                    api_key="test_key",
+                    cache_dir=cache_dir,
+                )
+                embedding.client = MagicMock()
+                return embedding
+
+            first = make_embedding()
+            first.client.embeddings.create.return_value = make_embedding_response([[1.0, 0.0], [2.0, 0.0]])
+            first.get_embeddings(["a", "b"])
+
+            second = make_embedding()
+            second.client.embeddings.create.return_value = make_embedding_response([[3.0, 0.0]])
+            result = second.get_embeddings(["b", "c", "a"])
+
+            self.assertEqual(result, [[2.0, 0.0], [3.0, 0.0], [1.0, 0.0]])
+            second.client.embeddings.create.assert_called_once()
+            self.assertEqual(second.client.embeddings.create.call_args.kwargs["input"], ["c"])
+            self.assertEqual(second.to_dict()["cache_dir"], cache_dir)
+            first._disk_cache.close()
+            second._disk_cache.close()
+
+    def test_get_embeddings_sends_dimensions(self):
+        """send_dimensions requests shortened embeddings, cached per dimension."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            embedding = AzureOpenAIEmbedding(
+                deployment_name="text-embedding-3-small",
+                dimension=2,
+                azure_endpoint="https://test.openai.azure.com",
+                api_key="test_key",
+                cache_dir=cache_dir,
+                send_dimensions=True,
+            )
+            embedding.client = MagicMock()
+            embedding.client.embeddings.create.return_value = make_embedding_response([[0.5, 0.25]])
+
+            embedding.get_embeddings(["a"])
+
+            self.assertEqual(embedding.client.embeddings.create.call_args.kwargs["dimensions"], 2)
+            self.assertEqual(os.listdir(cache_dir), ["text-embedding-3-small-2.sqlite"])
+            embedding._disk_cache.close()
+
+    def test_get_embeddings_text_embedding_3_defaults_send_no_dimensions(self):
+        """A text-embedding-3 deployment with default arguments returns full-size embeddings."""
+        embedding = AzureOpenAIEmbedding(
+            deployment_name="text-embedding-3-large",
+            azure_endpoint="https://test.openai.azure.com",
+            api_key="test_key",
+        )
+        embedding.client = MagicMock()
+        embedding.client.embeddings.create.return_value = make_embedding_response([[0.5, 0.25]])
+
+        embedding.get_embeddings(["a"])
+
+        self.assertNotIn("dimensions", embedding.client.embeddings.create.call_args.kwargs)
+
+    def test_dimension_probed_once_per_deployment(self):
+        """dimension=None is looked up with one request, shared by later instances."""
+        client = MagicMock()
+        client.embeddings.create.return_value = MagicMock(data=[MagicMock(embedding=[0.0] * 3)])
+        azure_openai_embedding._probe_dimension.cache_clear()
+        self.addCleanup(azure_openai_embedding._probe_dimension.cache_clear)
+
+        with patch.object(azure_openai_embedding, "get_azure_openai_client", return_value=client):
+            embeddings = [
+                AzureOpenAIEmbedding(
+                    deployment_name="text-embedding-ada-002",
+                    dimension=None,
+                    azure_endpoint="https://test.openai.azure.com",
+                    api_key="test_key",
+                )
+                for _ in range(2)
+            ]
+
+        self.assertEqual([embedding.dimension for embedding in embeddings], [3, 3])
+        self.assertEqual(embeddings[0].to_dict()["dimension"], 3)
+        client.embeddings.create.assert_called_once_with(model="text-embedding-ada-002", input=["x"])
+
+    def test_get_embeddings_empty_input(self):
+        """An empty list returns no embeddings without calling the API."""
+        self.assertEqual(self.embedding.get_embeddings([]), [])
+        self.embedding.client.embeddings.create.assert_not_called()
+
+    @patch.object(azure_openai_embedding, "MAX_BATCH_SIZE", 2)
+    def test_get_embeddings_return_numpy(self):
+        """With return_numpy, sub-batches are joined into one float32 array."""
+        self.embedding.return_numpy = True
+        self.embedding.client.embeddings.create.side_effect = [
+            make_embedding_response([[1.0, 0.0], [2.0, 0.0]]),
+            make_embedding_response([[3.0, 0.0]]),
+        ]
+
+        result = self.embedding.get_embeddings(["a", "b", "c"])
+
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_array_equal(result, [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]])
+
+    @patch.object(azure_openai_embedding, "MAX_BATCH_SIZE", 2)
+    def test_aget_embeddings_preserves_order(self):
+        """Async sub-batches are gathered back in input order."""
+        self.embedding.async_client.embeddings.create = AsyncMock(side_effect=[
+            make_embedding_response([[1.0, 0.0], [2.0, 0.0]]),
+            make_embedding_response([[3.0, 0.0]]),
+        ])
+
+        result = asyncio.run(self.embedding.aget_embeddings(["a", "b", "c"]))
+
+        self.assertEqual(result, [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]])
+        self.assertEqual(self.embedding.async_client.embeddings.create.await_count, 2)
+
+    @patch("tenacity.nap.time.sleep")
+    def test_get_embeddings_retries_transient_errors(self, mock_sleep):
+        """Connection errors are retried; the call succeeds once the API recovers."""
+        connection_error = openai.APIConnectionError(request=httpx.Request("POST", "https://test"))
+        self.embedding.client.embeddings.create.side_effect = [
+            connection_error,
+            make_embedding_response([[0.5, 0.25]]),
+        ]
+
+        self.assertEqual(self.embedding.get_embeddings("a"), [0.5, 0.25])
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 2)
+        mock_sleep.assert_called_once()
+
+    @patch("tenacity.nap.time.sleep")
+    def test_get_embeddings_gives_up_after_max_attempts(self, mock_sleep):
+        """The last transient error is raised once max_attempts is reached."""
+        self.embedding.max_attempts = 3
+        self.embedding.client.embeddings.create.side_effect = openai.APIConnectionError(
+            request=httpx.Request("POST", "https://test")
+        )
+
+        with self.assertRaises(openai.APIConnectionError):
+            self.embedding.get_embeddings("a")
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 3)
+
+    def test_get_embeddings_does_not_retry_other_errors(self):
+        """Non-transient errors are raised immediately."""
+        self.embedding.client.embeddings.create.side_effect = ValueError("bad input")
+
+        with self.assertRaises(ValueError):
+            self.embedding.get_embeddings("a")
+        self.assertEqual(self.embedding.client.embeddings.create.call_count, 1)
+
+
+class TestAzureOpenAIChatAPI(unittest.TestCase):
+    """Test AzureOpenAIChatAPI calls."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.chat = AzureOpenAIChatAPI(
+            deployment_name="gpt-4o",
+            azure_endpoint="https://test.openai.azure.com",
+            api_key="test_key",
+        )
+        self.chat.client = MagicMock()
+        patcher = patch.object(azure_openai_chat, "get_async_azure_openai_client", return_value=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.messages = [{"role": "user", "content": "What is 2+2?"}]
+
+    def test_make_llm_call(self):
+        """make_llm_call returns the stripped response text."""
+        self.chat.client.chat.completions.create.return_value = make_chat_response(" 4 ")
+
+        self.assertEqual(self.chat.make_llm_call(self.messages), "4")
+
+    def test_amake_llm_call(self):
+        """amake_llm_call returns the stripped response text."""
+        self.chat.async_client.chat.completions.create = AsyncMock(
+            return_value=make_chat_response(" 4 ")
+        )
+
+        self.assertEqual(asyncio.run(self.chat.amake_llm_call(self.messages)), "4")
+
+    def test_make_llm_call_stream(self):
+        """make_llm_call_stream yields the response text as it arrives, skipping empty chunks."""
+        stream = MagicMock()
+        stream.__enter__.return_value = stream
+        stream.__iter__.return_value = iter(make_chat_chunks(["The answer", None, " is 4."]))
+        self.chat.client.chat.completions.create.return_value = stream
+
+        pieces = list(self.chat.make_llm_call_stream(self.messages))
+
+        self.assertEqual(pieces, ["The answer", " is 4."])
+        self.assertTrue(self.chat.client.chat.completions.create.call_args.kwargs["stream"])
+        stream.__exit__.assert_called_once()
+
+    def test_amake_llm_call_stream(self):
+        """amake_llm_call_stream yields the response text as it arrives."""
+        stream = MagicMock()
+        stream.__aenter__.return_value = stream
+        stream.__aiter__.return_value = make_chat_chunks(["The answer", " is 4."])
+        self.chat.async_client.chat.completions.create = AsyncMock(return_value=stream)
+
+        async def collect():
+            return [piece async for piece in self.chat.amake_llm_call_stream(self.messages)]
+
+        self.assertEqual(asyncio.run(collect()), ["The answer", " is 4."])
+
+    def test_make_llm_calls_bounded_concurrency(self):
+        """make_llm_calls returns results in input order with bounded concurrency."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            content = kwargs["messages"][0]["content"]
+            await asyncio.sleep(0.01 * (5 - int(content)))  # Finish out of order
+            in_flight -= 1
+            return make_chat_response(content)
+
+        self.chat.async_client.chat.completions.create = create
+        list_of_chat_messages = [[{"role": "user", "content": str(i)}] for i in range(5)]
+
+        result = self.chat.make_llm_calls(list_of_chat_messages, max_concurrency=2)
+
+        self.assertEqual(result, ["0", "1", "2", "3", "4"])
+        self.assertEqual(max_in_flight, 2)
+
+    def test_static_system_prompt_prefix(self):
+        """The static system prompt and user ID are sent first and unchanged with every call."""
+        chat = AzureOpenAIChatAPI(
+            deployment_name="gpt-4o",
+            azure_endpoint="https://test.openai.azure.com",
+            api_key="test_key",
+            static_system_prompt="You are a helpful assistant.",
+            user="ingest-worker",
+        )
+        chat.client = MagicMock()
+        chat.client.chat.completions.create.return_value = make_chat_response("4")
+
+        chat.make_llm_call(self.messages)
+        chat.make_llm_call(self.messages)
+
+        for call in chat.client.chat.completions.create.call_args_list:
+            self.assertEqual(
+                call.kwargs["messages"],
+                [{"role": "system", "content": "You are a helpful assistant."}] + self.messages,
+            )
+            self.assertEqual(call.kwargs["user"], "ingest-worker")
+        self.assertEqual(self.messages, [{"role": "user", "content": "What is 2+2?"}])
+        self.assertEqual(chat.to_dict()["static_system_prompt"], "You are a helpful assistant.")
+
+    def _batch_output(self, contents):
+        """Build batch output JSONL, in reverse order, from custom_id -> content pairs."""
+        lines = []
+        for custom_id, content in reversed(list(contents.items())):
+            response = {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}
+            if content is None:
+                response = {"status_code": 500, "body": {}}
+            lines.append(json.dumps({"custom_id": custom_id, "response": response}))
+        return "\n".join(lines)
+
+    @patch.object(azure_openai_chat.time, "sleep")
+    def test_make_llm_call_batch(self, mock_sleep):
+        """Batch results are polled until done and returned in input order."""
+        self.chat.client.files.create.return_value = MagicMock(id="file-in")
+        self.chat.client.batches.create.return_value = MagicMock(id="batch-1", status="validating")
+        self.chat.client.batches.retrieve.side_effect = [
+            MagicMock(id="batch-1", status="in_progress"),
+            MagicMock(id="batch-1", status="completed", output_file_id="file-out"),
+        ]
+        self.chat.client.files.content.return_value.text = self._batch_output({"0": " 4 ", "1": " 6 "})
+
+        result = self.chat.make_llm_call_batch([self.messages, self.messages], poll_interval=1)
+
+        self.assertEqual(result, ["4", "6"])
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 2])
+        _, batch_input = self.chat.client.files.create.call_args.kwargs["file"]
+        first_line = json.loads(batch_input.getvalue().decode("utf-8").splitlines()[0])
+        self.assertEqual(first_line["custom_id"], "0")
+        self.assertEqual(first_line["body"]["model"], "gpt-4o")
+        self.chat.client.files.content.assert_called_once_with("file-out")
+
+    @patch.object(azure_openai_chat.time, "sleep")
+    def test_make_llm_call_batch_failures(self, mock_sleep):
+        """Failed batches and failed requests raise RuntimeError."""
+        self.chat.client.batches.create.return_value = MagicMock(id="batch-1", status="failed")
+        with self.assertRaises(RuntimeError):
+            self.chat.make_llm_call_batch([self.messages])
+
+        self.chat.client.batches.create.return_value = MagicMock(
+            id="batch-2", status="completed", output_file_id="file-out"
+        )
+        self.chat.client.files.content.return_value.text = self._batch_output({"0": "4", "1": None})
+        with self.assertRaises(RuntimeError):
+            self.chat.make_llm_call_batch([self.messages, self.messages])
+
+
+class TestAzureOpenAIVLM(unittest.TestCase):
+    """Test AzureOpenAIVLM image encoding and calls."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.vlm = AzureOpenAIVLM(
+            deployment_name="gpt-4o",
+            azure_endpoint="https://test.openai.azure.com",
+            api_key="test_key",
+        )
+        self.vlm.client = MagicMock()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_bytes = bytes(range(256)) * 5
+        self.image_path = os.path.join(self.temp_dir.name, "page.PNG")
+        with open(self.image_path, "wb") as f:
+            f.write(self.image_bytes)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @patch.object(azure_openai_vlm, "_ENCODE_CHUNK_SIZE", 3 * 7)
+    def test_encode_image_matches_single_pass(self):
+        """Chunked encoding produces the same string as encoding the whole file."""
+        expected = "data:image/png;base64," + base64.b64encode(self.image_bytes).decode("ascii")
+
+        self.assertEqual(self.vlm._encode_image(self.image_path), expected)
+
+    def test_encode_image_reuses_recent_encoding(self):
+        """Repeated encodes of an unchanged file read it once; rewriting the file re-encodes."""
+        with patch.object(AzureOpenAIVLM, "_read_data_url", wraps=AzureOpenAIVLM._read_data_url) as read:
+            first = self.vlm._encode_image(self.image_path)
+            self.assertEqual(self.vlm._encode_image(self.image_path), first)
+            self.assertEqual(read.call_count, 1)
+
+            with open(self.image_path, "wb") as f:
+                f.write(b"new page")
+            updated = self.vlm._encode_image(self.image_path)
+
+        self.assertEqual(read.call_count, 2)
+        self.assertEqual(updated, "data:image/png;base64," + base64.b64encode(b"new page").decode("ascii"))
+
+    @patch.object(azure_openai_vlm, "DATA_URL_CACHE_SIZE", 2)
+    def test_encode_image_cache_is_bounded(self):
+        """Only the most recently used encodings are kept."""
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f"page{i}.png")
+            with open(path, "wb") as f:
+                f.write(bytes([i]))
+            paths.append(path)
+            self.vlm._encode_image(path)
+
+        self.assertEqual([key[0] for key in self.vlm._data_urls], [os.path.abspath(p) for p in paths[1:]])
+
+    def test_make_llm_call_media_type(self):
+        """The media type is taken from the file extension."""
+        self.vlm.client.chat.completions.create.return_value = make_chat_response('{"a": 1}')
+
+        result = self.vlm.make_llm_call(self.image_path, "Describe", response_schema={})
+
+        self.assertEqual(result, '{"a": 1}')
+        kwargs = self.vlm.client.chat.completions.create.call_args.kwargs
+        url = kwargs["messages"][0]["content"][1]["image_url"]["url"]
+        self.assertTrue(url.startswith("data:image/png;base64,"))
+        self.assertEqual(kwargs["response_format"], {"type": "json_object"})
+
+    def test_make_llm_call_structured_output(self):
+        """Newer API versions send a strict json_schema and unwrap array results."""
+        self.vlm.api_version = "2024-10-21"
+        self.vlm.client.chat.completions.create.return_value = make_chat_response(
+            '{"items": [{"type": "Title", "content": "Hi"}]}'
+        )
+        schema = {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"type": {"type": "string"}, "content": {"type": "string"}},
+                "required": ["type", "content"],
+            },
+        }
+
+        result = self.vlm.make_llm_call(self.image_path, "Describe", response_schema=schema)
+
+        self.assertEqual(json.loads(result), [{"type": "Title", "content": "Hi"}])
+        response_format = self.vlm.client.chat.completions.create.call_args.kwargs["response_format"]
+        self.assertEqual(response_format["type"], "json_schema")
+        self.assertTrue(response_format["json_schema"]["strict"])
+        wrapped_schema = response_format["json_schema"]["schema"]
+        self.assertEqual(wrapped_schema["required"], ["items"])
+        self.assertFalse(wrapped_schema["properties"]["items"]["items"]["additionalProperties"])
+
+    def test_make_llm_call_cache(self):
+        """Cached responses skip the API until the image or request changes."""
+        self.vlm.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(self.vlm.cache_dir)
+        self.vlm.client.chat.completions.create.return_value = make_chat_response("first")
+
+        self.assertEqual(self.vlm.make_llm_call(self.image_path, "Describe"), "first")
+        self.vlm.client.chat.completions.create.return_value = make_chat_response("second")
+        self.assertEqual(self.vlm.make_llm_call(self.image_path, "Describe"), "first")
+        self.assertEqual(self.vlm.client.chat.completions.create.call_count, 1)
+
+        self.assertEqual(self.vlm.make_llm_call(self.image_path, "Describe again"), "second")
+        with open(self.image_path, "ab") as f:
+            f.write(b"changed")
+        self.vlm.make_llm_call(self.image_path, "Describe")
+        self.assertEqual(self.vlm.client.chat.completions.create.call_count, 3)
+        self.assertFalse([name for name in os.listdir(self.vlm.cache_dir) if name.endswith(".tmp")])
+
+    def test_amake_llm_call_cache_io_off_event_loop(self):
+        """amake_llm_call reads and writes the response cache in worker threads."""
+        self.vlm.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(self.vlm.cache_dir)
+        async_client = MagicMock()
+        async_client.chat.completions.create = AsyncMock(return_value=make_chat_response("first"))
+        loop_threads = []
+        read_cache = AzureOpenAIVLM._read_cache
+        write_cache = self.vlm._write_cache
+
+        def record_read(cache_path):
+            loop_threads.append(threading.current_thread())
+            return read_cache(cache_path)
+
+        def record_write(cache_path, response_text):
+            loop_threads.append(threading.current_thread())
+            write_cache(cache_path, response_text)
+
+        async def call_twice():
+            first = await self.vlm.amake_llm_call(self.image_path, "Describe")
+            second = await self.vlm.amake_llm_call(self.image_path, "Describe")
+            return first, second, threading.current_thread()
+
+        with patch.object(azure_openai_vlm, "get_async_azure_openai_client", return_value=async_client), \
+                patch.object(self.vlm, "_read_cache", side_effect=record_read), \
+                patch.object(self.vlm, "_write_cache", side_effect=record_write):
+            first, second, loop_thread = asyncio.run(call_twice())
+
+        self.assertEqual((first, second), ("first", "first"))
+        self.assertEqual(async_client.chat.completions.create.await_count, 1)
+        self.assertEqual(len(loop_threads), 3)  # Read miss, write, read hit
+        self.assertNotIn(loop_thread, loop_threads)
+
+    def test_make_llm_call_cache_keyed_by_api_version(self):
+        """Changing the API version changes how the schema is sent, so it misses the cache."""
+        self.vlm.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(self.vlm.cache_dir)
+        self.vlm.client.chat.completions.create.return_value = make_chat_response("{}")
+
+        self.vlm.make_llm_call(self.image_path, "Describe", response_schema={})
+        self.vlm.api_version = "2024-10-21"
+        self.vlm.make_llm_call(self.image_path, "Describe", response_schema={})
+
+        self.assertEqual(self.vlm.client.chat.completions.create.call_count, 2)
+
+    def test_make_llm_call_cache_miss_reads_image_once(self):
+        """On a cache miss the image bytes read for the cache key are reused for encoding."""
+        self.vlm.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        os.makedirs(self.vlm.cache_dir)
+        self.vlm.client.chat.completions.create.return_value = make_chat_response("first")
+
+        with patch("builtins.open", wraps=open) as mock_open:
+            self.vlm.make_llm_call(self.image_path, "Describe")
+
+        image_reads = [c for c in mock_open.call_args_list if c.args[0] == self.image_path]
+        self.assertEqual(len(image_reads), 1)
+        url = self.vlm.client.chat.completions.create.call_args.kwargs["messages"][0]["content"][1]["image_url"]["url"]
+        self.assertEqual(url, AzureOpenAIVLM._read_data_url(self.image_path))
+
+    def test_make_llm_calls_bounded_concurrency(self):
+        """make_llm_calls returns results in input order with bounded concurrency."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            data_url = kwargs["messages"][0]["content"][1]["image_url"]["url"]
+            await asyncio.sleep(0.01 * (5 - int(data_url)))  # Finish out of order
+            in_flight -= 1
+            return make_chat_response(data_url)
+
+        async_client = MagicMock()
+        async_client.chat.completions.create = create
+
+        with patch.object(azure_openai_vlm, "get_async_azure_openai_client", return_value=async_client), \
+                patch.object(self.vlm, "_encode_image", side_effect=lambda image_path, image_bytes: image_path):
+            result = self.vlm.make_llm_calls(["0", "1", "2", "3", "4"], "Describe", max_concurrency=2)
+
+        self.assertEqual(result, ["0", "1", "2", "3", "4"])
+        self.assertEqual(max_in_flight, 2)
+
+    def test_response_format_built_once_per_schema(self):
+        """The response_format for a schema object is converted once and reused."""
+        self.vlm.client.chat.completions.create.return_value = make_chat_response("{}")
+        schema = {"type": "object", "properties": {}}
+
+        with patch.object(self.vlm, "_response_format", wraps=self.vlm._response_format) as mock_format:
+            self.vlm.make_llm_call(self.image_path, "Describe", response_schema=schema)
+            self.vlm.make_llm_call(self.image_path, "Describe", response_schema=schema)
+
+        mock_format.assert_called_once_with(schema)
+
+    def test_structured_outputs_compared_by_date(self):
+        """API versions are compared by date, so GA and undated versions get json_schema."""
+        schema = {"type": "object", "properties": {}}
+        for api_version in ["2024-08-01", "2024-08-01-preview", "2025-01-01-preview", "preview"]:
+            self.vlm.api_version = api_version
+            self.assertEqual(self.vlm._response_format(schema)[0]["type"], "json_schema", api_version)
+        self.vlm.api_version = "2024-06-01"
+        self.assertEqual(self.vlm._response_format(schema)[0], {"type": "json_object"})
+
+    def test_response_format_optional_properties_not_strict(self):
+        """Schemas with optional properties are sent without strict mode."""
+        self.vlm.api_version = "2024-08-01-preview"
+        schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+
+        response_format, wrapped = self.vlm._response_format(schema)
+
+        self.assertFalse(wrapped)
+        self.assertFalse(response_format["json_schema"]["strict"])
+        self.assertEqual(response_format["json_schema"]["schema"], schema)
+
+
+class TestSharedClients(unittest.TestCase):
+    """Test that Azure OpenAI components share clients and connection pools."""
+
+    def setUp(self):
+        close_shared_http_clients()
+
+    def tearDown(self):
+        close_shared_http_clients()
+
+    @patch('dsrag.azure._client_cache.AzureOpenAI')
+    def test_same_credentials_share_client(self, mock_client):
+        """Components with the same credentials reuse one cached client."""
+        chat = AzureOpenAIChatAPI(deployment_name="gpt-4o", azure_endpoint="https://a.openai.azure.com", api_key="k")
+        embedding = AzureOpenAIEmbedding(deployment_name="ada", azure_endpoint="https://a.openai.azure.com", api_key="k")
+
+        self.assertIs(chat.client, embedding.client)
+        mock_client.assert_called_once()
+
+    @patch('dsrag.azure._client_cache.AzureOpenAI')
+    def test_same_endpoint_shares_http_client(self, mock_client):
+        """Clients for one endpoint get the same http_client, other endpoints get their own."""
+        AzureOpenAIChatAPI(deployment_name="gpt-4o", azure_endpoint="https://a.openai.azure.com", api_key="k1")
+        AzureOpenAIEmbedding(deployment_name="ada", azure_endpoint="https://a.openai.azure.com", api_key="k2")
+        AzureOpenAIEmbedding(deployment_name="ada", azure_endpoint="https://b.openai.azure.com", api_key="k2")
+
+        http_clients = [call.kwargs["http_client"] for call in mock_client.call_args_list]
+        self.assertEqual(len(http_clients), 3)
+        self.assertIs(http_clients[0], http_clients[1])
+        self.assertIsNot(http_clients[1], http_clients[2])
+
+    @patch('dsrag.azure._client_cache.AsyncAzureOpenAI')
+    @patch('dsrag.azure._client_cache.AzureOpenAI')
+    def test_same_endpoint_shares_async_client(self, mock_client, mock_async_client):
+        """Async clients are cached per credentials and share one async http_client per endpoint."""
+        chat = AzureOpenAIChatAPI(deployment_name="gpt-4o", azure_endpoint="https://a.openai.azure.com", api_key="k1")
+        embedding = AzureOpenAIEmbedding(deployment_name="ada", azure_endpoint="https://a.openai.azure.com", api_key="k1")
+        other_embedding = AzureOpenAIEmbedding(deployment_name="ada", azure_endpoint="https://a.openai.azure.com", api_key="k2")
+        mock_async_client.return_value.is_closed.return_value = False
+
+        async def get_clients():
+            self.assertIs(chat.async_client, embedding.async_client)
+            other_embedding.async_client
+
+        asyncio.run(get_clients())
+        http_clients = [call.kwargs["http_client"] for call in mock_async_client.call_args_list]
+        self.assertEqual(len(http_clients), 2)
+        self.assertIs(http_clients[0], http_clients[1])
+        self.assertIsNot(http_clients[0], mock_client.call_args.kwargs["http_client"])
+
+    def test_async_clients_per_event_loop(self):
+        """Each event loop gets its own async clients, closed when asyncio.run shuts the loop down."""
+        async def get_client():
+            client = get_async_azure_openai_client("k", "2024-02-15-preview", "https://a.openai.azure.com")
+            self.assertIs(client, get_async_azure_openai_client("k", "2024-02-15-preview", "https://a.openai.azure.com"))
+            self.assertFalse(client.is_closed())
+            return client
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed())
+        self.assertTrue(second.is_closed())
+
+    def test_chat_async_calls_across_event_loops(self):
+        """amake_llm_call and amake_llm_call_stream keep working when each call runs its own event loop."""
+        completion = {
+            "id": "1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": " 4 "}}],
+        }
+        chunk = {
+            "id": "1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": None, "delta": {"content": "4"}}],
+        }
+
+        def handler(request):
+            if json.loads(request.content).get("stream"):
+                body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+                return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+            return httpx.Response(200, json=completion)
+
+        chat = AzureOpenAIChatAPI(deployment_name="gpt-4o", azure_endpoint="https://a.openai.azure.com", api_key="k")
+        messages = [{"role": "user", "content": "What is 2+2?"}]
+
+        async def stream():
+            return [piece async for piece in chat.amake_llm_call_stream(messages)]
+
+        http_clients = []
+
+        def new_http_client(**kwargs):
+            http_clients.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+            return http_clients[-1]
+
+        with patch("dsrag.azure._client_cache.DefaultAsyncHttpxClient", side_effect=new_http_client):
+            for _ in range(2):
+                self.assertEqual(asyncio.run(chat.amake_llm_call(messages)), "4")
+                self.assertEqual(asyncio.run(stream()), ["4"])
+
+        # One HTTP client per loop, each closed when its loop shut down
+        self.assertEqual(len(http_clients), 4)
+        self.assertTrue(all(http_client.is_closed for http_client in http_clients))
+
+    def test_closed_client_is_replaced(self):
+        """A new client is created after the shared clients are closed."""
+        first = get_shared_http_client("https://a.openai.azure.com")
+        close_shared_http_clients()
+
+        self.assertTrue(first.is_closed)
+        self.assertIsNot(get_shared_http_client("https://a.openai.azure.com"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -309,6 +309,14 @@ class TestSQLiteDB(unittest.TestCase):
         # Make sure the document does not exist, it should just be None
         self.assertIsNone(results)
 
+    def test__doc_id_queries_use_index(self):
+        db = SQLiteDB(self.kb_id, self.storage_directory)
+        with db.get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT DISTINCT doc_id FROM documents"
+            ).fetchall()
+        self.assertIn("idx_documents_doc_id_chunk_index", str(plan))
+
     def test__save_and_load_from_dict(self):
         db = SQLiteDB(self.kb_id, self.storage_directory)
         config = db.to_dict()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from dsrag.semantic_cache import SemanticCache
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(threshold=0.95, max_size=2, ttl=300.0)
+
+    def test_hit_on_similar_vector(self):
+        self.cache.put([1.0, 0.0, 0.0], "results")
+        self.assertEqual(self.cache.lookup([0.99, 0.05, 0.0]), "results")
+
+    def test_miss_below_threshold(self):
+        self.cache.put([1.0, 0.0, 0.0], "results")
+        self.assertIsNone(self.cache.lookup([0.5, 0.5, 0.0]))
+
+    def test_miss_on_different_key(self):
+        self.cache.put([1.0, 0.0, 0.0], "results", key="filter_a")
+        self.assertIsNone(self.cache.lookup([1.0, 0.0, 0.0], key="filter_b"))
+        self.assertEqual(self.cache.lookup([1.0, 0.0, 0.0], key="filter_a"), "results")
+
+    def test_entries_expire_after_ttl(self):
+        with patch("dsrag.semantic_cache.time.monotonic", return_value=0.0):
+            self.cache.put([1.0, 0.0, 0.0], "results")
+        with patch("dsrag.semantic_cache.time.monotonic", return_value=301.0):
+            self.assertIsNone(self.cache.lookup([1.0, 0.0, 0.0]))
+
+    def test_full_cache_replaces_least_recently_used(self):
+        with patch("dsrag.semantic_cache.time.monotonic", side_effect=[0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]):
+            self.cache.put([1.0, 0.0, 0.0], "first")
+            self.cache.put([0.0, 1.0, 0.0], "second")
+            self.cache.lookup([1.0, 0.0, 0.0])  # "first" is now the most recently used
+            self.cache.put([0.0, 0.0, 1.0], "third")
+            self.assertEqual(self.cache.lookup([1.0, 0.0, 0.0]), "first")
+            self.assertIsNone(self.cache.lookup([0.0, 1.0, 0.0]))
+            self.assertEqual(self.cache.lookup([0.0, 0.0, 1.0]), "third")
+
+    def test_clear(self):
+        self.cache.put([1.0, 0.0, 0.0], "results")
+        self.cache.clear()
+        self.assertIsNone(self.cache.lookup([1.0, 0.0, 0.0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 from typing import Sequence
 import numpy as np
 import os
+import pickle
 import sys
 import unittest
+from unittest.mock import MagicMock, patch
 import time
 import pytest
 
@@ -119,6 +121,21 @@ class TestVectorDB(unittest.TestCase):
         self.assertEqual(new_db.metadata[0]["doc_id"], "1")
         self.assertEqual(new_db.metadata[1]["doc_id"], "2")
 
+    def test__save_keeps_list_format(self):
+        db = BasicVectorDB(self.kb_id, self.storage_directory)
+        vectors = [[0.5, 0.25], [0.125, 1.0]]
+        metadata: Sequence[ChunkMetadata] = [
+            {"doc_id": "1", "chunk_index": 0, "chunk_header": "Header1", "chunk_text": "Text1"},
+            {"doc_id": "2", "chunk_index": 1, "chunk_header": "Header2", "chunk_text": "Text2"},
+        ]
+        db.add_vectors(vectors, metadata)
+
+        # The file keeps its (list of vectors, metadata) layout
+        with open(db.vector_storage_path, "rb") as f:
+            saved_vectors, _ = pickle.load(f)
+        self.assertIsInstance(saved_vectors, list)
+        self.assertEqual(saved_vectors, vectors)
+
     def test__load_from_dict(self):
         config = {
             "subclass_name": "BasicVectorDB",
@@ -244,6 +261,184 @@ class TestVectorDB(unittest.TestCase):
         results = db.search(query_vector, top_k=3)
         self.assertEqual(len(results), 2)
 
+    def test__binary_quantized_search(self):
+        rng = np.random.default_rng(0)
+        vectors = list(rng.standard_normal((200, 64)))
+        metadata: Sequence[ChunkMetadata] = [
+            {
+                "doc_id": str(i),
+                "chunk_index": i,
+                "chunk_header": f"Header{i}",
+                "chunk_text": f"Text{i}",
+            }
+            for i in range(200)
+        ]
+        db = BasicVectorDB(self.kb_id, self.storage_directory, quantization="binary")
+        db.add_vectors(vectors, metadata)
+
+        # A slightly perturbed copy of a stored vector finds it first, with an exact similarity
+        query_vector = vectors[42] + 0.05 * rng.standard_normal(64)
+        results = db.search(query_vector, top_k=5)
+        exact_results = db._fallback_search(query_vector, top_k=5)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]["metadata"]["doc_id"], "42")
+        self.assertAlmostEqual(results[0]["similarity"], exact_results[0]["similarity"])
+        similarities = [result["similarity"] for result in results]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+        config = db.to_dict()
+        self.assertEqual(config["quantization"], "binary")
+        self.assertEqual(config["rescore_multiplier"], 4)
+
+    def test__int8_quantized_search(self):
+        rng = np.random.default_rng(0)
+        vectors = list(rng.standard_normal((200, 64)))
+        metadata: Sequence[ChunkMetadata] = [
+            {
+                "doc_id": str(i),
+                "chunk_index": i,
+                "chunk_header": f"Header{i}",
+                "chunk_text": f"Text{i}",
+            }
+            for i in range(200)
+        ]
+        db = BasicVectorDB(self.kb_id, self.storage_directory, quantization="int8")
+        db.add_vectors(vectors, metadata)
+
+        # int8 ranking is close enough that rescoring recovers the exact top results
+        query_vector = rng.standard_normal(64)
+        results = db.search(query_vector, top_k=5)
+        exact_results = db._fallback_search(query_vector, top_k=5)
+
+        self.assertEqual(
+            [result["metadata"]["doc_id"] for result in results],
+            [result["metadata"]["doc_id"] for result in exact_results],
+        )
+        for result, exact_result in zip(results, exact_results):
+            self.assertAlmostEqual(result["similarity"], exact_result["similarity"])
+
+        # Approximate similarities are within int8 rounding error of the exact ones
+        approximate = db._int8_similarities(query_vector)
+        all_results = db._fallback_search(query_vector, top_k=200)
+        order = [int(result["metadata"]["doc_id"]) for result in all_results]
+        exact = np.array([result["similarity"] for result in all_results])
+        np.testing.assert_allclose(approximate[order], exact, atol=0.02)
+
+    def test__reduced_dimension_search(self):
+        rng = np.random.default_rng(0)
+        # Vectors that mostly vary along 8 of their 64 dimensions, like real embeddings
+        basis = rng.standard_normal((8, 64))
+        vectors = list(rng.standard_normal((300, 8)) @ basis + 0.05 * rng.standard_normal((300, 64)))
+        metadata: Sequence[ChunkMetadata] = [
+            {
+                "doc_id": str(i),
+                "chunk_index": i,
+                "chunk_header": f"Header{i}",
+                "chunk_text": f"Text{i}",
+            }
+            for i in range(300)
+        ]
+        db = BasicVectorDB(self.kb_id, self.storage_directory, reduced_dimension=8)
+        db.add_vectors(vectors, metadata)
+
+        query_vector = rng.standard_normal(8) @ basis
+        results = db.search(query_vector, top_k=5)
+        exact_results = db._fallback_search(query_vector, top_k=5)
+
+        self.assertEqual(
+            [result["metadata"]["doc_id"] for result in results],
+            [result["metadata"]["doc_id"] for result in exact_results],
+        )
+        for result, exact_result in zip(results, exact_results):
+            self.assertAlmostEqual(result["similarity"], exact_result["similarity"])
+        self.assertEqual(db._projection[1].shape, (64, 8))
+        self.assertEqual(db.to_dict()["reduced_dimension"], 8)
+
+    def test__search_batch(self):
+        rng = np.random.default_rng(0)
+        vectors = list(rng.standard_normal((50, 16)))
+        metadata: Sequence[ChunkMetadata] = [
+            {
+                "doc_id": str(i),
+                "chunk_index": i,
+                "chunk_header": f"Header{i}",
+                "chunk_text": f"Text{i}",
+            }
+            for i in range(50)
+        ]
+        db = BasicVectorDB(self.kb_id, self.storage_directory)
+        db.add_vectors(vectors, metadata)
+
+        query_vectors = list(rng.standard_normal((3, 16)))
+        batch_results = db.search_batch(query_vectors, top_k=5)
+
+        self.assertEqual(len(batch_results), 3)
+        for query_vector, results in zip(query_vectors, batch_results):
+            expected = db.search(query_vector, top_k=5)
+            self.assertEqual(
+                [result["metadata"]["doc_id"] for result in results],
+                [result["metadata"]["doc_id"] for result in expected],
+            )
+            for result, expected_result in zip(results, expected):
+                # float32 matrix-matrix and matrix-vector products can round differently
+                self.assertAlmostEqual(result["similarity"], expected_result["similarity"], places=6)
+
+        self.assertEqual(db.search_batch([], top_k=5), [])
+
+    def test__faiss_index_built_once_over_unit_vectors(self):
+        class FlatIPIndex:
+            """Exact inner-product index with the faiss IndexFlatIP interface."""
+            def __init__(self, dimension):
+                self.vectors = np.empty((0, dimension), dtype=np.float32)
+
+            def add(self, vectors):
+                self.vectors = np.vstack([self.vectors, vectors])
+
+            def search(self, queries, k):
+                scores = queries @ self.vectors.T
+                indices = np.argsort(-scores, axis=1)[:, :k]
+                return np.take_along_axis(scores, indices, axis=1), indices
+
+        rng = np.random.default_rng(0)
+        vectors = list(rng.standard_normal((50, 16)))
+        metadata: Sequence[ChunkMetadata] = [
+            {
+                "doc_id": str(i),
+                "chunk_index": i,
+                "chunk_header": f"Header{i}",
+                "chunk_text": f"Text{i}",
+            }
+            for i in range(50)
+        ]
+        db = BasicVectorDB(self.kb_id, self.storage_directory, use_faiss=True)
+        db.add_vectors(vectors, metadata)
+        query_vectors = list(rng.standard_normal((3, 16)))
+
+        mock_faiss = MagicMock()
+        mock_faiss.IndexFlatIP.side_effect = FlatIPIndex
+        with patch("dsrag.database.vector.basic_db.faiss", mock_faiss):
+            faiss_results = db.search(query_vectors[0], top_k=5)
+            faiss_batch_results = db.search_batch(query_vectors, top_k=5)
+        mock_faiss.IndexFlatIP.assert_called_once_with(16)
+
+        db.use_faiss = False
+        self.assertEqual(
+            [result["metadata"]["doc_id"] for result in faiss_results],
+            [result["metadata"]["doc_id"] for result in db.search(query_vectors[0], top_k=5)],
+        )
+        self.assertEqual(
+            [[result["metadata"]["doc_id"] for result in results] for results in faiss_batch_results],
+            [[result["metadata"]["doc_id"] for result in results] for results in db.search_batch(query_vectors, top_k=5)],
+        )
+
+        db.add_vectors(vectors[:1], metadata[:1])
+        self.assertIsNone(db._faiss_index)
+
+    def test__unsupported_quantization(self):
+        with self.assertRaises(ValueError):
+            BasicVectorDB(self.kb_id, self.storage_directory, quantization="float16")
+
 
 @unittest.skipIf(os.environ.get('GITHUB_ACTIONS') == 'true', "ChromaDB is not available on GitHub Actions")
 class TestChromaDB(unittest.TestCase):